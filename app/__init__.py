@@ -3,16 +3,25 @@
 from __future__ import annotations
 
 import os
-from datetime import timedelta
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import IO, TYPE_CHECKING
 
 import click
 from dotenv import load_dotenv
 from flask import Flask, redirect, url_for
 from flask.typing import ResponseReturnValue
 
+from .admission import init_admission
+from .assets import compress_static, init_assets
+from .budget import init_query_budgets
+from .core.singleflight import SingleFlight
+from .core.versioning import register_version_tracking
 from .extensions import csrf, db, login_manager, migrate
+from .metrics import init_metrics
+from .profiling import init_profiling
+from .readonly import init_read_only
+from .startup import StartupReport, configure_template_cache, warm_templates
 
 if TYPE_CHECKING:
     from .models import Person
@@ -21,7 +30,10 @@ if TYPE_CHECKING:
 def register_blueprints(app: Flask) -> None:
     from .auth.routes import bp as auth_bp
     from .views.dashboard import bp as dashboard_bp
+    from .views.lookup import bp as lookup_bp
+    from .views.metrics import bp as metrics_bp
     from .views.people import bp as people_bp
+    from .views.profiles import bp as profiles_bp
     from .views.projects import bp as projects_bp
     from .views.timesheet import bp as timesheet_bp
 
@@ -30,6 +42,10 @@ def register_blueprints(app: Flask) -> None:
     app.register_blueprint(projects_bp)
     app.register_blueprint(people_bp)
     app.register_blueprint(timesheet_bp)
+    app.register_blueprint(lookup_bp)
+    app.register_blueprint(profiles_bp)
+    if app.config["METRICS_ENABLED"]:
+        app.register_blueprint(metrics_bp)
 
 
 def configure_shell_context(app: Flask) -> None:
@@ -42,10 +58,16 @@ def configure_shell_context(app: Flask) -> None:
             "Project": models.Project,
             "Person": models.Person,
             "TimeEntry": models.TimeEntry,
+            "ArchivedTimeEntry": models.ArchivedTimeEntry,
         }
 
 
 def register_cli_commands(app: Flask) -> None:
+    from .core.archive import archive_cutoff, archive_time_entries
+    from .core.counters import reconcile_counters
+    from .core.periods import close_month
+    from .core.provisioning import parse_people_csv, provision_people
+    from .core.search import rebuild_search_index
     from .models import Person
 
     @app.cli.command("init-db")
@@ -72,6 +94,116 @@ def register_cli_commands(app: Flask) -> None:
         db.session.commit()
         click.echo(f"Created admin user {email}")
 
+    @app.cli.command("compress-assets")
+    @click.option("--level", default=9, show_default=True, help="gzip level (1-9).")
+    def compress_assets_command(level: int) -> None:
+        """Generate precompressed .gz variants of the static files."""
+
+        written = compress_static(app.static_folder or "", level=level)
+        for path in written:
+            click.echo(f"Wrote {path}")
+        click.echo(f"Compressed {len(written)} static files.")
+
+    @app.cli.command("rebuild-search-index")
+    def rebuild_search_index_command() -> None:
+        """Create (if needed) and fully rebuild the notes full-text index."""
+
+        rebuild_search_index()
+        click.echo("Rebuilt the notes search index.")
+
+    @app.cli.command("startup-report")
+    def startup_report_command() -> None:
+        """Print how long each application start-up phase took."""
+
+        click.echo(app.extensions["startup_report"].format())
+
+    @app.cli.command("archive-entries")
+    @click.option(
+        "--before",
+        type=click.DateTime(formats=["%Y-%m-%d"]),
+        help="Archive entries dated before this day (default: ARCHIVE_AFTER_DAYS ago).",
+    )
+    @click.option("--batch-size", type=int, help="Rows moved per transaction.")
+    def archive_entries_command(
+        before: datetime | None, batch_size: int | None
+    ) -> None:
+        """Move old time entries from the hot table into the archive table."""
+
+        cutoff = before.date() if before else archive_cutoff(app.config)
+        moved = archive_time_entries(
+            cutoff, batch_size=batch_size or int(app.config["ARCHIVE_BATCH_SIZE"])
+        )
+        click.echo(f"Archived {moved} time entries dated before {cutoff.isoformat()}.")
+
+    @app.cli.command("close-period")
+    @click.argument("month", type=click.DateTime(formats=["%Y-%m"]))
+    @click.option(
+        "--materialize-costs",
+        is_flag=True,
+        help="Also store each entry's cost on the entry.",
+    )
+    def close_period_command(month: datetime, materialize_costs: bool) -> None:
+        """Close a finished month (YYYY-MM) and snapshot its hours."""
+
+        try:
+            period = close_month(month.date(), materialize_costs=materialize_costs)
+        except ValueError as exc:
+            raise click.ClickException(str(exc)) from exc
+        click.echo(f"Closed {period.month:%Y-%m}.")
+
+    @app.cli.command("reconcile-counters")
+    @click.option(
+        "--check", is_flag=True, help="Only report drift, do not fix anything."
+    )
+    def reconcile_counters_command(check: bool) -> None:
+        """Recompute project/person activity counters and report drift."""
+
+        for drift in reconcile_counters(apply=not check):
+            click.echo(
+                f"{drift.table}: {drift.drifted}/{drift.checked} rows drifted "
+                f"(max {drift.max_hours_delta:.2f} h)"
+            )
+        if not check:
+            click.echo("Counters reconciled.")
+
+    @app.cli.command("provision-users")
+    @click.argument("csv_file", type=click.File("r", encoding="utf-8-sig"))
+    @click.option("--workers", type=int, help="Hashing processes (default: all cores).")
+    @click.option("--batch-size", type=int, help="Rows per INSERT statement.")
+    @click.option("--dry-run", is_flag=True, help="Validate only, create nothing.")
+    @click.option(
+        "--tokens-out",
+        type=click.File("w", encoding="utf-8"),
+        help="Write email,reset_token for users created without a password.",
+    )
+    def provision_users_command(
+        csv_file: IO[str],
+        workers: int | None,
+        batch_size: int | None,
+        dry_run: bool,
+        tokens_out: IO[str] | None,
+    ) -> None:
+        """Create people in bulk from a CSV (full_name,email[,password,role,...])."""
+
+        rows, errors = parse_people_csv(csv_file)
+        for error in errors:
+            click.echo(error, err=True)
+        result = provision_people(
+            rows,
+            workers=workers,
+            batch_size=batch_size or int(app.config["PROVISION_BATCH_SIZE"]),
+            token_hours=int(app.config["PROVISION_RESET_TOKEN_HOURS"]),
+            dry_run=dry_run,
+        )
+        if tokens_out is not None:
+            for email, token in result.reset_tokens.items():
+                tokens_out.write(f"{email},{token}\n")
+        verb = "Would create" if dry_run else "Created"
+        click.echo(
+            f"{verb} {result.created} people; {len(result.existing)} already "
+            f"existed; {len(errors)} invalid rows."
+        )
+
 
 def register_routes(app: Flask) -> None:
     @app.route("/")
@@ -82,6 +214,7 @@ def register_routes(app: Flask) -> None:
 def create_app(config_object: str | None = None) -> Flask:
     """Create and configure the Flask application instance."""
 
+    report = StartupReport()
     load_dotenv()
 
     app = Flask(__name__, instance_relative_config=True)
@@ -91,24 +224,70 @@ def create_app(config_object: str | None = None) -> Flask:
 
     default_db_path = instance_path / "app.db"
 
-    app.config.from_mapping(
-        SECRET_KEY=os.getenv("SECRET_KEY", "dev-secret"),
-        SQLALCHEMY_DATABASE_URI=os.getenv(
-            "DATABASE_URI", f"sqlite:///{default_db_path}"
-        ),
-        SQLALCHEMY_TRACK_MODIFICATIONS=False,
-        PERMANENT_SESSION_LIFETIME=timedelta(days=7),
-        DEFAULT_DASHBOARD_RANGE_DAYS=7,
-    )
-
-    app.config.from_pyfile("config.py", silent=True)
-    if config_object:
-        app.config.from_object(config_object)
-
-    db.init_app(app)
-    migrate.init_app(app, db)
-    login_manager.init_app(app)
-    csrf.init_app(app)
+    with report.phase("config"):
+        app.config.from_mapping(
+            SECRET_KEY=os.getenv("SECRET_KEY", "dev-secret"),
+            SQLALCHEMY_DATABASE_URI=os.getenv(
+                "DATABASE_URI", f"sqlite:///{default_db_path}"
+            ),
+            SQLALCHEMY_TRACK_MODIFICATIONS=False,
+            PERMANENT_SESSION_LIFETIME=timedelta(days=7),
+            DEFAULT_DASHBOARD_RANGE_DAYS=7,
+            DASHBOARD_CONCURRENT_QUERIES=os.getenv("DASHBOARD_CONCURRENT_QUERIES", "1")
+            == "1",
+            DASHBOARD_QUERY_WORKERS=int(os.getenv("DASHBOARD_QUERY_WORKERS", "4")),
+            SINGLE_FLIGHT_ENABLED=os.getenv("SINGLE_FLIGHT_ENABLED", "1") == "1",
+            SINGLE_FLIGHT_TIMEOUT=30.0,
+            QUERY_BUDGETS={"dashboard": 10.0, "timesheet": 10.0, "export": 30.0},
+            METRICS_ENABLED=os.getenv("METRICS_ENABLED", "1") == "1",
+            METRICS_TOKEN=os.getenv("METRICS_TOKEN"),
+            METRICS_MULTIPROC_DIR=os.getenv("METRICS_MULTIPROC_DIR"),
+            METRICS_FLUSH_INTERVAL=5.0,
+            READ_ONLY_REQUESTS=os.getenv("READ_ONLY_REQUESTS", "1") == "1",
+            PROFILING_ENABLED=os.getenv("PROFILING_ENABLED", "1") == "1",
+            PROFILE_TOKEN_MAX_AGE=3600,
+            PROFILES_DIR=os.getenv("PROFILES_DIR"),
+            PROFILES_KEEP=50,
+            ADMISSION_ENABLED=os.getenv("ADMISSION_ENABLED", "1") == "1",
+            ADMISSION_CLASSES={
+                "light": {"limit": 32, "queue": 64, "timeout": 5.0},
+                "report": {"limit": 4, "queue": 16, "timeout": 10.0},
+                "export": {"limit": 2, "queue": 4, "timeout": 15.0, "retry_after": 30},
+            },
+            ADMISSION_ENDPOINTS={
+                "dashboard.index": "report",
+                "dashboard.pivot_table": "report",
+                "timesheet.list_entries": "report",
+                "timesheet.export_csv": "export",
+            },
+            ARCHIVE_AFTER_DAYS=730,
+            ARCHIVE_BATCH_SIZE=1000,
+            DELETE_BATCH_SIZE=1000,
+            PROVISION_BATCH_SIZE=1000,
+            PROVISION_RESET_TOKEN_HOURS=72,
+            # Hashing processes for imports from the web page (1: in-process);
+            # the CLI uses every core.
+            PROVISION_WEB_WORKERS=int(os.getenv("PROVISION_WEB_WORKERS", "1")),
+            TEMPLATE_BYTECODE_CACHE=os.getenv("TEMPLATE_BYTECODE_CACHE", "1") == "1",
+            TEMPLATE_BYTECODE_CACHE_DIR=os.getenv("TEMPLATE_BYTECODE_CACHE_DIR"),
+            TEMPLATE_WARMUP=os.getenv("TEMPLATE_WARMUP", "0") == "1",
+            STATIC_IMMUTABLE_MAX_AGE=365 * 24 * 3600,
+        )
+
+        app.config.from_pyfile("config.py", silent=True)
+        if config_object:
+            app.config.from_object(config_object)
+
+    # Before any extension touches ``app.jinja_env`` (Flask-WTF does).
+    configure_template_cache(app)
+
+    with report.phase("extensions"):
+        register_version_tracking()
+        db.init_app(app)
+        migrate.init_app(app, db)
+        login_manager.init_app(app)
+        csrf.init_app(app)
+        app.extensions["single_flight"] = SingleFlight()
 
     @login_manager.user_loader
     def load_user(user_id: str) -> Person | None:
@@ -116,12 +295,27 @@ def create_app(config_object: str | None = None) -> Flask:
 
         return Person.query.get(int(user_id))
 
-    register_blueprints(app)
-    register_routes(app)
-    register_cli_commands(app)
-    configure_shell_context(app)
+    with report.phase("blueprints"):
+        register_blueprints(app)
+        register_routes(app)
+        init_assets(app)
+        init_query_budgets(app)
+        init_read_only(app)
+        init_metrics(app)
+        init_profiling(app)
+        init_admission(app)
+        register_cli_commands(app)
+        configure_shell_context(app)
+
+    if app.config["TEMPLATE_WARMUP"]:
+        with report.phase("templates"):
+            report.templates_compiled = warm_templates(app)
+
+    report.finish()
+    app.extensions["startup_report"] = report
+    app.logger.debug("Application started in %.1f ms", report.phases["total"])
 
     return app
 
 
-__all__ = ["create_app", "db", "login_manager", "csrf"]
+__all__ = ["create_app", "csrf", "db", "login_manager"]
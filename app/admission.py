@@ -0,0 +1,156 @@
+"""Admission control: per-class concurrency limits with bounded wait queues.
+
+Every request belongs to an admission class (``ADMISSION_ENDPOINTS`` maps
+endpoints to classes, everything else is ``light``). A class admits at most
+``limit`` concurrent requests; up to ``queue`` more wait for at most ``timeout``
+seconds. Beyond that the request is refused with ``503`` and ``Retry-After``, so
+a burst of exports or wide dashboards cannot take the workers and the database
+away from interactive edits, which run in their own class.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from flask import Flask, current_app, g, request
+from werkzeug.exceptions import ServiceUnavailable
+
+from .metrics import ADMISSION_EVENTS, ADMISSION_WAIT_SECONDS
+
+DEFAULT_CLASS = "light"
+
+
+class Overloaded(ServiceUnavailable):
+    description = (
+        "Il server sta elaborando troppe richieste di questo tipo. Riprova tra poco."
+    )
+
+
+@dataclass
+class GateStats:
+    active: int = 0
+    waiting: int = 0
+    admitted: int = 0
+    rejected: int = 0
+    timeouts: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+
+
+class Gate:
+    """Counting gate for one admission class."""
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        limit: int,
+        queue: int,
+        timeout: float,
+        retry_after: float | None = None,
+    ) -> None:
+        self.name = name
+        self.limit = limit
+        self.queue = queue
+        self.timeout = timeout
+        self.retry_after = math.ceil(
+            retry_after if retry_after is not None else timeout
+        )
+        self.stats = GateStats()
+        self._condition = threading.Condition()
+
+    def _refuse(self, event: str) -> Overloaded:
+        self._record(event)
+        return Overloaded(retry_after=max(self.retry_after, 1))
+
+    def _record(self, event: str) -> None:
+        ADMISSION_EVENTS.inc(**{"class": self.name, "event": event})
+
+    def acquire(self) -> float:
+        """Take a slot, waiting in the queue if needed; returns the wait time.
+
+        Raises :class:`Overloaded` when the queue is full or the wait times out.
+        """
+
+        stats = self.stats
+        with self._condition:
+            if stats.active < self.limit and not stats.waiting:
+                stats.active += 1
+                stats.admitted += 1
+                self._record("admitted")
+                return 0.0
+            if stats.waiting >= self.queue:
+                stats.rejected += 1
+                raise self._refuse("rejected")
+
+            started = time.monotonic()
+            stats.waiting += 1
+            try:
+                admitted = self._condition.wait_for(
+                    lambda: stats.active < self.limit, self.timeout
+                )
+            finally:
+                stats.waiting -= 1
+            waited = time.monotonic() - started
+            stats.wait_seconds_total += waited
+            stats.wait_seconds_max = max(stats.wait_seconds_max, waited)
+            ADMISSION_WAIT_SECONDS.inc(waited, **{"class": self.name})
+            if not admitted:
+                stats.timeouts += 1
+                raise self._refuse("timeouts")
+            stats.active += 1
+            stats.admitted += 1
+            self._record("admitted")
+            return waited
+
+    def release(self) -> None:
+        with self._condition:
+            self.stats.active -= 1
+            self._condition.notify()
+
+
+class AdmissionController:
+    def __init__(self, classes: Mapping[str, Mapping[str, Any]]) -> None:
+        self.gates = {name: Gate(name, **options) for name, options in classes.items()}
+
+    def gate_for(
+        self, endpoint: str | None, endpoints: Mapping[str, str]
+    ) -> Gate | None:
+        name = endpoints.get(endpoint or "", DEFAULT_CLASS)
+        return self.gates.get(name)
+
+    def stats(self) -> dict[str, GateStats]:
+        return {name: gate.stats for name, gate in self.gates.items()}
+
+
+def _admit() -> None:
+    if not current_app.config["ADMISSION_ENABLED"] or request.endpoint == "static":
+        return
+    controller: AdmissionController = current_app.extensions["admission"]
+    gate = controller.gate_for(
+        request.endpoint, current_app.config["ADMISSION_ENDPOINTS"]
+    )
+    if gate is None:
+        return
+    gate.acquire()
+    g.admission_gate = gate
+
+
+def _release(_exc: BaseException | None) -> None:
+    gate: Gate | None = g.pop("admission_gate", None)
+    if gate is not None:
+        gate.release()
+
+
+def init_admission(app: Flask) -> None:
+    app.extensions["admission"] = AdmissionController(app.config["ADMISSION_CLASSES"])
+    app.before_request(_admit)
+    app.teardown_request(_release)
+
+
+__all__ = ["AdmissionController", "Gate", "GateStats", "Overloaded", "init_admission"]
@@ -0,0 +1,138 @@
+"""Static asset delivery: content-hashed URLs, immutable caching and gzip variants."""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import mimetypes
+import shutil
+from pathlib import Path
+from typing import Any
+
+from flask import Flask, request, send_from_directory
+from flask.typing import ResponseReturnValue
+from werkzeug.security import safe_join
+
+from .metrics import CACHE_REQUESTS
+
+COMPRESSIBLE_SUFFIXES = frozenset({".js", ".css", ".svg", ".json", ".map", ".txt"})
+MIN_COMPRESS_BYTES = 1024
+
+
+# path -> (mtime_ns, digest); one entry per static file, replaced on change.
+_digests: dict[str, tuple[int, str]] = {}
+
+
+def _digest(path: str, mtime_ns: int) -> str:
+    cached = _digests.get(path)
+    if cached is not None and cached[0] == mtime_ns:
+        CACHE_REQUESTS.inc(cache="asset_digest", result="hit")
+        return cached[1]
+    CACHE_REQUESTS.inc(cache="asset_digest", result="miss")
+    sha = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(65536), b""):
+            sha.update(chunk)
+    digest = sha.hexdigest()[:12]
+    _digests[path] = (mtime_ns, digest)
+    return digest
+
+
+def fingerprint(static_folder: str, filename: str) -> str | None:
+    """Return the short content hash of a static file, or ``None`` if missing.
+
+    The digest is memoised per modification time, so only a ``stat`` is paid per
+    generated URL.
+    """
+
+    path = safe_join(static_folder, filename)
+    if path is None:
+        return None
+    try:
+        mtime_ns = Path(path).stat().st_mtime_ns
+    except OSError:
+        return None
+    return _digest(path, mtime_ns)
+
+
+def _fresh_gzip(source: str, target: str) -> bool:
+    """Whether ``target`` exists and is not older than ``source``."""
+
+    try:
+        return Path(target).stat().st_mtime >= Path(source).stat().st_mtime
+    except OSError:
+        return False
+
+
+def compress_static(static_folder: str, *, level: int = 9) -> list[Path]:
+    """Write a ``.gz`` sibling for every compressible static file.
+
+    Files whose ``.gz`` is already newer than the source are left alone. Returns
+    the variants that were (re)written.
+    """
+
+    written: list[Path] = []
+    for source in sorted(Path(static_folder).rglob("*")):
+        if (
+            not source.is_file()
+            or source.suffix not in COMPRESSIBLE_SUFFIXES
+            or source.stat().st_size < MIN_COMPRESS_BYTES
+        ):
+            continue
+        target = source.with_name(source.name + ".gz")
+        if _fresh_gzip(str(source), str(target)):
+            continue
+        with open(source, "rb") as src, gzip.open(target, "wb", level) as dst:
+            shutil.copyfileobj(src, dst)
+        written.append(target)
+    return written
+
+
+def init_assets(app: Flask) -> None:
+    """Fingerprint ``url_for('static', ...)`` and serve assets with long caching."""
+
+    @app.url_defaults
+    def _add_fingerprint(endpoint: str | None, values: dict[str, Any]) -> None:
+        if endpoint != "static" or "filename" not in values or "v" in values:
+            return
+        digest = fingerprint(app.static_folder or "", values["filename"])
+        if digest:
+            values["v"] = digest
+
+    def serve_static(filename: str) -> ResponseReturnValue:
+        static_folder = app.static_folder or ""
+        version = request.args.get("v")
+        immutable = version is not None and version == fingerprint(
+            static_folder, filename
+        )
+        max_age = app.config["STATIC_IMMUTABLE_MAX_AGE"] if immutable else None
+
+        # A .gz left behind by an older compress-assets run must not be served
+        # under the new fingerprint: fall back to the source file.
+        gz_name = f"{filename}.gz"
+        source_path = safe_join(static_folder, filename)
+        gz_path = safe_join(static_folder, gz_name)
+        if (
+            "gzip" in request.accept_encodings
+            and source_path is not None
+            and gz_path is not None
+            and _fresh_gzip(source_path, gz_path)
+        ):
+            mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+            response = send_from_directory(
+                static_folder, gz_name, mimetype=mimetype, max_age=max_age
+            )
+            response.headers["Content-Encoding"] = "gzip"
+        else:
+            response = send_from_directory(static_folder, filename, max_age=max_age)
+
+        response.vary.add("Accept-Encoding")
+        if immutable:
+            response.cache_control.public = True
+            response.cache_control.immutable = True
+        return response
+
+    app.view_functions["static"] = serve_static
+
+
+__all__ = ["compress_static", "fingerprint", "init_assets"]
@@ -8,6 +8,7 @@ from flask_login import current_user, login_required, login_user, logout_user
 
 from ..extensions import db
 from ..forms import LoginForm, RegisterForm, RequestPasswordResetForm, ResetPasswordForm
+from ..metrics import time_password_hash
 from ..models import Person
 
 bp = Blueprint("auth", __name__)
@@ -21,7 +22,9 @@ def login() -> ResponseReturnValue:
     form = LoginForm()
     if form.validate_on_submit():
         user = Person.query.filter_by(email=form.email.data.lower()).first()
-        if not user or not user.check_password(form.password.data):
+        if not user or not time_password_hash(
+            "check", lambda: user.check_password(form.password.data)
+        ):
             flash("Credenziali non valide", "danger")
         elif not user.is_active:
             flash("L'utente è disattivato", "warning")
@@ -53,7 +56,7 @@ def register() -> ResponseReturnValue:
                 role="user",
                 is_active=True,
             )
-            user.set_password(form.password.data)
+            time_password_hash("set", lambda: user.set_password(form.password.data))
             db.session.add(user)
             db.session.commit()
 
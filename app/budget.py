@@ -0,0 +1,118 @@
+"""Per-endpoint query time budgets for the expensive read views.
+
+Inside :func:`query_budget` every statement must finish before the deadline. On
+SQLite a progress handler installed on each pooled connection aborts the running
+statement; on PostgreSQL/MySQL the session statement timeout is set instead. A
+cancelled query surfaces as :class:`QueryBudgetExceeded`, which is logged with
+the filters and rendered as a "narrow your filters" page.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from http import HTTPStatus
+from typing import Any
+
+from flask import Flask, current_app, render_template, request
+from flask.typing import ResponseReturnValue
+from sqlalchemy import Engine, event, text
+from sqlalchemy.exc import DBAPIError
+
+from .extensions import db
+
+# SQLite VM instructions between two deadline checks.
+PROGRESS_INTERVAL = 10_000
+
+_deadline: contextvars.ContextVar[float | None] = contextvars.ContextVar(
+    "query_deadline", default=None
+)
+
+
+class QueryBudgetExceeded(Exception):
+    def __init__(self, budget: str, seconds: float, filters: Any = None) -> None:
+        super().__init__(f"query budget {budget!r} of {seconds:g}s exceeded")
+        self.budget = budget
+        self.seconds = seconds
+        self.filters = filters
+
+
+def _past_deadline() -> int:
+    deadline = _deadline.get()
+    return int(deadline is not None and time.monotonic() > deadline)
+
+
+def _install_progress_handler(dbapi_connection: Any, _record: Any) -> None:
+    if hasattr(dbapi_connection, "set_progress_handler"):
+        dbapi_connection.set_progress_handler(_past_deadline, PROGRESS_INTERVAL)
+
+
+def _is_cancellation(exc: DBAPIError) -> bool:
+    orig = exc.orig
+    return (
+        str(orig) == "interrupted"  # sqlite3
+        or getattr(orig, "pgcode", None) == "57014"  # query_canceled
+        or (getattr(orig, "args", None) or [None])[0] == 3024  # MySQL
+    )
+
+
+def _set_statement_timeout(milliseconds: int) -> None:
+    """Server-side timeout for engines without a progress handler (0 resets)."""
+
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "postgresql":
+        db.session.execute(text(f"SET LOCAL statement_timeout = {milliseconds}"))
+    elif dialect in ("mysql", "mariadb"):
+        db.session.execute(text(f"SET SESSION max_execution_time = {milliseconds}"))
+
+
+@contextmanager
+def query_budget(name: str, filters: Any = None) -> Iterator[None]:
+    """Abort the statements run inside the block after the ``name`` budget.
+
+    Budgets come from ``QUERY_BUDGETS`` (seconds per name); a missing or empty
+    value disables the limit.
+    """
+
+    seconds = (current_app.config.get("QUERY_BUDGETS") or {}).get(name)
+    if not seconds:
+        yield
+        return
+
+    _set_statement_timeout(max(int(seconds * 1000), 1))
+    token = _deadline.set(time.monotonic() + seconds)
+    try:
+        yield
+    except DBAPIError as exc:
+        if not _is_cancellation(exc):
+            raise
+        db.session.rollback()
+        raise QueryBudgetExceeded(name, seconds, filters) from exc
+    finally:
+        _deadline.reset(token)
+        _set_statement_timeout(0)
+
+
+def _budget_exceeded(error: QueryBudgetExceeded) -> ResponseReturnValue:
+    current_app.logger.warning(
+        "Query budget %r (%gs) exceeded on %s with filters %r",
+        error.budget,
+        error.seconds,
+        request.full_path,
+        error.filters,
+    )
+    return (
+        render_template("narrow_filters.html", error=error),
+        HTTPStatus.UNPROCESSABLE_ENTITY,
+    )
+
+
+def init_query_budgets(app: Flask) -> None:
+    if not event.contains(Engine, "connect", _install_progress_handler):
+        event.listen(Engine, "connect", _install_progress_handler)
+    app.register_error_handler(QueryBudgetExceeded, _budget_exceeded)
+
+
+__all__ = ["QueryBudgetExceeded", "init_query_budgets", "query_budget"]
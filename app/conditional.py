@@ -0,0 +1,69 @@
+"""Conditional GET support (``ETag`` / ``If-None-Match``) for read views."""
+
+from __future__ import annotations
+
+import hashlib
+import time
+
+from flask import Response, current_app, request, session
+from flask_login import current_user
+
+from .core.versioning import data_version
+from .metrics import CACHE_REQUESTS
+
+ENTRY_TABLES = (
+    "time_entries",
+    "time_entries_archive",
+    "projects",
+    "people",
+    "person_rates",
+    "closed_periods",
+    "period_snapshots",
+)
+
+
+def view_etag(*parts: object, tables: tuple[str, ...] = ENTRY_TABLES) -> str | None:
+    """Build a validator from the view inputs and the data version of ``tables``.
+
+    The tag also covers the current user (pages are personalised) and, when CSRF
+    protection is on, a time bucket of half the token lifetime so cached pages
+    never carry an expired CSRF token. Returns ``None`` when the response must
+    not be validated, e.g. while flash messages are pending.
+    """
+
+    if session.get("_flashes"):
+        return None
+
+    key = [request.endpoint, getattr(current_user, "id", None), data_version(*tables)]
+    if current_app.config.get("WTF_CSRF_ENABLED", True):
+        lifetime = current_app.config.get("WTF_CSRF_TIME_LIMIT") or 3600
+        key.append(int(time.time() // max(lifetime // 2, 1)))
+    key.extend(parts)
+
+    return hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+
+
+def not_modified(etag: str | None) -> Response | None:
+    """Return a ``304`` response when the client already holds ``etag``."""
+
+    if etag is None:
+        return None
+    if not request.if_none_match.contains(etag):
+        CACHE_REQUESTS.inc(cache="etag", result="miss")
+        return None
+    CACHE_REQUESTS.inc(cache="etag", result="hit")
+    response = Response(status=304)
+    return with_etag(response, etag)
+
+
+def with_etag(response: Response, etag: str | None) -> Response:
+    """Attach ``etag`` and force browsers to revalidate on every use."""
+
+    if etag is not None:
+        response.set_etag(etag)
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+    return response
+
+
+__all__ = ["ENTRY_TABLES", "not_modified", "view_etag", "with_etag"]
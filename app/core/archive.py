@@ -0,0 +1,124 @@
+"""Hot/cold tiering of time entries.
+
+Closed history is moved from ``time_entries`` into ``time_entries_archive`` so the
+hot table (and its indexes) stays small. Readers go through :func:`entry_source`,
+which only unions the archive in when the requested range reaches into it.
+"""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import Any
+
+from sqlalchemy import delete, func, insert, select, union_all
+from sqlalchemy.orm import aliased
+
+from ..extensions import db
+from ..models import ArchivedTimeEntry, TimeEntry
+
+_ENTRY_COLUMNS = (
+    "project_id",
+    "person_id",
+    "date",
+    "start_time",
+    "end_time",
+    "duration_hours",
+    "notes",
+    "cost",
+    "created_at",
+)
+
+
+def archive_cutoff(app_config: dict[str, object], today: date | None = None) -> date:
+    """Return the first date that must stay in the hot table."""
+
+    days = int(app_config.get("ARCHIVE_AFTER_DAYS", 730))
+    return (today or date.today()) - timedelta(days=days)
+
+
+def archived_through() -> date | None:
+    """Return the most recent date stored in the archive, if any."""
+
+    return db.session.execute(select(func.max(ArchivedTimeEntry.date))).scalar()
+
+
+def archive_time_entries(cutoff: date, *, batch_size: int = 1000) -> int:
+    """Move entries dated before ``cutoff`` into the archive table.
+
+    Rows are copied and deleted in batches of ``batch_size`` ids, each batch in its
+    own transaction, so the writer lock is never held for the whole run.
+    Returns the number of archived rows.
+    """
+
+    if batch_size <= 0:
+        msg = "batch_size must be positive"
+        raise ValueError(msg)
+
+    columns = [getattr(TimeEntry, name) for name in _ENTRY_COLUMNS]
+    moved = 0
+    while True:
+        ids = (
+            db.session.execute(
+                select(TimeEntry.id)
+                .where(TimeEntry.date < cutoff)
+                .order_by(TimeEntry.id)
+                .limit(batch_size)
+            )
+            .scalars()
+            .all()
+        )
+        if not ids:
+            break
+
+        db.session.execute(
+            insert(ArchivedTimeEntry).from_select(
+                ["id", *_ENTRY_COLUMNS],
+                select(TimeEntry.id, *columns).where(TimeEntry.id.in_(ids)),
+            )
+        )
+        db.session.execute(delete(TimeEntry).where(TimeEntry.id.in_(ids)))
+        db.session.commit()
+        moved += len(ids)
+
+    return moved
+
+
+def entry_source(start_date: date | None, end_date: date | None) -> Any:
+    """Return the entity time entry reads should select from.
+
+    When the range starts after the newest archived day this is simply
+    :class:`TimeEntry`. Otherwise it is ``TimeEntry`` aliased over a
+    ``UNION ALL`` of the hot and archive tables; archived rows carry a negative
+    id so they never clash with hot rows in the identity map and are rendered
+    read-only (see :attr:`TimeEntry.is_archived`).
+    """
+
+    if start_date is not None:
+        last_archived = archived_through()
+        if last_archived is None or start_date > last_archived:
+            return TimeEntry
+    elif archived_through() is None:
+        return TimeEntry
+
+    hot = select(TimeEntry.id, *(getattr(TimeEntry, c) for c in _ENTRY_COLUMNS))
+    cold = select(
+        (-ArchivedTimeEntry.id).label("id"),
+        *(getattr(ArchivedTimeEntry, c) for c in _ENTRY_COLUMNS),
+    )
+    if start_date:
+        hot = hot.where(TimeEntry.date >= start_date)
+        cold = cold.where(ArchivedTimeEntry.date >= start_date)
+    if end_date:
+        hot = hot.where(TimeEntry.date <= end_date)
+        cold = cold.where(ArchivedTimeEntry.date <= end_date)
+
+    combined = union_all(hot, cold).subquery("time_entries_all")
+    return aliased(TimeEntry, combined, name="entry")
+
+
+__all__ = [
+    "archive_cutoff",
+    "archive_time_entries",
+    "archived_through",
+    "entry_source",
+]
@@ -0,0 +1,199 @@
+"""Denormalised activity counters on projects and people.
+
+``total_hours``, ``month_hours``/``month_start`` and ``last_entry_date`` are kept
+up to date by row triggers on ``time_entries`` and ``time_entries_archive``, so
+every write path (forms, bulk statements, copy-week, the archive move) updates
+them in the same transaction. :func:`reconcile_counters` recomputes them from the
+entries and reports drift.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any
+
+from sqlalchemy import DDL, event, func, select, text, union_all, update
+
+from ..extensions import db
+from ..models import ArchivedTimeEntry, Person, Project, TimeEntry
+
+_TARGETS = (("projects", "project_id"), ("people", "person_id"))
+_SOURCES = (TimeEntry.__tablename__, ArchivedTimeEntry.__tablename__)
+_CURRENT_MONTH = "strftime('%Y-%m-01', 'now', 'localtime')"
+
+
+def _add(target: str, fk: str) -> str:
+    entry_month = "strftime('%Y-%m-01', NEW.date)"
+    return (
+        f"UPDATE {target} SET "
+        "total_hours = total_hours + NEW.duration_hours, "
+        "month_hours = CASE "
+        f"WHEN month_start = {entry_month} THEN month_hours + NEW.duration_hours "
+        f"WHEN {entry_month} = {_CURRENT_MONTH} THEN NEW.duration_hours "
+        "ELSE month_hours END, "
+        "month_start = CASE "
+        f"WHEN {entry_month} = {_CURRENT_MONTH} THEN {entry_month} "
+        "ELSE month_start END, "
+        "last_entry_date = CASE "
+        "WHEN last_entry_date IS NULL OR NEW.date > last_entry_date THEN NEW.date "
+        "ELSE last_entry_date END "
+        f"WHERE id = NEW.{fk};"
+    )
+
+
+def _remove(target: str, fk: str) -> str:
+    latest = " UNION ALL ".join(
+        f"SELECT max(date) AS day FROM {source} WHERE {fk} = OLD.{fk}"
+        for source in _SOURCES
+    )
+    return (
+        f"UPDATE {target} SET "
+        "total_hours = total_hours - OLD.duration_hours, "
+        "month_hours = CASE "
+        "WHEN month_start = strftime('%Y-%m-01', OLD.date) "
+        "THEN month_hours - OLD.duration_hours ELSE month_hours END, "
+        "last_entry_date = CASE WHEN last_entry_date = OLD.date "
+        f"THEN (SELECT max(day) FROM ({latest})) ELSE last_entry_date END "
+        f"WHERE id = OLD.{fk};"
+    )
+
+
+def trigger_statements(source: str) -> list[str]:
+    adds = " ".join(_add(target, fk) for target, fk in _TARGETS)
+    removes = " ".join(_remove(target, fk) for target, fk in _TARGETS)
+    prefix = f"CREATE TRIGGER IF NOT EXISTS {source}_counters"
+    return [
+        f"{prefix}_ai AFTER INSERT ON {source} BEGIN {adds} END",
+        f"{prefix}_ad AFTER DELETE ON {source} BEGIN {removes} END",
+        (
+            f"{prefix}_au AFTER UPDATE OF project_id, person_id, date, "
+            f"duration_hours ON {source} BEGIN {removes} {adds} END"
+        ),
+    ]
+
+
+def _register_ddl() -> None:
+    for model in (TimeEntry, ArchivedTimeEntry):
+        for statement in trigger_statements(model.__tablename__):
+            event.listen(
+                model.__table__,
+                "after_create",
+                # DDL applies %-formatting to the statement.
+                DDL(statement.replace("%", "%%")).execute_if(dialect="sqlite"),
+            )
+
+
+_register_ddl()
+
+
+@dataclass
+class CounterDrift:
+    table: str
+    checked: int
+    drifted: int
+    max_hours_delta: float
+
+
+def _month_bounds(today: date) -> tuple[date, date]:
+    start = today.replace(day=1)
+    return start, (start + timedelta(days=32)).replace(day=1)
+
+
+def _expected(fk: str) -> dict[int, tuple[float, float, date | None]]:
+    month, next_month = _month_bounds(date.today())
+    branches = [
+        select(
+            getattr(model, fk).label("key"),
+            model.duration_hours.label("hours"),
+            model.date.label("day"),
+        )
+        for model in (TimeEntry, ArchivedTimeEntry)
+    ]
+    source = union_all(*branches).subquery()
+    rows = db.session.execute(
+        select(
+            source.c.key,
+            func.sum(source.c.hours),
+            func.sum(source.c.hours).filter(
+                source.c.day >= month, source.c.day < next_month
+            ),
+            func.max(source.c.day),
+        ).group_by(source.c.key)
+    )
+    return {
+        key: (float(total or 0), float(month_total or 0), last)
+        for key, total, month_total, last in rows
+    }
+
+
+def _reconcile(model: Any, fk: str, *, apply: bool) -> CounterDrift:
+    month = date.today().replace(day=1)
+    expected = _expected(fk)
+    fixes: list[dict[str, Any]] = []
+    max_delta = 0.0
+    current = db.session.execute(
+        select(
+            model.id,
+            model.total_hours,
+            model.month_hours,
+            model.month_start,
+            model.last_entry_date,
+        )
+    )
+    checked = 0
+    for row in current:
+        checked += 1
+        total, month_total, last = expected.get(row.id, (0.0, 0.0, None))
+        stored_month = row.month_hours if row.month_start == month else 0.0
+        delta = abs(total - row.total_hours)
+        if (
+            delta > 1e-6
+            or abs(month_total - stored_month) > 1e-6
+            or last != row.last_entry_date
+        ):
+            max_delta = max(max_delta, delta)
+            fixes.append(
+                {
+                    "id": row.id,
+                    "total_hours": total,
+                    "month_hours": month_total,
+                    "month_start": month,
+                    "last_entry_date": last,
+                }
+            )
+    if apply and fixes:
+        db.session.execute(update(model), fixes)
+    return CounterDrift(model.__tablename__, checked, len(fixes), max_delta)
+
+
+def reconcile_counters(*, apply: bool = True) -> list[CounterDrift]:
+    """Recompute the counters of every project and person and report drift.
+
+    With ``apply`` the drifted rows are corrected and the transaction committed.
+    """
+
+    report = [
+        _reconcile(Project, "project_id", apply=apply),
+        _reconcile(Person, "person_id", apply=apply),
+    ]
+    if apply:
+        db.session.commit()
+    return report
+
+
+def install_triggers() -> None:
+    """Create the counter triggers on an existing database (idempotent)."""
+
+    for source in _SOURCES:
+        for statement in trigger_statements(source):
+            db.session.execute(text(statement))
+    db.session.commit()
+
+
+__all__ = [
+    "CounterDrift",
+    "install_triggers",
+    "reconcile_counters",
+    "trigger_statements",
+]
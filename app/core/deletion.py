@@ -0,0 +1,267 @@
+"""Deleting projects and people together with their time entries.
+
+Time entries (hot and archived) reference their project and person, so a record
+with history cannot simply be removed. Every policy works with set-based
+statements over batches of ids, one transaction per batch, and never loads
+entry objects:
+
+``block``
+    refuse while any entry references the record.
+``archive``
+    stream the entries to a CSV file, then delete them and the record.
+``reassign``
+    move the entries to another project/person, then delete the record.
+
+Records with entries or snapshots in a closed month are refused under every
+policy (:class:`ClosedPeriodConflict`): moving or deleting them would change
+the frozen totals of that month.
+"""
+
+from __future__ import annotations
+
+import csv
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import delete, func, literal, select, union_all, update
+
+from ..extensions import db
+from ..models import (
+    ArchivedTimeEntry,
+    ClosedPeriod,
+    PeriodSnapshot,
+    Person,
+    PersonRate,
+    Project,
+    TimeEntry,
+)
+
+POLICIES = ("block", "archive", "reassign")
+ENTRY_MODELS = (TimeEntry, ArchivedTimeEntry)
+_EXPORT_COLUMNS = (
+    "id",
+    "project_id",
+    "person_id",
+    "date",
+    "start_time",
+    "end_time",
+    "duration_hours",
+    "notes",
+    "created_at",
+)
+
+
+class DeletionBlocked(Exception):
+    """Raised by the ``block`` policy when entries still reference the record."""
+
+    def __init__(self, entries: int) -> None:
+        super().__init__(f"{entries} time entries reference this record")
+        self.entries = entries
+
+
+class ClosedPeriodConflict(Exception):
+    """Raised when the record has entries or snapshots in closed months."""
+
+    def __init__(self, months: list[date]) -> None:
+        super().__init__(
+            "closed months reference this record: "
+            + ", ".join(f"{month:%Y-%m}" for month in months)
+        )
+        self.months = months
+
+
+@dataclass
+class DeletionResult:
+    policy: str
+    entries: int
+    archive_file: Path | None = None
+
+
+def count_entries(column: str, owner_id: int) -> int:
+    """Number of hot and archived entries whose ``column`` equals ``owner_id``."""
+
+    counts = union_all(
+        *(
+            select(func.count()).where(getattr(model, column) == owner_id)
+            for model in ENTRY_MODELS
+        )
+    ).subquery()
+    return int(db.session.execute(select(func.sum(counts.c[0]))).scalar() or 0)
+
+
+def closed_months_of(column: str, owner_id: int) -> list[date]:
+    """Closed months holding snapshots or entries whose ``column`` is ``owner_id``."""
+
+    months = [
+        select(PeriodSnapshot.month).where(getattr(PeriodSnapshot, column) == owner_id),
+        *(
+            select(ClosedPeriod.month)
+            .join(model, func.date(model.date, "start of month") == ClosedPeriod.month)
+            .where(getattr(model, column) == owner_id)
+            for model in ENTRY_MODELS
+        ),
+    ]
+    found = union_all(*months).subquery()
+    return list(
+        db.session.execute(select(found.c[0]).distinct().order_by(found.c[0])).scalars()
+    )
+
+
+def _batched(model: Any, column: str, owner_id: int, batch_size: int, **values) -> int:
+    """Update (``values``) or delete the owner's rows of ``model`` in batches."""
+
+    owned = getattr(model, column) == owner_id
+    total = 0
+    while True:
+        batch = model.id.in_(select(model.id).where(owned).limit(batch_size))
+        stmt = (
+            update(model).where(batch).values(**values)
+            if values
+            else delete(model).where(batch)
+        )
+        result = db.session.execute(
+            stmt, execution_options={"synchronize_session": False}
+        )
+        db.session.commit()
+        if not result.rowcount:
+            return total
+        total += result.rowcount
+
+
+def _export(column: str, owner_id: int, path: Path, batch_size: int) -> int:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    exported = 0
+    with path.open("w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["source", *_EXPORT_COLUMNS])
+        for model in ENTRY_MODELS:
+            stmt = select(
+                literal(model.__tablename__),
+                *(getattr(model, name) for name in _EXPORT_COLUMNS),
+            ).where(getattr(model, column) == owner_id)
+            for row in db.session.execute(stmt.execution_options(yield_per=batch_size)):
+                writer.writerow(row)
+                exported += 1
+    return exported
+
+
+def _delete_owner(
+    owner: Any,
+    column: str,
+    owner_id: int,
+    *,
+    policy: str,
+    target_id: int | None,
+    batch_size: int,
+    archive_dir: Path | None,
+) -> DeletionResult:
+    if policy not in POLICIES:
+        msg = f"unknown deletion policy: {policy!r}"
+        raise ValueError(msg)
+    if batch_size <= 0:
+        msg = "batch_size must be positive"
+        raise ValueError(msg)
+
+    closed = closed_months_of(column, owner_id)
+    if closed:
+        raise ClosedPeriodConflict(closed)
+
+    result = DeletionResult(policy, 0)
+    if policy == "block":
+        entries = count_entries(column, owner_id)
+        if entries:
+            raise DeletionBlocked(entries)
+    elif policy == "reassign":
+        if target_id in (None, owner_id) or db.session.get(owner, target_id) is None:
+            msg = "reassign needs another existing target"
+            raise ValueError(msg)
+        for model in ENTRY_MODELS:
+            result.entries += _batched(
+                model, column, owner_id, batch_size, **{column: target_id}
+            )
+    else:
+        if archive_dir is None:
+            msg = "archive needs an archive_dir"
+            raise ValueError(msg)
+        stamp = datetime.now().strftime("%Y%m%d%H%M%S")
+        path = archive_dir / f"{owner.__tablename__}-{owner_id}-{stamp}.csv"
+        if _export(column, owner_id, path, batch_size):
+            result.archive_file = path
+        else:
+            path.unlink()
+        for model in ENTRY_MODELS:
+            result.entries += _batched(model, column, owner_id, batch_size)
+
+    if owner is Person:
+        db.session.execute(delete(PersonRate).where(PersonRate.person_id == owner_id))
+        db.session.execute(
+            update(ClosedPeriod)
+            .where(ClosedPeriod.closed_by_id == owner_id)
+            .values(closed_by_id=None)
+        )
+    db.session.execute(delete(owner).where(owner.id == owner_id))
+    db.session.commit()
+    return result
+
+
+def delete_project(
+    project_id: int,
+    *,
+    policy: str = "block",
+    target_id: int | None = None,
+    batch_size: int = 1000,
+    archive_dir: Path | None = None,
+) -> DeletionResult:
+    """Delete a project, handling its time entries according to ``policy``.
+
+    Raises :class:`DeletionBlocked` for ``block`` when entries exist and
+    ``ValueError`` for an invalid policy or reassignment target.
+    """
+
+    return _delete_owner(
+        Project,
+        "project_id",
+        project_id,
+        policy=policy,
+        target_id=target_id,
+        batch_size=batch_size,
+        archive_dir=archive_dir,
+    )
+
+
+def delete_person(
+    person_id: int,
+    *,
+    policy: str = "block",
+    target_id: int | None = None,
+    batch_size: int = 1000,
+    archive_dir: Path | None = None,
+) -> DeletionResult:
+    """Delete a person, handling their time entries according to ``policy``.
+
+    Closed periods the person closed keep their snapshots and lose the link.
+    """
+
+    return _delete_owner(
+        Person,
+        "person_id",
+        person_id,
+        policy=policy,
+        target_id=target_id,
+        batch_size=batch_size,
+        archive_dir=archive_dir,
+    )
+
+
+__all__ = [
+    "POLICIES",
+    "ClosedPeriodConflict",
+    "DeletionBlocked",
+    "DeletionResult",
+    "closed_months_of",
+    "count_entries",
+    "delete_person",
+    "delete_project",
+]
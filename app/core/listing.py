@@ -0,0 +1,172 @@
+"""Paginated, sortable and searchable listings of projects and people.
+
+Each page costs a ``COUNT`` and the page ``SELECT``. Hours and last activity come
+from the counter columns maintained by :mod:`app.core.counters`, so neither
+showing nor sorting by them aggregates any time entries.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from datetime import date
+from typing import Any
+
+from flask_sqlalchemy.pagination import Pagination
+from sqlalchemy import or_, select
+
+from ..extensions import db
+from ..models import Person, Project
+from .lookup import prefix_pattern
+
+DEFAULT_PER_PAGE = 25
+MAX_PER_PAGE = 100
+
+
+@dataclass(frozen=True)
+class Activity:
+    hours: float = 0.0
+    last_activity: date | None = None
+    month_hours: float = 0.0
+
+
+@dataclass
+class Listing:
+    pagination: Pagination
+    activity: dict[int, Activity]
+    search: str
+    sort: str
+    direction: str
+
+    @property
+    def rows(self) -> list[tuple[Any, Activity]]:
+        return [
+            (item, self.activity.get(item.id, Activity()))
+            for item in self.pagination.items
+        ]
+
+
+def _activity_for(items: list[Any]) -> dict[int, Activity]:
+    return {
+        item.id: Activity(
+            float(item.total_hours or 0), item.last_entry_date, item.hours_this_month
+        )
+        for item in items
+    }
+
+
+def _paginate(
+    model: Any,
+    *,
+    search_columns: tuple[Any, ...],
+    sort_columns: dict[str, Any],
+    default_sort: str,
+    search: str,
+    sort: str,
+    direction: str,
+    page: int,
+    per_page: int,
+) -> Listing:
+    sort_columns = {
+        **sort_columns,
+        "hours": model.total_hours,
+        "last_activity": model.last_entry_date,
+    }
+    if sort not in sort_columns:
+        sort = default_sort
+    direction = "desc" if direction == "desc" else "asc"
+
+    stmt = select(model)
+    search = search.strip()
+    if search:
+        pattern = prefix_pattern(search)
+        stmt = stmt.where(
+            or_(*(column.like(pattern, escape="\\") for column in search_columns))
+        )
+
+    order_column = sort_columns[sort]
+    ordering = order_column.desc() if direction == "desc" else order_column.asc()
+    stmt = stmt.order_by(ordering.nulls_last(), model.id)
+
+    pagination = db.paginate(
+        stmt,
+        page=max(page, 1),
+        per_page=max(1, min(per_page, MAX_PER_PAGE)),
+        error_out=False,
+    )
+    activity = _activity_for(pagination.items)
+    return Listing(pagination, activity, search, sort, direction)
+
+
+def listing_args(args: Mapping[str, str]) -> dict[str, Any]:
+    """Parse ``q``/``sort``/``dir``/``page``/``per_page`` query arguments."""
+
+    def _int(name: str, default: int) -> int:
+        try:
+            return int(args.get(name, default))
+        except (TypeError, ValueError):
+            return default
+
+    return {
+        "search": args.get("q", ""),
+        "sort": args.get("sort", ""),
+        "direction": args.get("dir", "asc"),
+        "page": _int("page", 1),
+        "per_page": _int("per_page", DEFAULT_PER_PAGE),
+    }
+
+
+def list_projects(
+    *,
+    search: str = "",
+    sort: str = "name",
+    direction: str = "asc",
+    page: int = 1,
+    per_page: int = DEFAULT_PER_PAGE,
+) -> Listing:
+    return _paginate(
+        Project,
+        search_columns=(Project.name, Project.code, Project.client),
+        sort_columns={
+            "name": Project.name.collate("NOCASE"),
+            "code": Project.code.collate("NOCASE"),
+            "client": Project.client.collate("NOCASE"),
+            "status": Project.is_active,
+        },
+        default_sort="name",
+        search=search,
+        sort=sort,
+        direction=direction,
+        page=page,
+        per_page=per_page,
+    )
+
+
+def list_people(
+    *,
+    search: str = "",
+    sort: str = "full_name",
+    direction: str = "asc",
+    page: int = 1,
+    per_page: int = DEFAULT_PER_PAGE,
+) -> Listing:
+    return _paginate(
+        Person,
+        search_columns=(Person.full_name, Person.email),
+        sort_columns={
+            "full_name": Person.full_name.collate("NOCASE"),
+            "email": Person.email.collate("NOCASE"),
+            "hourly_rate": Person.hourly_rate,
+            "role": Person.role,
+            "status": Person.is_active,
+        },
+        default_sort="full_name",
+        search=search,
+        sort=sort,
+        direction=direction,
+        page=page,
+        per_page=per_page,
+    )
+
+
+__all__ = ["Activity", "Listing", "list_people", "list_projects", "listing_args"]
@@ -0,0 +1,146 @@
+"""Typeahead lookups for projects and people.
+
+Forms no longer preload every project and person as ``<option>`` elements: they
+render only the selected value and query these helpers through JSON endpoints.
+Matching is a case-insensitive prefix ``LIKE`` served by the ``*_nocase``
+indexes.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import or_, select
+
+from ..extensions import db
+from ..models import Person, Project
+
+if TYPE_CHECKING:
+    from ..forms import FilterForm
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 50
+
+
+def prefix_pattern(query: str) -> str:
+    """``LIKE`` pattern matching values that start with ``query`` literally."""
+
+    escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"{escaped}%"
+
+
+def _clamp(limit: int | None) -> int:
+    return max(1, min(limit or DEFAULT_LIMIT, MAX_LIMIT))
+
+
+def search_projects(
+    query: str, *, limit: int | None = None, active_only: bool = True
+) -> list[dict[str, Any]]:
+    """Projects whose name, code or client starts with ``query``."""
+
+    pattern = prefix_pattern(query.strip())
+    stmt = select(Project.id, Project.name, Project.code, Project.client).where(
+        or_(
+            Project.name.like(pattern, escape="\\"),
+            Project.code.like(pattern, escape="\\"),
+            Project.client.like(pattern, escape="\\"),
+        )
+    )
+    if active_only:
+        stmt = stmt.where(Project.is_active.is_(True))
+    rows = db.session.execute(stmt.order_by(Project.name).limit(_clamp(limit)))
+    return [
+        {
+            "id": row.id,
+            "label": row.name,
+            "detail": " · ".join(part for part in (row.code, row.client) if part),
+        }
+        for row in rows
+    ]
+
+
+def search_people(
+    query: str,
+    *,
+    limit: int | None = None,
+    active_only: bool = True,
+    person_id: int | None = None,
+) -> list[dict[str, Any]]:
+    """People whose full name or email starts with ``query``.
+
+    With ``person_id`` only that person can match and the email is left out of
+    ``detail``: non-admins only ever pick themselves.
+    """
+
+    pattern = prefix_pattern(query.strip())
+    stmt = select(Person.id, Person.full_name, Person.email).where(
+        or_(
+            Person.full_name.like(pattern, escape="\\"),
+            Person.email.like(pattern, escape="\\"),
+        )
+    )
+    if active_only:
+        stmt = stmt.where(Person.is_active.is_(True))
+    if person_id is not None:
+        stmt = stmt.where(Person.id == person_id)
+    rows = db.session.execute(stmt.order_by(Person.full_name).limit(_clamp(limit)))
+    return [
+        {
+            "id": row.id,
+            "label": row.full_name,
+            "detail": row.email if person_id is None else "",
+        }
+        for row in rows
+    ]
+
+
+def project_choices(
+    project_id: int | None, *, active_only: bool = False
+) -> list[tuple[int, str]]:
+    """Choice list holding only ``project_id`` (if it exists and is allowed).
+
+    Used to seed ``SelectField.choices`` so WTForms still rejects unknown or
+    inactive ids on submit.
+    """
+
+    if not project_id:
+        return []
+    stmt = select(Project.id, Project.name).where(Project.id == project_id)
+    if active_only:
+        stmt = stmt.where(Project.is_active.is_(True))
+    return [(row.id, row.name) for row in db.session.execute(stmt)]
+
+
+def person_choices(
+    person_id: int | None, *, active_only: bool = False
+) -> list[tuple[int, str]]:
+    """Choice list holding only ``person_id`` (if it exists and is allowed)."""
+
+    if not person_id:
+        return []
+    stmt = select(Person.id, Person.full_name).where(Person.id == person_id)
+    if active_only:
+        stmt = stmt.where(Person.is_active.is_(True))
+    return [(row.id, row.full_name) for row in db.session.execute(stmt)]
+
+
+def set_filter_choices(form: FilterForm) -> None:
+    """Seed the filter selects with "Tutti" plus the currently selected values."""
+
+    form.project_id.choices = [(0, "Tutti")] + project_choices(form.project_id.data)
+    form.person_id.choices = [(0, "Tutti")] + person_choices(form.person_id.data)
+
+    if form.project_id.data is None:
+        form.project_id.data = 0
+    if form.person_id.data is None:
+        form.person_id.data = 0
+
+
+__all__ = [
+    "person_choices",
+    "prefix_pattern",
+    "project_choices",
+    "search_people",
+    "search_projects",
+    "set_filter_choices",
+]
@@ -0,0 +1,83 @@
+"""Run independent read statements concurrently, each on its own connection.
+
+SQLite readers only take shared locks, so separate pooled connections can
+execute at the same time; ``sqlite3`` releases the GIL while a statement runs.
+Each statement sees its own snapshot, which is fine for independent aggregates.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import threading
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from sqlalchemy import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from ..extensions import db
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor(workers: int) -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(1, workers), thread_name_prefix="read-query"
+            )
+        return _executor
+
+
+def supports_concurrent_reads(engine: Engine) -> bool:
+    """False for in-memory SQLite, where every connection is a different database."""
+
+    url = engine.url
+    return not (
+        url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+    )
+
+
+def _read(engine: Engine, statement: Any) -> list[Any]:
+    with engine.connect() as connection:
+        return list(connection.execute(statement).all())
+
+
+def run_statements(
+    statements: Mapping[str, Any], *, concurrent: bool = False, workers: int = 4
+) -> dict[str, list[Any]]:
+    """Execute ``statements`` and return their rows under the same keys.
+
+    With ``concurrent`` the statements run on a shared thread pool of ``workers``
+    threads. It falls back to running them one after the other on the request
+    session when that is not possible (single statement, in-memory database,
+    exhausted connection pool, interpreter shutting down).
+    """
+
+    if concurrent and len(statements) > 1:
+        engine = db.engine
+        if supports_concurrent_reads(engine):
+            try:
+                executor = _get_executor(workers)
+                # Each task runs in a copy of the caller's context so context
+                # variables (the query deadline) apply in the worker too.
+                futures = {
+                    name: executor.submit(
+                        contextvars.copy_context().run, _read, engine, statement
+                    )
+                    for name, statement in statements.items()
+                }
+                return {name: future.result() for name, future in futures.items()}
+            except (PoolTimeoutError, RuntimeError):
+                pass
+
+    return {
+        name: list(db.session.execute(statement).all())
+        for name, statement in statements.items()
+    }
+
+
+__all__ = ["run_statements", "supports_concurrent_reads"]
@@ -0,0 +1,214 @@
+"""Closing payroll months: frozen entries and permanent aggregate snapshots.
+
+:func:`close_month` stores the hours of a finished month per day, project and
+person in ``period_snapshots`` and records the month in ``closed_periods``.
+From then on the timesheet refuses to create, edit or delete entries dated in
+it (see :func:`app.core.validators.ensure_period_open`), and
+:func:`aggregate_source` answers hour aggregates for closed months from the
+snapshots, so historical dashboards read a handful of rows per month instead of
+every entry. With ``materialize_costs`` the cost of each entry is also written
+onto the entry, so it no longer depends on the rate history.
+"""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import Any
+
+from sqlalchemy import (
+    Date,
+    DateTime,
+    Integer,
+    Text,
+    Time,
+    cast,
+    func,
+    insert,
+    literal,
+    not_,
+    null,
+    select,
+    union_all,
+    update,
+)
+from sqlalchemy.orm import aliased
+
+from ..extensions import db
+from ..models import ArchivedTimeEntry, ClosedPeriod, PeriodSnapshot, TimeEntry
+from .archive import entry_source
+from .rates import cost_subquery, entry_cost, join_rates
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def month_end(month: date) -> date:
+    return (month_start(month) + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+
+
+def closed_months(start: date | None = None, end: date | None = None) -> list[date]:
+    """First days of the closed months overlapping ``[start, end]``, ascending."""
+
+    stmt = select(ClosedPeriod.month).order_by(ClosedPeriod.month)
+    if start is not None:
+        stmt = stmt.where(ClosedPeriod.month >= month_start(start))
+    if end is not None:
+        stmt = stmt.where(ClosedPeriod.month <= end)
+    return list(db.session.execute(stmt).scalars())
+
+
+def closed_among(days: set[date]) -> list[date]:
+    """The closed months among the months of ``days``."""
+
+    months = {month_start(day) for day in days if day is not None}
+    if not months:
+        return []
+    return list(
+        db.session.execute(
+            select(ClosedPeriod.month)
+            .where(ClosedPeriod.month.in_(months))
+            .order_by(ClosedPeriod.month)
+        ).scalars()
+    )
+
+
+def close_month(
+    month: date,
+    *,
+    closed_by: int | None = None,
+    today: date | None = None,
+    materialize_costs: bool = False,
+) -> ClosedPeriod:
+    """Freeze ``month`` and snapshot its hours; the month must be over.
+
+    Raises ``ValueError`` if the month is already closed or not finished yet.
+    The snapshot reads the archive too, so closing works after archiving.
+    ``materialize_costs`` stores each entry's cost in ``cost`` first.
+    """
+
+    month = month_start(month)
+    if month >= month_start(today or date.today()):
+        msg = f"month {month:%Y-%m} is not over yet"
+        raise ValueError(msg)
+    if db.session.get(ClosedPeriod, month) is not None:
+        msg = f"month {month:%Y-%m} is already closed"
+        raise ValueError(msg)
+
+    period = ClosedPeriod(month=month, closed_by_id=closed_by)
+    db.session.add(period)
+    db.session.flush()
+
+    last = month_end(month)
+    if materialize_costs:
+        for model in (TimeEntry, ArchivedTimeEntry):
+            db.session.execute(
+                update(model)
+                .where(model.date.between(month, last), model.cost.is_(None))
+                .values(cost=cost_subquery(model))
+                .execution_options(synchronize_session=False)
+            )
+
+    entry = entry_source(month, last)
+    source = (
+        select(
+            literal(month, Date),
+            entry.date,
+            entry.project_id,
+            entry.person_id,
+            func.sum(entry.duration_hours),
+            func.count(),
+            func.sum(entry_cost(entry)),
+        )
+        .select_from(entry)
+        .join(entry.person)
+        .where(entry.date.between(month, last))
+        .group_by(entry.date, entry.project_id, entry.person_id)
+    )
+    source = join_rates(source, entry)
+    db.session.execute(
+        insert(PeriodSnapshot).from_select(
+            ["month", "day", "project_id", "person_id", "hours", "entries", "cost"],
+            source,
+        )
+    )
+    db.session.commit()
+    return period
+
+
+def _first_open_day(
+    start: date | None, end: date | None, closed: list[date]
+) -> date | None:
+    """First day of ``[start, end]`` outside the closed months (``start`` if open)."""
+
+    day = start
+    if day is None:
+        return None
+    closed_set = set(closed)
+    while month_start(day) in closed_set:
+        day = month_end(day) + timedelta(days=1)
+    if end is not None and day > end:
+        return end + timedelta(days=1)
+    return day
+
+
+def aggregate_source(start: date | None, end: date | None) -> Any:
+    """Entity to aggregate hours over ``[start, end]`` from.
+
+    Without closed months in the range this is :func:`entry_source`. Otherwise
+    it is ``TimeEntry`` aliased over a ``UNION ALL`` of the live entries outside
+    the closed months and one row per snapshot (``duration_hours`` = the frozen
+    hours), so ``SUM(duration_hours)`` grouped by anything the snapshot keeps
+    (day, project, person) is exact; snapshot rows carry their frozen cost, so
+    :func:`app.core.rates.entry_cost` sums are exact too. Rows carry no id,
+    times or notes: use it for aggregates only.
+    """
+
+    closed = closed_months(start, end)
+    if not closed:
+        return entry_source(start, end)
+
+    live_start = _first_open_day(start, end, closed)
+    live = entry_source(live_start, end)
+    live_rows = select(
+        live.id,
+        live.project_id,
+        live.person_id,
+        live.date,
+        live.start_time,
+        live.end_time,
+        live.duration_hours,
+        live.notes,
+        live.cost,
+        live.created_at,
+    ).where(*(not_(live.date.between(month, month_end(month))) for month in closed))
+    if live_start is not None:
+        live_rows = live_rows.where(live.date >= live_start)
+    if end is not None:
+        live_rows = live_rows.where(live.date <= end)
+
+    frozen_rows = select(
+        cast(null(), Integer).label("id"),
+        PeriodSnapshot.project_id,
+        PeriodSnapshot.person_id,
+        PeriodSnapshot.day.label("date"),
+        cast(null(), Time).label("start_time"),
+        cast(null(), Time).label("end_time"),
+        PeriodSnapshot.hours.label("duration_hours"),
+        cast(null(), Text).label("notes"),
+        PeriodSnapshot.cost.label("cost"),
+        cast(null(), DateTime).label("created_at"),
+    ).where(PeriodSnapshot.month.in_(closed))
+
+    combined = union_all(live_rows, frozen_rows).subquery("time_entries_frozen")
+    return aliased(TimeEntry, combined, name="entry")
+
+
+__all__ = [
+    "aggregate_source",
+    "close_month",
+    "closed_among",
+    "closed_months",
+    "month_end",
+    "month_start",
+]
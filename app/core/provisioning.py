@@ -0,0 +1,206 @@
+"""Bulk creation of people from a CSV file.
+
+Emails are checked against the database with one set-based query, passwords are
+hashed on a process pool (scrypt is CPU bound and holds the GIL) and the rows are
+written with batched ``INSERT`` statements in a single transaction. Rows without
+a password get an unusable hash and a password reset token instead.
+"""
+
+from __future__ import annotations
+
+import csv
+import multiprocessing
+import os
+import re
+import secrets
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from typing import IO
+
+from sqlalchemy import insert, select
+from werkzeug.security import generate_password_hash
+
+from ..extensions import db
+from ..models import Person
+
+CSV_COLUMNS = ("full_name", "email", "password", "role", "hourly_rate", "country")
+ROLES = ("admin", "user")
+EMAIL_PATTERN = re.compile(r"^[^@]+@[^@]+\.[^@]+$")
+MIN_PASSWORD_LENGTH = 8
+# Never matches: check_password_hash() rejects hashes without a method prefix.
+UNUSABLE_PASSWORD = "!"
+
+
+@dataclass
+class ProvisionRow:
+    line: int
+    full_name: str
+    email: str
+    password: str | None = None
+    role: str = "user"
+    hourly_rate: Decimal | None = None
+    country: str | None = None
+
+
+@dataclass
+class ProvisionResult:
+    created: int = 0
+    existing: list[str] = field(default_factory=list)
+    errors: list[str] = field(default_factory=list)
+    reset_tokens: dict[str, str] = field(default_factory=dict)
+    dry_run: bool = False
+
+
+def _parse_row(line: int, raw: dict[str, str | None]) -> ProvisionRow | str:
+    values = {key: (raw.get(key) or "").strip() for key in CSV_COLUMNS}
+    email = values["email"].lower()
+    if not values["full_name"] or len(values["full_name"]) > 120:
+        return f"riga {line}: nome mancante o troppo lungo"
+    if not EMAIL_PATTERN.match(email) or len(email) > 255:
+        return f"riga {line}: email non valida ({values['email']!r})"
+    if values["password"] and len(values["password"]) < MIN_PASSWORD_LENGTH:
+        return f"riga {line}: password più corta di {MIN_PASSWORD_LENGTH} caratteri"
+    role = values["role"] or "user"
+    if role not in ROLES:
+        return f"riga {line}: ruolo non valido ({role!r})"
+    rate = None
+    if values["hourly_rate"]:
+        try:
+            rate = Decimal(values["hourly_rate"].replace(",", "."))
+        except InvalidOperation:
+            rate = None
+        if rate is None or rate < 0:
+            return f"riga {line}: tariffa oraria non valida"
+    return ProvisionRow(
+        line=line,
+        full_name=values["full_name"],
+        email=email,
+        password=values["password"] or None,
+        role=role,
+        hourly_rate=rate,
+        country=values["country"] or None,
+    )
+
+
+def parse_people_csv(stream: IO[str]) -> tuple[list[ProvisionRow], list[str]]:
+    """Validate a CSV with a header row; returns the valid rows and the errors.
+
+    Required columns are ``full_name`` and ``email``; ``password``, ``role``,
+    ``hourly_rate`` and ``country`` are optional. Duplicate emails within the
+    file are reported and only the first occurrence is kept.
+    """
+
+    reader = csv.DictReader(stream)
+    missing = {"full_name", "email"} - set(reader.fieldnames or ())
+    if missing:
+        return [], [f"colonne mancanti: {', '.join(sorted(missing))}"]
+
+    rows: list[ProvisionRow] = []
+    errors: list[str] = []
+    seen: set[str] = set()
+    for line, raw in enumerate(reader, start=2):
+        parsed = _parse_row(line, raw)
+        if isinstance(parsed, str):
+            errors.append(parsed)
+        elif parsed.email in seen:
+            errors.append(f"riga {line}: email duplicata nel file ({parsed.email})")
+        else:
+            seen.add(parsed.email)
+            rows.append(parsed)
+    return rows, errors
+
+
+def existing_emails(emails: Iterable[str]) -> set[str]:
+    """Lower-cased emails among ``emails`` that already belong to a person."""
+
+    wanted = sorted({email.lower() for email in emails})
+    if not wanted:
+        return set()
+    # NOCASE matches ix_people_email_nocase; lower() would scan the table.
+    stmt = select(Person.email).where(Person.email.collate("NOCASE").in_(wanted))
+    return {email.lower() for email in db.session.execute(stmt).scalars()}
+
+
+def hash_passwords(passwords: list[str], *, workers: int | None = None) -> list[str]:
+    """Hash ``passwords`` in order, across ``workers`` processes (default: all cores)."""
+
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(passwords) < 2:
+        return [generate_password_hash(password) for password in passwords]
+    chunksize = max(1, len(passwords) // (workers * 4))
+    # spawn: never fork a process that already runs database and pool threads.
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        return list(pool.map(generate_password_hash, passwords, chunksize=chunksize))
+
+
+def provision_people(
+    rows: list[ProvisionRow],
+    *,
+    workers: int | None = None,
+    batch_size: int = 1000,
+    token_hours: int = 72,
+    dry_run: bool = False,
+) -> ProvisionResult:
+    """Create a :class:`Person` for every row whose email is not taken yet."""
+
+    if batch_size <= 0:
+        msg = "batch_size must be positive"
+        raise ValueError(msg)
+
+    result = ProvisionResult(dry_run=dry_run)
+    taken = existing_emails(row.email for row in rows)
+    new_rows = [row for row in rows if row.email not in taken]
+    result.existing = sorted(row.email for row in rows if row.email in taken)
+    if dry_run:
+        result.created = len(new_rows)
+        return result
+
+    with_password = [row for row in new_rows if row.password]
+    hashes = dict(
+        zip(
+            (row.email for row in with_password),
+            hash_passwords([row.password for row in with_password], workers=workers),
+            strict=True,
+        )
+    )
+    expiry = datetime.now(UTC) + timedelta(hours=token_hours)
+
+    values = []
+    for row in new_rows:
+        token = None if row.email in hashes else secrets.token_urlsafe(32)
+        if token:
+            result.reset_tokens[row.email] = token
+        values.append(
+            {
+                "full_name": row.full_name,
+                "email": row.email,
+                "password_hash": hashes.get(row.email, UNUSABLE_PASSWORD),
+                "role": row.role,
+                "hourly_rate": row.hourly_rate,
+                "country": row.country,
+                "is_active": True,
+                "reset_token": token,
+                "reset_token_expiry": expiry if token else None,
+            }
+        )
+
+    for start in range(0, len(values), batch_size):
+        db.session.execute(insert(Person), values[start : start + batch_size])
+    db.session.commit()
+    result.created = len(values)
+    return result
+
+
+__all__ = [
+    "CSV_COLUMNS",
+    "ProvisionResult",
+    "ProvisionRow",
+    "existing_emails",
+    "hash_passwords",
+    "parse_people_csv",
+    "provision_people",
+]
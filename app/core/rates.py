@@ -0,0 +1,169 @@
+"""Effective-dated hourly rates and the SQL expression pricing time entries.
+
+``person_rates`` stores each person's rate over ``[effective_from,
+effective_to)``. Cost queries outer-join it on the entry's person and date
+(:func:`join_rates`); the ``(person_id, effective_from)`` index answers that
+with one range seek per row, so a historically correct total over any number of
+entries is a single ``SUM`` (see :func:`entry_cost`).
+
+People without a history are priced at ``Person.hourly_rate``. A cost frozen
+on the entry itself when its month was closed (``TimeEntry.cost``, see
+:func:`app.core.periods.close_month`) wins over both.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+from typing import Any
+
+from sqlalchemy import and_, case, func, or_, select
+
+from ..extensions import db
+from ..models import ClosedPeriod, Person, PersonRate
+
+# Start of the implicit first period when a person's rate changes for the
+# first time: until then the single current rate applied to every entry.
+EPOCH = date(1900, 1, 1)
+
+
+class RateChangeError(ValueError):
+    """The requested rate change would reprice a closed month."""
+
+
+def rate_history(person_id: int) -> list[PersonRate]:
+    """Rate periods of ``person_id``, oldest first."""
+
+    return list(
+        db.session.execute(
+            select(PersonRate)
+            .where(PersonRate.person_id == person_id)
+            .order_by(PersonRate.effective_from)
+        ).scalars()
+    )
+
+
+def set_hourly_rate(
+    person: Person,
+    rate: Decimal | None,
+    effective_from: date | None = None,
+    *,
+    today: date | None = None,
+) -> PersonRate:
+    """Make ``rate`` apply to ``person`` from ``effective_from`` (default today).
+
+    A period already starting that day is repriced; otherwise a new period is
+    inserted and the neighbouring ones are re-chained so they never overlap. A
+    later change already in the history keeps applying from its own date, and
+    consecutive periods with the same rate are merged. Returns the period in
+    force on ``effective_from``.
+    ``Person.hourly_rate`` is updated to the rate in force ``today``. Raises
+    :class:`RateChangeError` if the change reaches into a closed month, or if
+    ``rate`` is already in force on ``effective_from`` from an earlier day (the
+    new period would vanish into it). The caller owns the transaction.
+    """
+
+    today = today or date.today()
+    effective_from = effective_from or today
+    last_closed = db.session.execute(select(func.max(ClosedPeriod.month))).scalar()
+    if last_closed is not None and last_closed >= effective_from.replace(day=1):
+        raise RateChangeError(
+            f"La tariffa non può decorrere da un mese chiuso "
+            f"(ultimo mese chiuso: {last_closed:%m/%Y})."
+        )
+
+    periods = {row.effective_from: row for row in rate_history(person.id)}
+    if not periods and effective_from > EPOCH:
+        periods[EPOCH] = PersonRate(
+            person_id=person.id, hourly_rate=person.hourly_rate, effective_from=EPOCH
+        )
+    changed = periods.get(effective_from)
+    if changed is None:
+        in_force = max(
+            (row for start, row in periods.items() if start < effective_from),
+            key=lambda row: row.effective_from,
+            default=None,
+        )
+        if in_force is not None and in_force.hourly_rate == rate:
+            since = (
+                f" dal {in_force.effective_from:%d/%m/%Y}"
+                if in_force.effective_from > EPOCH
+                else ""
+            )
+            raise RateChangeError(f"La tariffa indicata è già in vigore{since}.")
+        changed = periods[effective_from] = PersonRate(
+            person_id=person.id, effective_from=effective_from
+        )
+    changed.hourly_rate = rate
+
+    kept: list[PersonRate] = []
+    for row in sorted(periods.values(), key=lambda row: row.effective_from):
+        if kept and row.hourly_rate == kept[-1].hourly_rate:
+            if row.id is not None:
+                db.session.delete(row)
+            continue
+        kept.append(row)
+
+    for current, following in zip(kept, [*kept[1:], None], strict=True):
+        current.effective_to = following.effective_from if following else None
+        if current.id is None:
+            db.session.add(current)
+        if current.effective_from <= today:
+            person.hourly_rate = current.hourly_rate
+    return next(row for row in reversed(kept) if row.effective_from <= effective_from)
+
+
+def join_rates(stmt: Any, entry: Any) -> Any:
+    """Outer-join the rate period covering each ``entry`` row's person and day."""
+
+    return stmt.outerjoin(
+        PersonRate,
+        and_(
+            PersonRate.person_id == entry.person_id,
+            PersonRate.effective_from <= entry.date,
+            or_(
+                PersonRate.effective_to.is_(None), PersonRate.effective_to > entry.date
+            ),
+        ),
+    )
+
+
+def entry_rate() -> Any:
+    """Rate of the joined period, or the current rate without a history.
+
+    Needs ``Person`` and :func:`join_rates` in the statement.
+    """
+
+    return case(
+        (PersonRate.id.is_(None), Person.hourly_rate), else_=PersonRate.hourly_rate
+    )
+
+
+def entry_cost(entry: Any) -> Any:
+    """Cost of an ``entry`` row: the frozen cost, else hours × :func:`entry_rate`."""
+
+    return func.coalesce(
+        entry.cost, entry.duration_hours * func.coalesce(entry_rate(), 0)
+    )
+
+
+def cost_subquery(model: Any) -> Any:
+    """Correlated scalar subquery pricing the current ``model`` row.
+
+    For ``UPDATE ... SET cost = (...)`` statements materialising costs.
+    """
+
+    stmt = select(entry_cost(model)).select_from(Person)
+    return join_rates(stmt, model).where(Person.id == model.person_id).scalar_subquery()
+
+
+__all__ = [
+    "EPOCH",
+    "RateChangeError",
+    "cost_subquery",
+    "entry_cost",
+    "entry_rate",
+    "join_rates",
+    "rate_history",
+    "set_hourly_rate",
+]
@@ -0,0 +1,127 @@
+"""Full-text search over time entry notes backed by SQLite FTS5.
+
+Each entry table has an external-content FTS5 index (``<table>_fts``) whose rows
+share the entry id. Triggers keep the index in sync with every write, including
+bulk statements and the archive move, so no application code has to remember it.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from sqlalchemy import (
+    DDL,
+    column,
+    event,
+    literal_column,
+    select,
+    table,
+    text,
+    union_all,
+)
+
+from ..extensions import db
+from ..models import ArchivedTimeEntry, TimeEntry
+
+INDEXED_TABLES = (TimeEntry.__tablename__, ArchivedTimeEntry.__tablename__)
+
+
+def _create_statements(source: str) -> list[str]:
+    fts = f"{source}_fts"
+    return [
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+            notes, content='{source}', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )""",
+        f"""CREATE TRIGGER IF NOT EXISTS {source}_fts_ai AFTER INSERT ON {source}
+        BEGIN
+            INSERT INTO {fts}(rowid, notes) VALUES (new.id, new.notes);
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {source}_fts_ad AFTER DELETE ON {source}
+        BEGIN
+            INSERT INTO {fts}({fts}, rowid, notes)
+            VALUES ('delete', old.id, old.notes);
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {source}_fts_au
+        AFTER UPDATE OF notes ON {source}
+        BEGIN
+            INSERT INTO {fts}({fts}, rowid, notes)
+            VALUES ('delete', old.id, old.notes);
+            INSERT INTO {fts}(rowid, notes) VALUES (new.id, new.notes);
+        END""",
+    ]
+
+
+def _register_ddl() -> None:
+    for model in (TimeEntry, ArchivedTimeEntry):
+        source = model.__tablename__
+        for statement in _create_statements(source):
+            event.listen(
+                model.__table__,
+                "after_create",
+                DDL(statement).execute_if(dialect="sqlite"),
+            )
+        event.listen(
+            model.__table__,
+            "before_drop",
+            DDL(f"DROP TABLE IF EXISTS {source}_fts").execute_if(dialect="sqlite"),
+        )
+
+
+_register_ddl()
+
+
+def to_match_query(search: str) -> str | None:
+    """Turn free user input into a safe FTS5 query.
+
+    Every whitespace separated term becomes a quoted prefix phrase, so operators
+    and punctuation typed by the user (``TKT-123``, ``"``) are never interpreted.
+    All terms must match.
+    """
+
+    terms = [term.replace('"', '""') for term in search.split()]
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def _fts_matches(source: str, query: str, *, negate_ids: bool) -> Any:
+    fts = table(f"{source}_fts", column("rowid"), column("rank"))
+    entry_id = -fts.c.rowid if negate_ids else fts.c.rowid
+    return select(entry_id.label("entry_id"), fts.c.rank.label("rank")).where(
+        literal_column(f"{source}_fts").op("MATCH")(query)
+    )
+
+
+def note_matches(search: str, *, include_archive: bool) -> Any | None:
+    """Subquery of ``(entry_id, rank)`` for entries whose notes match ``search``.
+
+    Archived entries use the negated ids produced by
+    :func:`app.core.archive.entry_source`. Lower ``rank`` means more relevant.
+    """
+
+    query = to_match_query(search)
+    if query is None:
+        return None
+
+    matches = _fts_matches(TimeEntry.__tablename__, query, negate_ids=False)
+    if include_archive:
+        matches = union_all(
+            matches,
+            _fts_matches(ArchivedTimeEntry.__tablename__, query, negate_ids=True),
+        )
+    return matches.subquery("note_matches")
+
+
+def rebuild_search_index() -> None:
+    """Recreate the FTS tables and triggers if needed and reindex all notes."""
+
+    for source in INDEXED_TABLES:
+        for statement in _create_statements(source):
+            db.session.execute(text(statement))
+        fts = f"{source}_fts"
+        db.session.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+    db.session.commit()
+
+
+__all__ = ["note_matches", "rebuild_search_index", "to_match_query"]
@@ -2,15 +2,37 @@
 
 from __future__ import annotations
 
-from collections.abc import Iterable
-from dataclasses import dataclass
-from datetime import date, timedelta
+import csv
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, replace
+from datetime import UTC, date, datetime, time, timedelta
+from io import StringIO
 from typing import TYPE_CHECKING, Any
 
-from sqlalchemy import func
-from sqlalchemy.orm import Query
-
+from sqlalchemy import (
+    DateTime,
+    Select,
+    and_,
+    case,
+    delete,
+    exists,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.orm import Query, aliased
+
+from ..extensions import db
 from ..models import Person, Project, TimeEntry
+from .archive import entry_source
+from .parallel import run_statements
+from .periods import aggregate_source
+from .rates import entry_cost, join_rates
+from .search import note_matches
+from .validators import ensure_period_open
 
 if TYPE_CHECKING:
     from ..forms import FilterForm
@@ -23,6 +45,7 @@ class TimesheetFilters:
     project_id: int | None = None
     person_id: int | None = None
     include_inactive: bool = False
+    search: str | None = None
 
     @classmethod
     def from_form(cls, form: FilterForm) -> TimesheetFilters:
@@ -32,26 +55,62 @@ class TimesheetFilters:
             project_id=form.project_id.data or None,
             person_id=form.person_id.data or None,
             include_inactive=form.include_inactive.data,
+            search=(form.search.data or "").strip() or None,
         )
 
 
-def _base_query(filters: TimesheetFilters) -> Query[TimeEntry]:
-    query: Query[TimeEntry] = TimeEntry.query.join(TimeEntry.project).join(
-        TimeEntry.person
-    )
+def _apply_filters(
+    stmt: Any, filters: TimesheetFilters, entry: Any, matches: Any
+) -> Any:
+    """Join project/person and apply ``filters`` to an ORM query or ``select()``."""
+
+    stmt = stmt.join(entry.project).join(entry.person)
 
+    if matches is not None:
+        stmt = stmt.join(matches, matches.c.entry_id == entry.id)
     if filters.start_date:
-        query = query.filter(TimeEntry.date >= filters.start_date)
+        stmt = stmt.filter(entry.date >= filters.start_date)
     if filters.end_date:
-        query = query.filter(TimeEntry.date <= filters.end_date)
+        stmt = stmt.filter(entry.date <= filters.end_date)
     if filters.project_id:
-        query = query.filter(TimeEntry.project_id == filters.project_id)
+        stmt = stmt.filter(entry.project_id == filters.project_id)
     if filters.person_id:
-        query = query.filter(TimeEntry.person_id == filters.person_id)
+        stmt = stmt.filter(entry.person_id == filters.person_id)
     if not filters.include_inactive:
-        query = query.filter(Project.is_active.is_(True), Person.is_active.is_(True))
+        stmt = stmt.filter(Project.is_active.is_(True), Person.is_active.is_(True))
+
+    return stmt
+
+
+def _base_query(
+    filters: TimesheetFilters, entry: Any = TimeEntry, matches: Any = None
+) -> Query[Any]:
+    if filters.search and matches is None:
+        matches = _note_matches(filters, entry)
+    return _apply_filters(db.session.query(entry), filters, entry, matches)
+
+
+def _entry_source(filters: TimesheetFilters) -> Any:
+    """Entity to read entries from: hot table only, or hot plus archive."""
+
+    return entry_source(filters.start_date, filters.end_date)
+
+
+def _hours_source(filters: TimesheetFilters) -> Any:
+    """Entity for hour aggregates: closed months come from their snapshots.
+
+    A notes search needs the individual entries, so it always reads them live.
+    """
 
-    return query
+    if filters.search:
+        return _entry_source(filters)
+    return aggregate_source(filters.start_date, filters.end_date)
+
+
+def _note_matches(filters: TimesheetFilters, entry: Any) -> Any | None:
+    if not filters.search:
+        return None
+    return note_matches(filters.search, include_archive=entry is not TimeEntry)
 
 
 def default_period(app_config: dict[str, object]) -> tuple[date, date]:
@@ -61,35 +120,124 @@ def default_period(app_config: dict[str, object]) -> tuple[date, date]:
     return start_date, end_date
 
 
-def get_dashboard_data(filters: TimesheetFilters) -> dict[str, Any]:
-    query = _base_query(filters)
+ROLLING_WINDOWS = (7, 28)
+
+
+def previous_period(start: date, end: date) -> tuple[date, date]:
+    """The equally long period ending the day before ``start``."""
+
+    length = end - start + timedelta(days=1)
+    return start - length, start - timedelta(days=1)
+
 
-    total_hours_query = query.with_entities(
-        func.coalesce(func.sum(TimeEntry.duration_hours), 0.0)
+def _trend_statement(filters: TimesheetFilters) -> Any:
+    """Daily hours with rolling sums and current/previous period totals.
+
+    The daily series is read from the start of the previous period (or far
+    enough back to fill the longest rolling window) and the window functions
+    run over it, so the comparison and every rolling average cost one query.
+    Rolling frames are calendar based (``RANGE`` over the julian day), so days
+    without entries count as zero.
+    """
+
+    start, end = filters.start_date, filters.end_date
+    previous_start, previous_end = previous_period(start, end)
+    since = min(previous_start, start - timedelta(days=max(ROLLING_WINDOWS) - 1))
+    extended = replace(filters, start_date=since)
+
+    entry = _hours_source(extended)
+    daily = (
+        _base_query(extended, entry)
+        .with_entities(
+            entry.date.label("day"), func.sum(entry.duration_hours).label("hours")
+        )
+        .group_by(entry.date)
+        .subquery("daily")
     )
-    total_hours = float(total_hours_query.scalar() or 0.0)
 
-    hours_by_project_rows = (
-        query.with_entities(Project.name, func.sum(TimeEntry.duration_hours))
+    def _period_total(first: date, last: date) -> Any:
+        in_period = daily.c.day.between(first, last)
+        return func.sum(case((in_period, daily.c.hours), else_=0.0)).over()
+
+    order = func.julianday(daily.c.day)
+    return select(
+        daily.c.day,
+        daily.c.hours,
+        *(
+            func.sum(daily.c.hours).over(order_by=order, range_=(-(days - 1), 0))
+            for days in ROLLING_WINDOWS
+        ),
+        _period_total(start, end),
+        _period_total(previous_start, previous_end),
+    ).order_by(daily.c.day)
+
+
+def _trend(
+    filters: TimesheetFilters, rows: list[Any]
+) -> tuple[dict[str, Any], dict[int, list[float]]]:
+    start, end = filters.start_date, filters.end_date
+    previous_start, previous_end = previous_period(start, end)
+    current = previous = 0.0
+    rolling: dict[int, list[float]] = {days: [] for days in ROLLING_WINDOWS}
+    for day, _hours, *sums, current_total, previous_total in rows:
+        current, previous = float(current_total), float(previous_total)
+        if day < start:
+            continue
+        for days, window_sum in zip(ROLLING_WINDOWS, sums, strict=True):
+            rolling[days].append(round(float(window_sum) / days, 2))
+
+    delta = current - previous
+    comparison = {
+        "current_hours": round(current, 2),
+        "previous_hours": round(previous, 2),
+        "previous_start": previous_start.isoformat(),
+        "previous_end": previous_end.isoformat(),
+        "delta_hours": round(delta, 2),
+        "delta_percent": round(delta / previous * 100, 1) if previous else None,
+    }
+    return comparison, rolling
+
+
+def get_dashboard_data(
+    filters: TimesheetFilters, *, concurrent: bool = False, workers: int = 4
+) -> dict[str, Any]:
+    """KPIs and chart series for the dashboard.
+
+    The aggregates are independent; with ``concurrent`` they run in parallel
+    (see :func:`app.core.parallel.run_statements`). A bounded period adds the
+    comparison with the previous period and the rolling averages, aligned with
+    ``hours_by_day`` (see :func:`_trend_statement`).
+    """
+
+    entry = _hours_source(filters)
+    query = _base_query(filters, entry)
+    hours = func.sum(entry.duration_hours)
+    with_trend = filters.start_date is not None and filters.end_date is not None
+
+    statements = {
+        "total": query.with_entities(func.coalesce(hours, 0.0)).statement,
+        "by_project": query.with_entities(Project.name, hours)
         .group_by(Project.id)
-        .order_by(func.sum(TimeEntry.duration_hours).desc())
+        .order_by(hours.desc())
         .limit(5)
-        .all()
-    )
-
-    hours_by_person_rows = (
-        query.with_entities(Person.full_name, func.sum(TimeEntry.duration_hours))
+        .statement,
+        "by_person": query.with_entities(Person.full_name, hours)
         .group_by(Person.id)
-        .order_by(func.sum(TimeEntry.duration_hours).desc())
-        .all()
-    )
+        .order_by(hours.desc())
+        .statement,
+        "by_day": query.with_entities(entry.date, hours)
+        .group_by(entry.date)
+        .order_by(entry.date.asc())
+        .statement,
+    }
+    if with_trend:
+        statements["trend"] = _trend_statement(filters)
+    rows = run_statements(statements, concurrent=concurrent, workers=workers)
 
-    hours_by_day_rows = (
-        query.with_entities(TimeEntry.date, func.sum(TimeEntry.duration_hours))
-        .group_by(TimeEntry.date)
-        .order_by(TimeEntry.date.asc())
-        .all()
-    )
+    total_hours = float(rows["total"][0][0] or 0.0)
+    hours_by_project_rows = rows["by_project"]
+    hours_by_person_rows = rows["by_person"]
+    hours_by_day_rows = rows["by_day"]
 
     hours_by_project = [
         (name, float(hours or 0)) for name, hours in hours_by_project_rows
@@ -123,6 +271,11 @@ def get_dashboard_data(filters: TimesheetFilters) -> dict[str, Any]:
         top_person_name, top_person_hours = hours_by_person[0]
         top_person_info = {"name": top_person_name, "hours": top_person_hours}
 
+    comparison: dict[str, Any] | None = None
+    rolling: dict[int, list[float]] = {days: [] for days in ROLLING_WINDOWS}
+    if with_trend:
+        comparison, rolling = _trend(filters, rows["trend"])
+
     return {
         "total_hours": total_hours,
         "average_daily_hours": average_daily_hours,
@@ -134,27 +287,605 @@ def get_dashboard_data(filters: TimesheetFilters) -> dict[str, Any]:
         "hours_by_project": hours_by_project,
         "hours_by_person": hours_by_person,
         "hours_by_day": hours_by_day,
+        "comparison": comparison,
+        "rolling_7": rolling[7],
+        "rolling_28": rolling[28],
     }
 
 
-def get_timesheet_entries(filters: TimesheetFilters) -> Iterable[TimeEntry]:
-    return _base_query(filters).order_by(
-        TimeEntry.date.desc(), TimeEntry.start_time.asc()
+def _newest_first(stmt: Any, entry: Any, matches: Any) -> Any:
+    if matches is not None:
+        stmt = stmt.order_by(matches.c.rank.asc())
+    return stmt.order_by(entry.date.desc(), entry.start_time.asc())
+
+
+def get_timesheet_entries(filters: TimesheetFilters) -> Query[TimeEntry]:
+    """Entries matching ``filters``, newest first (best note matches first)."""
+
+    entry = _entry_source(filters)
+    matches = _note_matches(filters, entry)
+    return _newest_first(_base_query(filters, entry, matches), entry, matches)
+
+
+class EntryRow:
+    """Read-only time entry joined with its project name, person and cost.
+
+    Built from plain result tuples, so listing thousands of entries skips ORM
+    hydration, the identity map and the lazy ``project``/``person`` loads.
+    """
+
+    __slots__ = (
+        "cost",
+        "date",
+        "duration_hours",
+        "end_time",
+        "id",
+        "notes",
+        "person_name",
+        "project_name",
+        "start_time",
+    )
+
+    def __init__(
+        self,
+        id: int,
+        date: date,
+        start_time: time | None,
+        end_time: time | None,
+        duration_hours: float,
+        notes: str | None,
+        project_name: str,
+        person_name: str,
+        cost: float,
+    ) -> None:
+        self.id = id
+        self.date = date
+        self.start_time = start_time
+        self.end_time = end_time
+        self.duration_hours = duration_hours
+        self.notes = notes
+        self.project_name = project_name
+        self.person_name = person_name
+        self.cost = cost
+
+    @property
+    def is_archived(self) -> bool:
+        return self.id < 0
+
+
+def timesheet_rows_statement(filters: TimesheetFilters) -> Select[Any]:
+    """Core ``select()`` of the :class:`EntryRow` columns matching ``filters``.
+
+    Filter values are bound parameters, so statements of the same shape share
+    one entry in SQLAlchemy's compiled cache. The cost is priced in SQL at the
+    rate in force on the entry's day (see :mod:`app.core.rates`).
+    """
+
+    entry = _entry_source(filters)
+    matches = _note_matches(filters, entry)
+    stmt = select(
+        entry.id,
+        entry.date,
+        entry.start_time,
+        entry.end_time,
+        entry.duration_hours,
+        entry.notes,
+        Project.name,
+        Person.full_name,
+        entry_cost(entry),
+    ).select_from(entry)
+    stmt = join_rates(_apply_filters(stmt, filters, entry, matches), entry)
+    return _newest_first(stmt, entry, matches)
+
+
+def get_timesheet_rows(filters: TimesheetFilters) -> list[EntryRow]:
+    """Entries matching ``filters`` as :class:`EntryRow` records, newest first."""
+
+    result = db.session.execute(timesheet_rows_statement(filters))
+    return [EntryRow(*row) for row in result]
+
+
+def compute_total_cost(entries: Iterable[EntryRow]) -> float:
+    return round(sum(entry.cost for entry in entries), 2)
+
+
+class PivotSpecError(ValueError):
+    """Unknown pivot dimension or measure."""
+
+
+@dataclass(frozen=True)
+class PivotField:
+    label: str
+    expression: Callable[[Any], Any]
+    formatter: Callable[[Any], Any] | None = None
+
+
+def _iso_week(monday: Any) -> str | None:
+    if monday is None:
+        return None
+    year, week, _ = date.fromisoformat(str(monday)).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def _iso_date(value: Any) -> str | None:
+    return None if value is None else str(value)
+
+
+PIVOT_DIMENSIONS: dict[str, PivotField] = {
+    "project": PivotField("Progetto", lambda entry: Project.name),
+    "client": PivotField("Cliente", lambda entry: Project.client),
+    "person": PivotField("Persona", lambda entry: Person.full_name),
+    "country": PivotField("Paese", lambda entry: Person.country),
+    "role": PivotField("Ruolo", lambda entry: Person.role),
+    "day": PivotField("Giorno", lambda entry: entry.date, _iso_date),
+    # Monday of the week in SQL (groupable), ISO ``YYYY-Www`` label in Python.
+    "week": PivotField(
+        "Settimana",
+        lambda entry: func.date(entry.date, "-6 days", "weekday 1"),
+        _iso_week,
+    ),
+    "month": PivotField("Mese", lambda entry: func.strftime("%Y-%m", entry.date)),
+}
+
+PIVOT_MEASURES: dict[str, PivotField] = {
+    "hours": PivotField(
+        "Ore", lambda entry: func.coalesce(func.sum(entry.duration_hours), 0.0), float
+    ),
+    "cost": PivotField(
+        "Costo",
+        lambda entry: func.coalesce(func.sum(entry_cost(entry)), 0.0),
+        lambda value: round(float(value), 2),
+    ),
+    "entries": PivotField("Registrazioni", lambda entry: func.count(entry.id), int),
+}
+
+
+@dataclass
+class Pivot:
+    """Grouped measures keyed by row and column dimension values.
+
+    ``cells`` maps ``(row_key, column_key)`` to ``{measure: value}``; missing
+    combinations had no entries. Totals are summed from the cells, which is exact
+    because every measure is additive.
+    """
+
+    rows: tuple[str, ...]
+    columns: tuple[str, ...]
+    measures: tuple[str, ...]
+    row_keys: list[tuple[Any, ...]]
+    column_keys: list[tuple[Any, ...]]
+    cells: dict[tuple[tuple[Any, ...], tuple[Any, ...]], dict[str, Any]]
+    totals: bool = True
+
+    def _sum(self, cells: Iterable[dict[str, Any]]) -> dict[str, Any]:
+        total = dict.fromkeys(self.measures, 0)
+        for cell in cells:
+            for measure in self.measures:
+                total[measure] += cell[measure]
+        if "cost" in total:
+            total["cost"] = round(total["cost"], 2)
+        return total
+
+    def row_total(self, row_key: tuple[Any, ...]) -> dict[str, Any]:
+        return self._sum(
+            cell for (key, _), cell in self.cells.items() if key == row_key
+        )
+
+    def column_total(self, column_key: tuple[Any, ...]) -> dict[str, Any]:
+        return self._sum(
+            cell for (_, key), cell in self.cells.items() if key == column_key
+        )
+
+    def grand_total(self) -> dict[str, Any]:
+        return self._sum(self.cells.values())
+
+    def to_dict(self) -> dict[str, Any]:
+        payload: dict[str, Any] = {
+            "rows": list(self.rows),
+            "columns": list(self.columns),
+            "measures": list(self.measures),
+            "column_keys": [list(key) for key in self.column_keys],
+            "data": [],
+        }
+        for row_key in self.row_keys:
+            row: dict[str, Any] = {
+                "key": list(row_key),
+                "values": [
+                    self.cells.get((row_key, column_key))
+                    for column_key in self.column_keys
+                ],
+            }
+            if self.totals:
+                row["total"] = self.row_total(row_key)
+            payload["data"].append(row)
+        if self.totals:
+            payload["column_totals"] = [
+                self.column_total(key) for key in self.column_keys
+            ]
+            payload["grand_total"] = self.grand_total()
+        return payload
+
+    def to_csv(self) -> str:
+        def _heading(column_key: tuple[Any, ...], measure: str) -> str:
+            label = PIVOT_MEASURES[measure].label
+            if not column_key:
+                return label
+            return " / ".join(str(part) for part in column_key) + f" - {label}"
+
+        def _values(cell: dict[str, Any] | None) -> list[Any]:
+            return ["" if cell is None else cell[measure] for measure in self.measures]
+
+        with_row_totals = self.totals and bool(self.columns)
+        buffer = StringIO()
+        writer = csv.writer(buffer)
+        header = [PIVOT_DIMENSIONS[name].label for name in self.rows]
+        for column_key in self.column_keys:
+            header.extend(_heading(column_key, measure) for measure in self.measures)
+        if with_row_totals:
+            header.extend(_heading(("Totale",), measure) for measure in self.measures)
+        writer.writerow(header)
+
+        for row_key in self.row_keys:
+            line = ["" if part is None else part for part in row_key]
+            for column_key in self.column_keys:
+                line.extend(_values(self.cells.get((row_key, column_key))))
+            if with_row_totals:
+                line.extend(_values(self.row_total(row_key)))
+            writer.writerow(line)
+
+        if self.totals:
+            line = ["Totale"] + [""] * (len(self.rows) - 1)
+            for column_key in self.column_keys:
+                line.extend(_values(self.column_total(column_key)))
+            if with_row_totals:
+                line.extend(_values(self.grand_total()))
+            writer.writerow(line)
+        return buffer.getvalue()
+
+
+def _pivot_fields(
+    names: Iterable[str], registry: dict[str, PivotField], kind: str
+) -> tuple[str, ...]:
+    names = tuple(names)
+    unknown = [name for name in names if name not in registry]
+    if unknown:
+        raise PivotSpecError(f"unknown pivot {kind}: {', '.join(unknown)}")
+    return names
+
+
+def pivot(
+    filters: TimesheetFilters,
+    rows: Iterable[str],
+    columns: Iterable[str] = (),
+    measures: Iterable[str] = ("hours",),
+    *,
+    totals: bool = True,
+) -> Pivot:
+    """Aggregate the entries matching ``filters`` by ``rows`` x ``columns``.
+
+    All dimensions go into one ``GROUP BY`` over the same filtered join the
+    timesheet uses, so any breakdown costs a single grouped query; row/column
+    totals and the grand total are summed from its result.
+    """
+
+    rows = _pivot_fields(rows, PIVOT_DIMENSIONS, "dimension")
+    columns = _pivot_fields(columns, PIVOT_DIMENSIONS, "dimension")
+    measures = _pivot_fields(measures, PIVOT_MEASURES, "measure") or ("hours",)
+    if not rows and not columns:
+        raise PivotSpecError("a pivot needs at least one dimension")
+
+    entry = _entry_source(filters)
+    matches = _note_matches(filters, entry)
+    dimensions = rows + columns
+    keys = [
+        PIVOT_DIMENSIONS[name].expression(entry).label(f"d{index}")
+        for index, name in enumerate(dimensions)
+    ]
+    values = [PIVOT_MEASURES[name].expression(entry).label(name) for name in measures]
+    stmt = select(*keys, *values).select_from(entry)
+    stmt = _apply_filters(stmt, filters, entry, matches)
+    if "cost" in measures:
+        stmt = join_rates(stmt, entry)
+    stmt = stmt.group_by(*keys)
+
+    formatters = [PIVOT_DIMENSIONS[name].formatter for name in dimensions]
+    row_keys: dict[tuple[Any, ...], None] = {}
+    column_keys: dict[tuple[Any, ...], None] = {}
+    cells: dict[tuple[tuple[Any, ...], tuple[Any, ...]], dict[str, Any]] = {}
+    for record in db.session.execute(stmt):
+        key = tuple(
+            formatter(value) if formatter else value
+            for formatter, value in zip(formatters, record, strict=False)
+        )
+        row_key, column_key = key[: len(rows)], key[len(rows) :]
+        row_keys.setdefault(row_key, None)
+        column_keys.setdefault(column_key, None)
+        cells[row_key, column_key] = {
+            name: PIVOT_MEASURES[name].formatter(value)
+            for name, value in zip(measures, record[len(keys) :], strict=True)
+        }
+
+    return Pivot(
+        rows=rows,
+        columns=columns,
+        measures=measures,
+        row_keys=sorted(row_keys, key=_sort_key),
+        column_keys=sorted(column_keys, key=_sort_key),
+        cells=cells,
+        totals=totals,
+    )
+
+
+def _sort_key(key: tuple[Any, ...]) -> tuple[Any, ...]:
+    # NULL dimension values (no client, no country) sort last.
+    return tuple((part is None, "" if part is None else part) for part in key)
+
+
+def _shift_date(column: Any, days: int) -> Any:
+    """SQL expression for ``column`` moved by ``days`` days (SQLite ``date()``)."""
+
+    if not days:
+        return column
+    return func.date(column, f"{days:+d} days")
+
+
+def _copy_conflict(shift_days: int) -> Any:
+    """``EXISTS`` for a ``TimeEntry`` row whose copy ``shift_days`` later clashes.
+
+    A timed copy clashes with an overlapping timed entry of the same person on
+    the target day (the :func:`ensure_no_overlap` rule); a copy without times
+    with an untimed entry of the same person and project.
+    """
+
+    existing = aliased(TimeEntry)
+    timed = and_(
+        TimeEntry.start_time.is_not(None),
+        TimeEntry.end_time.is_not(None),
+        existing.start_time.is_not(None),
+        existing.end_time.is_not(None),
+        existing.start_time < TimeEntry.end_time,
+        existing.end_time > TimeEntry.start_time,
+    )
+    untimed = and_(
+        TimeEntry.start_time.is_(None),
+        existing.start_time.is_(None),
+        existing.project_id == TimeEntry.project_id,
+    )
+    return (
+        exists()
+        .where(
+            existing.person_id == TimeEntry.person_id,
+            existing.date == _shift_date(TimeEntry.date, shift_days),
+            or_(timed, untimed),
+        )
+        .correlate(TimeEntry)
+    )
+
+
+_COPIED_COLUMNS = [
+    "project_id",
+    "person_id",
+    "date",
+    "start_time",
+    "end_time",
+    "duration_hours",
+    "notes",
+    "created_at",
+]
+
+
+def _owned_entries(entry_ids: Iterable[int], owner_id: int | None) -> list[Any]:
+    """WHERE clauses selecting ``entry_ids``, restricted to ``owner_id`` if given."""
+
+    clauses: list[Any] = [TimeEntry.id.in_(list(entry_ids))]
+    if owner_id is not None:
+        clauses.append(TimeEntry.person_id == owner_id)
+    return clauses
+
+
+def _ensure_entries_open(
+    entry_ids: list[int], owner_id: int | None, *, shift_days: int = 0
+) -> None:
+    """Raise :class:`ValidationProblem` if an entry (or its shifted copy) is closed."""
+
+    days = set(
+        db.session.execute(
+            select(TimeEntry.date).where(*_owned_entries(entry_ids, owner_id))
+        ).scalars()
+    )
+    ensure_period_open(*days, *(day + timedelta(days=shift_days) for day in days))
+
+
+def bulk_delete_entries(entry_ids: Iterable[int], *, owner_id: int | None) -> int:
+    """Delete the selected entries with one statement; returns the deleted count.
+
+    ``owner_id`` limits the statement to that person's entries (non-admin users);
+    ids belonging to someone else are silently ignored. Entries of closed months
+    raise :class:`ValidationProblem`, as in the other bulk actions.
+    """
+
+    entry_ids = list(entry_ids)
+    _ensure_entries_open(entry_ids, owner_id)
+    result = db.session.execute(
+        delete(TimeEntry).where(*_owned_entries(entry_ids, owner_id))
+    )
+    return result.rowcount
+
+
+@dataclass
+class DuplicateResult:
+    copied: int
+    skipped: int
+
+
+def bulk_duplicate_entries(
+    entry_ids: Iterable[int], *, owner_id: int | None, shift_days: int = 0
+) -> DuplicateResult:
+    """Copy the selected entries ``shift_days`` days later with one ``INSERT ... SELECT``.
+
+    Copies that would clash with an entry already on the target day are skipped
+    and counted, with the same rule as :func:`copy_week`. The shift is optional;
+    on the same day each copy clashes with its own original and is skipped.
+    """
+
+    entry_ids = list(entry_ids)
+    _ensure_entries_open(entry_ids, owner_id, shift_days=shift_days)
+    owned = _owned_entries(entry_ids, owner_id)
+    conflict = _copy_conflict(shift_days)
+
+    total, skipped = db.session.execute(
+        select(
+            func.count(TimeEntry.id),
+            func.coalesce(func.sum(case((conflict, 1), else_=0)), 0),
+        ).where(*owned)
+    ).one()
+    if total == skipped:
+        return DuplicateResult(copied=0, skipped=skipped)
+
+    source = select(
+        TimeEntry.project_id,
+        TimeEntry.person_id,
+        _shift_date(TimeEntry.date, shift_days),
+        TimeEntry.start_time,
+        TimeEntry.end_time,
+        TimeEntry.duration_hours,
+        TimeEntry.notes,
+        literal(datetime.now(UTC), DateTime),
+    ).where(*owned, ~conflict)
+
+    result = db.session.execute(insert(TimeEntry).from_select(_COPIED_COLUMNS, source))
+    return DuplicateResult(copied=result.rowcount, skipped=skipped)
+
+
+def bulk_reassign_project(
+    entry_ids: Iterable[int], project_id: int, *, owner_id: int | None
+) -> int:
+    """Move the selected entries to ``project_id`` with one ``UPDATE``."""
+
+    entry_ids = list(entry_ids)
+    _ensure_entries_open(entry_ids, owner_id)
+    result = db.session.execute(
+        update(TimeEntry)
+        .where(*_owned_entries(entry_ids, owner_id))
+        .values(project_id=project_id)
+        .execution_options(synchronize_session=False)
     )
+    return result.rowcount
 
 
-def compute_total_cost(entries: Iterable[TimeEntry]) -> float:
-    total = 0.0
-    for entry in entries:
-        if entry.person.hourly_rate:
-            total += float(entry.person.hourly_rate) * entry.duration_hours
-    return round(total, 2)
+def week_start(day: date) -> date:
+    """Return the Monday of the ISO week containing ``day``."""
+
+    return day - timedelta(days=day.weekday())
+
+
+@dataclass
+class WeekCopyResult:
+    source_week: date
+    target_week: date
+    copied: int
+    skipped: int
+    dry_run: bool
+
+
+def copy_week(
+    source_day: date,
+    target_day: date,
+    *,
+    person_id: int | None = None,
+    dry_run: bool = False,
+) -> WeekCopyResult:
+    """Clone the entries of one week into another with a single ``INSERT ... SELECT``.
+
+    ``person_id`` restricts the copy to one person; ``None`` copies the whole team.
+    Entries of inactive projects or people are not copied. A source entry is
+    skipped when the target day already holds an overlapping timed entry for the
+    same person, or, for entries without times, an entry on the same project;
+    running the copy twice is therefore a no-op. With ``dry_run`` only the counts
+    are computed. A target week touching a closed month raises
+    :class:`ValidationProblem`. The caller owns the transaction.
+    """
+
+    source_week = week_start(source_day)
+    target_week = week_start(target_day)
+    shift = (target_week - source_week).days
+    ensure_period_open(target_week, target_week + timedelta(days=6))
+
+    conflict = _copy_conflict(shift)
+
+    criteria = [
+        TimeEntry.date >= source_week,
+        TimeEntry.date < source_week + timedelta(days=7),
+        Project.is_active.is_(True),
+        Person.is_active.is_(True),
+    ]
+    if person_id is not None:
+        criteria.append(TimeEntry.person_id == person_id)
+
+    def _source(*columns: Any) -> Any:
+        return (
+            select(*columns)
+            .join(TimeEntry.project)
+            .join(TimeEntry.person)
+            .where(*criteria)
+        )
+
+    total, skipped = db.session.execute(
+        _source(
+            func.count(TimeEntry.id),
+            func.coalesce(func.sum(case((conflict, 1), else_=0)), 0),
+        )
+    ).one()
+
+    copied = total - skipped
+    if not dry_run and copied:
+        result = db.session.execute(
+            insert(TimeEntry).from_select(
+                _COPIED_COLUMNS,
+                _source(
+                    TimeEntry.project_id,
+                    TimeEntry.person_id,
+                    _shift_date(TimeEntry.date, shift),
+                    TimeEntry.start_time,
+                    TimeEntry.end_time,
+                    TimeEntry.duration_hours,
+                    TimeEntry.notes,
+                    literal(datetime.now(UTC), DateTime),
+                ).where(~conflict),
+            )
+        )
+        copied = result.rowcount
+
+    return WeekCopyResult(
+        source_week=source_week,
+        target_week=target_week,
+        copied=copied,
+        skipped=skipped,
+        dry_run=dry_run,
+    )
 
 
 __all__ = [
+    "PIVOT_DIMENSIONS",
+    "PIVOT_MEASURES",
+    "DuplicateResult",
+    "EntryRow",
+    "Pivot",
+    "PivotField",
+    "PivotSpecError",
     "TimesheetFilters",
+    "WeekCopyResult",
+    "bulk_delete_entries",
+    "bulk_duplicate_entries",
+    "bulk_reassign_project",
+    "compute_total_cost",
+    "copy_week",
     "default_period",
     "get_dashboard_data",
     "get_timesheet_entries",
-    "compute_total_cost",
+    "get_timesheet_rows",
+    "pivot",
+    "previous_period",
+    "timesheet_rows_statement",
+    "week_start",
 ]
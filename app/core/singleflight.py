@@ -0,0 +1,139 @@
+"""Coalesce concurrent identical computations into a single execution.
+
+When several requests ask for the same expensive result at the same time (a team
+opening the same dashboard range), the first caller computes it and the others
+wait for that result instead of running the same queries again. Nothing is
+cached: once the computation finishes the key is forgotten.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import Counter
+from collections.abc import Callable, Hashable
+from dataclasses import astuple, dataclass, field
+from typing import Any, TypeVar
+
+from flask import current_app
+
+from ..metrics import SINGLE_FLIGHT_CALLS
+
+T = TypeVar("T")
+
+
+@dataclass
+class _Call:
+    done: threading.Event = field(default_factory=threading.Event)
+    result: Any = None
+    error: BaseException | None = None
+    waiters: int = 0
+
+
+class SingleFlight:
+    """Per-key in-flight de-duplication with wait timeouts and counters.
+
+    Counters are kept per namespace (the first element of the key):
+
+    ``executions``
+        computations actually run;
+    ``coalesced``
+        callers served by another caller's computation;
+    ``timeouts``
+        callers that stopped waiting and computed the result themselves;
+    ``errors``
+        computations that raised (waiters re-raise the same exception).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+        self._stats: dict[str, Counter[str]] = {}
+
+    def _count(self, key: Hashable, event: str) -> None:
+        namespace = str(key[0] if isinstance(key, tuple) and key else key)
+        with self._lock:
+            self._stats.setdefault(namespace, Counter())[event] += 1
+        SINGLE_FLIGHT_CALLS.inc(namespace=namespace, event=event)
+
+    def do(self, key: Hashable, fn: Callable[[], T], *, timeout: float = 30.0) -> T:
+        """Return ``fn()``, sharing the result with concurrent callers of ``key``.
+
+        A waiter gives up after ``timeout`` seconds and runs ``fn`` itself.
+        """
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+        assert call is not None
+
+        if not leader:
+            if call.done.wait(timeout):
+                self._count(key, "coalesced")
+                if call.error is not None:
+                    raise call.error
+                return call.result
+            self._count(key, "timeouts")
+            return fn()
+
+        self._count(key, "executions")
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as exc:
+            call.error = exc
+            self._count(key, "errors")
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def waiting(self) -> int:
+        """Callers currently waiting on another caller's computation."""
+
+        with self._lock:
+            return sum(call.waiters for call in self._calls.values())
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Snapshot of the counters, by namespace."""
+
+        with self._lock:
+            return {name: dict(counter) for name, counter in self._stats.items()}
+
+
+def filters_key(namespace: str, filters: Any) -> tuple[Any, ...]:
+    """Hashable key for a filters dataclass; free-text search is normalised."""
+
+    values = tuple(
+        " ".join(value.casefold().split()) if isinstance(value, str) else value
+        for value in astuple(filters)
+    )
+    return (namespace, *values)
+
+
+def coalesce(namespace: str, filters: Any, fn: Callable[[], T]) -> T:  # noqa: UP047
+    """Run ``fn`` through the application's :class:`SingleFlight`, if enabled.
+
+    The result is shared between requests, so it must be treated as read-only.
+    """
+
+    config = current_app.config
+    flights: SingleFlight | None = current_app.extensions.get("single_flight")
+    if flights is None or not config["SINGLE_FLIGHT_ENABLED"]:
+        return fn()
+    return flights.do(
+        filters_key(namespace, filters),
+        fn,
+        timeout=float(config["SINGLE_FLIGHT_TIMEOUT"]),
+    )
+
+
+__all__ = ["SingleFlight", "coalesce", "filters_key"]
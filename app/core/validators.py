@@ -5,6 +5,7 @@ from __future__ import annotations
 from datetime import date, datetime, time
 
 from ..models import Person, Project, TimeEntry
+from .periods import closed_among
 
 
 class ValidationProblem(ValueError):
@@ -76,9 +77,21 @@ def ensure_no_overlap(
             )
 
 
+def ensure_period_open(*days: date) -> None:
+    """Refuse changes to entries dated in a closed payroll month."""
+
+    closed = closed_among(set(days))
+    if closed:
+        raise ValidationProblem(
+            f"Il mese {closed[0]:%m/%Y} è chiuso: le registrazioni non sono "
+            "modificabili."
+        )
+
+
 __all__ = [
     "ValidationProblem",
-    "ensure_entities_active",
     "compute_duration",
+    "ensure_entities_active",
     "ensure_no_overlap",
+    "ensure_period_open",
 ]
@@ -0,0 +1,83 @@
+"""Per-table data versions used to validate cached responses.
+
+Every ORM write (unit-of-work flushes as well as bulk ``insert``/``update``/
+``delete`` statements) bumps the counter of the tables it touches inside the same
+transaction, so a reader can tell whether anything changed with one tiny query.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import Any
+
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.orm import ORMExecuteState, Session, UOWTransaction
+
+from ..extensions import db
+from ..models import DataVersion
+
+_versions = DataVersion.__table__
+
+
+def bump_versions(session: Session, tables: Iterable[str]) -> None:
+    connection = session.connection()
+    for name in sorted(set(tables)):
+        result = connection.execute(
+            update(_versions)
+            .where(_versions.c.name == name)
+            .values(version=_versions.c.version + 1)
+        )
+        if not result.rowcount:
+            connection.execute(insert(_versions).values(name=name, version=1))
+
+
+def _table_of(obj: Any) -> str | None:
+    table = getattr(obj, "__tablename__", None)
+    return None if table == DataVersion.__tablename__ else table
+
+
+def _after_flush(session: Session, flush_context: UOWTransaction) -> None:
+    dirty = (
+        obj
+        for obj in session.dirty
+        if session.is_modified(obj, include_collections=False)
+    )
+    tables = {
+        table
+        for obj in (*session.new, *dirty, *session.deleted)
+        if (table := _table_of(obj))
+    }
+    if tables:
+        bump_versions(session, tables)
+
+
+def _do_orm_execute(state: ORMExecuteState) -> None:
+    if not (state.is_insert or state.is_update or state.is_delete):
+        return
+    table = getattr(state.statement, "table", None)
+    name = getattr(table, "name", None)
+    if name and name != DataVersion.__tablename__:
+        bump_versions(state.session, [name])
+
+
+def register_version_tracking() -> None:
+    """Install the session listeners (idempotent)."""
+
+    if not event.contains(Session, "after_flush", _after_flush):
+        event.listen(Session, "after_flush", _after_flush)
+        event.listen(Session, "do_orm_execute", _do_orm_execute)
+
+
+def data_version(*tables: str) -> str:
+    """Return a compact token that changes whenever any of ``tables`` is written."""
+
+    rows = db.session.execute(
+        select(_versions.c.name, _versions.c.version).where(
+            _versions.c.name.in_(tables)
+        )
+    ).all()
+    versions = dict(rows)
+    return ".".join(str(versions.get(name, 0)) for name in tables)
+
+
+__all__ = ["bump_versions", "data_version", "register_version_tracking"]
@@ -5,10 +5,12 @@ from __future__ import annotations
 from datetime import date
 
 from flask_wtf import FlaskForm
+from flask_wtf.file import FileAllowed, FileField, FileRequired
 from wtforms import (
     BooleanField,
     DateField,
     DecimalField,
+    IntegerField,
     PasswordField,
     SelectField,
     StringField,
@@ -144,6 +146,7 @@ class PersonEditForm(FlaskForm):
         validators=[Optional(), NumberRange(min=0)],
         places=2,
     )
+    rate_effective_from = DateField("Tariffa valida dal", validators=[Optional()])
     is_active = BooleanField("Attivo")
     role = SelectField(
         "Ruolo",
@@ -178,4 +181,56 @@ class FilterForm(FlaskForm):
     project_id = SelectField("Progetto", coerce=int, validators=[Optional()])
     person_id = SelectField("Persona", coerce=int, validators=[Optional()])
     include_inactive = BooleanField("Includi inattivi")
+    search = StringField("Cerca nelle note", validators=[Optional(), Length(max=200)])
     submit = SubmitField("Applica filtri")
+
+
+class BulkEntryActionForm(FlaskForm):
+    action = SelectField(
+        "Azione",
+        choices=[
+            ("delete", "Elimina selezionate"),
+            ("duplicate", "Duplica selezionate"),
+            ("reassign", "Sposta su progetto"),
+        ],
+        validators=[DataRequired()],
+    )
+    shift_days = IntegerField(
+        "Sposta di (giorni)",
+        default=0,
+        validators=[Optional(), NumberRange(min=-366, max=366)],
+    )
+    target_project_id = SelectField("Progetto", coerce=int, validators=[Optional()])
+    submit = SubmitField("Applica")
+
+
+class CopyWeekForm(FlaskForm):
+    source_week = DateField("Settimana di origine", validators=[DataRequired()])
+    target_week = DateField("Settimana di destinazione", validators=[DataRequired()])
+    person_id = SelectField("Persona", coerce=int, validators=[Optional()])
+    dry_run = BooleanField("Solo anteprima", default=True)
+    submit = SubmitField("Copia settimana")
+
+
+class DeleteRecordForm(FlaskForm):
+    policy = SelectField(
+        "Registrazioni collegate",
+        choices=[
+            ("block", "Elimina solo se non ci sono registrazioni"),
+            ("archive", "Esporta in CSV ed elimina le registrazioni"),
+            ("reassign", "Sposta le registrazioni su"),
+        ],
+        default="block",
+        validators=[DataRequired()],
+    )
+    target_id = SelectField("Destinazione", coerce=int, validators=[Optional()])
+    submit = SubmitField("Elimina")
+
+
+class PeopleImportForm(FlaskForm):
+    csv_file = FileField(
+        "File CSV",
+        validators=[FileRequired(), FileAllowed(["csv"], "Caricare un file CSV")],
+    )
+    dry_run = BooleanField("Solo verifica", default=True)
+    submit = SubmitField("Importa")
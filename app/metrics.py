@@ -0,0 +1,440 @@
+"""In-process metrics with Prometheus text exposition.
+
+Recording is lock-free: every thread accumulates into its own shard and a scrape
+sums the shards. Shards of finished threads are folded into a retired shard on
+the next scrape, so short-lived request threads do not accumulate.
+
+With ``METRICS_MULTIPROC_DIR`` set, every worker process periodically writes its
+snapshot to ``<dir>/<pid>.json`` and a scrape merges all files, so any worker can
+answer for the whole deployment. Counters and histograms of exited workers are
+kept; their gauges are dropped.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from collections.abc import Callable, Iterable, Sequence
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any
+
+from flask import Flask, g, request
+from flask.typing import ResponseReturnValue
+from sqlalchemy import Engine, event
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1, 5)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+ROW_BUCKETS = (10, 100, 1_000, 10_000, 100_000, 1_000_000)
+HASH_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.2, 0.5, 1, 2)
+
+Labels = tuple[tuple[str, str], ...]
+Sample = tuple[str, Labels]
+
+
+class Metric:
+    def __init__(
+        self,
+        registry: Registry,
+        name: str,
+        help_text: str,
+        kind: str,
+        buckets: Sequence[float] = (),
+    ) -> None:
+        self.registry = registry
+        self.name = name
+        self.help = help_text
+        self.kind = kind
+        self.buckets = tuple(buckets)
+
+    def _key(self, labels: dict[str, Any]) -> Sample:
+        return self.name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class Counter(Metric):
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        shard = self.registry.shard()
+        key = self._key(labels)
+        shard[key] = shard.get(key, 0.0) + amount
+
+
+class Histogram(Metric):
+    def observe(self, value: float, **labels: Any) -> None:
+        shard = self.registry.shard()
+        key = self._key(labels)
+        slots = shard.get(key)
+        if slots is None:
+            # One slot per bucket plus +Inf, then sum and count.
+            slots = shard[key] = [0.0] * (len(self.buckets) + 3)
+        slots[bisect_left(self.buckets, value)] += 1
+        slots[-2] += value
+        slots[-1] += 1
+
+
+def _merge(target: dict[Sample, Any], source: dict[Sample, Any]) -> None:
+    for key, value in source.items():
+        if isinstance(value, list):
+            current = target.get(key)
+            if current is None:
+                target[key] = list(value)
+            else:
+                for index, amount in enumerate(value):
+                    current[index] += amount
+        else:
+            target[key] = target.get(key, 0.0) + value
+
+
+class Registry:
+    def __init__(self) -> None:
+        self.metrics: dict[str, Metric] = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards: list[tuple[weakref.ref[threading.Thread], dict]] = []
+        self._retired: dict[Sample, Any] = {}
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        return self._add(Counter(self, name, help_text, "counter"))
+
+    def histogram(
+        self, name: str, help_text: str, buckets: Sequence[float]
+    ) -> Histogram:
+        return self._add(Histogram(self, name, help_text, "histogram", buckets))
+
+    def gauge(self, name: str, help_text: str) -> Metric:
+        """Declare a gauge; its values are read at scrape time by a collector."""
+
+        return self._add(Metric(self, name, help_text, "gauge"))
+
+    def _add(self, metric: Any) -> Any:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def shard(self) -> dict[Sample, Any]:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append((weakref.ref(threading.current_thread()), shard))
+        return shard
+
+    def snapshot(self) -> dict[Sample, Any]:
+        """Counters and histograms of this process, summed over threads."""
+
+        with self._lock:
+            alive = []
+            for thread_ref, shard in self._shards:
+                thread = thread_ref()
+                if thread is None or not thread.is_alive():
+                    _merge(self._retired, shard.copy())
+                else:
+                    alive.append((thread_ref, shard))
+            self._shards = alive
+            total: dict[Sample, Any] = {}
+            _merge(total, self._retired)
+            for _, shard in alive:
+                _merge(total, shard.copy())
+        return total
+
+
+registry = Registry()
+
+REQUEST_SECONDS = registry.histogram(
+    "http_request_duration_seconds",
+    "Request latency by blueprint and endpoint.",
+    LATENCY_BUCKETS,
+)
+REQUEST_QUERIES = registry.histogram(
+    "http_request_db_queries",
+    "SQL statements executed per request.",
+    COUNT_BUCKETS,
+)
+QUERY_SECONDS = registry.histogram(
+    "db_query_duration_seconds", "SQL statement execution time.", QUERY_BUCKETS
+)
+CACHE_REQUESTS = registry.counter(
+    "cache_requests_total", "Cache lookups by cache and result (hit/miss)."
+)
+EXPORT_ROWS = registry.histogram(
+    "export_rows", "Rows written per CSV export.", ROW_BUCKETS
+)
+PASSWORD_HASH_SECONDS = registry.histogram(
+    "password_hash_duration_seconds",
+    "Password hashing/verification time by operation.",
+    HASH_BUCKETS,
+)
+ADMISSION_EVENTS = registry.counter(
+    "admission_events_total", "Admission decisions per class."
+)
+ADMISSION_WAIT_SECONDS = registry.counter(
+    "admission_wait_seconds_total", "Time spent queueing per admission class."
+)
+SINGLE_FLIGHT_CALLS = registry.counter(
+    "single_flight_calls_total", "Coalescing outcomes per namespace and event."
+)
+registry.gauge("db_pool_connections", "Connection pool usage by state.")
+registry.gauge("admission_requests", "Requests running or queued per class.")
+registry.gauge("admission_wait_seconds_max", "Longest queue wait per admission class.")
+
+_request_queries: ContextVar[list[int] | None] = ContextVar(
+    "request_queries", default=None
+)
+
+
+def _query_started(conn: Any, *_args: Any) -> None:
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _query_finished(conn: Any, *_args: Any) -> None:
+    started = conn.info.get("query_started")
+    if started:
+        QUERY_SECONDS.observe(time.perf_counter() - started.pop())
+    counter = _request_queries.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+def time_password_hash(operation: str, fn: Callable[[], Any]) -> Any:
+    started = time.perf_counter()
+    try:
+        return fn()
+    finally:
+        PASSWORD_HASH_SECONDS.observe(
+            time.perf_counter() - started, operation=operation
+        )
+
+
+# -- multi-process aggregation ------------------------------------------------
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+Collected = Iterable[tuple[str, dict[str, Any], float]]
+
+
+def collect_gauges(app: Flask) -> dict[Sample, float]:
+    """Values read at scrape time: pool usage and admission queues."""
+
+    return {
+        (name, tuple(sorted((k, str(v)) for k, v in labels.items()))): float(value)
+        for name, labels, value in _app_values(app)
+    }
+
+
+def write_process_file(directory: Path, app: Flask) -> None:
+    """Atomically write this process' snapshot to ``<directory>/<pid>.json``."""
+
+    directory.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "samples": [
+            [name, list(labels), value]
+            for (name, labels), value in registry.snapshot().items()
+        ],
+        "gauges": [
+            [name, list(labels), value]
+            for (name, labels), value in collect_gauges(app).items()
+        ],
+    }
+    handle, temp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(handle, "w") as stream:
+        json.dump(payload, stream)
+    os.replace(temp, directory / f"{os.getpid()}.json")
+
+
+def read_process_files(directory: Path) -> tuple[dict, dict]:
+    samples: dict[Sample, Any] = {}
+    gauges: dict[Sample, float] = {}
+    for path in directory.glob("*.json"):
+        try:
+            payload = json.loads(path.read_text())
+            pid = int(path.stem)
+        except (OSError, ValueError):
+            continue
+        _merge(
+            samples,
+            {
+                (name, tuple(map(tuple, labels))): value
+                for name, labels, value in payload["samples"]
+            },
+        )
+        if _pid_alive(pid):
+            for name, labels, value in payload["gauges"]:
+                key = (name, tuple(sorted([*map(tuple, labels), ("pid", str(pid))])))
+                gauges[key] = value
+    return samples, gauges
+
+
+# -- exposition ---------------------------------------------------------------
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: Iterable[tuple[str, str]]) -> str:
+    pairs = [f'{key}="{_escape(value)}"' for key, value in labels]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def render(samples: dict[Sample, Any], gauges: dict[Sample, float]) -> str:
+    by_name: dict[str, list[tuple[Labels, Any]]] = {}
+    for (name, labels), value in [*samples.items(), *gauges.items()]:
+        by_name.setdefault(name, []).append((labels, value))
+
+    lines: list[str] = []
+    for name in sorted(by_name):
+        metric = registry.metrics.get(name)
+        kind = metric.kind if metric else "untyped"
+        lines.append(f"# HELP {name} {metric.help if metric else ''}".rstrip())
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in sorted(by_name[name]):
+            if kind != "histogram":
+                lines.append(f"{name}{_labels(labels)} {_number(value)}")
+                continue
+            cumulative = 0.0
+            bounds = [*metric.buckets, math.inf]
+            for bound, amount in zip(bounds, value[:-2], strict=True):
+                cumulative += amount
+                bucket_labels = (*labels, ("le", _number(bound)))
+                lines.append(
+                    f"{name}_bucket{_labels(bucket_labels)} {_number(cumulative)}"
+                )
+            lines.append(f"{name}_sum{_labels(labels)} {_number(value[-2])}")
+            lines.append(f"{name}_count{_labels(labels)} {_number(value[-1])}")
+    return "\n".join(lines) + "\n"
+
+
+def exposition(app: Flask) -> str:
+    directory = app.config.get("METRICS_MULTIPROC_DIR")
+    if directory:
+        write_process_file(Path(directory), app)
+        samples, gauges = read_process_files(Path(directory))
+    else:
+        samples, gauges = registry.snapshot(), collect_gauges(app)
+    return render(samples, gauges)
+
+
+# -- Flask integration ----------------------------------------------------------
+
+
+def _app_values(app: Flask) -> Collected:
+    from .extensions import db
+
+    pool = db.engine.pool
+    for state, method in (
+        ("checked_out", "checkedout"),
+        ("checked_in", "checkedin"),
+        ("overflow", "overflow"),
+        ("size", "size"),
+    ):
+        if hasattr(pool, method):
+            yield "db_pool_connections", {"state": state}, getattr(pool, method)()
+
+    admission = app.extensions.get("admission")
+    for name, stats in (admission.stats() if admission else {}).items():
+        for state in ("active", "waiting"):
+            yield (
+                "admission_requests",
+                {"class": name, "state": state},
+                getattr(stats, state),
+            )
+        yield "admission_wait_seconds_max", {"class": name}, stats.wait_seconds_max
+
+
+def _start_request() -> None:
+    g.metrics_started = time.perf_counter()
+    g.metrics_queries = _request_queries.set([0])
+
+
+def _record_status(response: Any) -> Any:
+    g.metrics_status = response.status_code
+    return response
+
+
+def _finish_request(exc: BaseException | None) -> None:
+    # A teardown hook, so requests that end in an unhandled exception (and
+    # never reach after_request) are observed as 5xx too.
+    started = g.pop("metrics_started", None)
+    token = g.pop("metrics_queries", None)
+    status = g.pop("metrics_status", None)
+    if token is not None:
+        queries = _request_queries.get()[0]
+        _request_queries.reset(token)
+    if started is None or request.endpoint == "metrics.metrics":
+        return
+    if exc is not None or status is None:
+        status = 500
+    endpoint = request.endpoint or "unmatched"
+    REQUEST_SECONDS.observe(
+        time.perf_counter() - started,
+        blueprint=request.blueprint or "",
+        endpoint=endpoint,
+        method=request.method,
+        status=f"{status // 100}xx",
+    )
+    if token is not None:
+        REQUEST_QUERIES.observe(queries, endpoint=endpoint)
+    _maybe_flush()
+
+
+_last_flush = 0.0
+
+
+def _maybe_flush() -> None:
+    global _last_flush
+    from flask import current_app
+
+    directory = current_app.config.get("METRICS_MULTIPROC_DIR")
+    now = time.monotonic()
+    if directory and now - _last_flush >= current_app.config["METRICS_FLUSH_INTERVAL"]:
+        _last_flush = now
+        write_process_file(Path(directory), current_app._get_current_object())
+
+
+def init_metrics(app: Flask) -> None:
+    if not app.config["METRICS_ENABLED"]:
+        return
+    if not event.contains(Engine, "before_cursor_execute", _query_started):
+        event.listen(Engine, "before_cursor_execute", _query_started)
+        event.listen(Engine, "after_cursor_execute", _query_finished)
+    app.before_request(_start_request)
+    app.after_request(_record_status)
+    app.teardown_request(_finish_request)
+
+
+def metrics_response(app: Flask) -> ResponseReturnValue:
+    return exposition(app), 200, {"Content-Type": "text/plain; version=0.0.4"}
+
+
+__all__ = [
+    "ADMISSION_EVENTS",
+    "ADMISSION_WAIT_SECONDS",
+    "CACHE_REQUESTS",
+    "EXPORT_ROWS",
+    "SINGLE_FLIGHT_CALLS",
+    "init_metrics",
+    "metrics_response",
+    "registry",
+    "render",
+    "time_password_hash",
+]
@@ -6,7 +6,7 @@ from datetime import date, datetime, time, timedelta
 import secrets
 
 from flask_login import UserMixin
-from sqlalchemy import CheckConstraint, ForeignKey
+from sqlalchemy import CheckConstraint, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from werkzeug.security import check_password_hash, generate_password_hash
 
@@ -21,7 +21,29 @@ class TimestampMixin:
     )
 
 
-class Project(TimestampMixin, db.Model):
+class ActivityCountersMixin:
+    """Denormalised time entry counters, maintained by database triggers.
+
+    See :mod:`app.core.counters`; ``flask reconcile-counters`` repairs drift.
+    """
+
+    total_hours: Mapped[float] = mapped_column(
+        db.Float, default=0.0, server_default="0", nullable=False, index=True
+    )
+    month_hours: Mapped[float] = mapped_column(
+        db.Float, default=0.0, server_default="0", nullable=False
+    )
+    month_start: Mapped[date | None] = mapped_column(db.Date)
+    last_entry_date: Mapped[date | None] = mapped_column(db.Date, index=True)
+
+    @property
+    def hours_this_month(self) -> float:
+        if self.month_start != date.today().replace(day=1):
+            return 0.0
+        return self.month_hours
+
+
+class Project(ActivityCountersMixin, TimestampMixin, db.Model):
     """A client project that can receive tracked time entries."""
 
     __tablename__ = "projects"
@@ -32,13 +54,21 @@ class Project(TimestampMixin, db.Model):
     client: Mapped[str | None] = mapped_column(db.String(120))
     is_active: Mapped[bool] = mapped_column(default=True, nullable=False)
 
-    time_entries: Mapped[list[TimeEntry]] = relationship(back_populates="project")
+    time_entries: Mapped[list[TimeEntry]] = relationship(
+        back_populates="project", passive_deletes=True
+    )
 
     def __repr__(self) -> str:  # pragma: no cover - repr helper
         return f"<Project id={self.id} name={self.name!r}>"
 
 
-class Person(UserMixin, TimestampMixin, db.Model):
+# Case-insensitive indexes so typeahead ``LIKE 'prefix%'`` lookups use an index.
+Index("ix_projects_name_nocase", Project.name.collate("NOCASE"))
+Index("ix_projects_code_nocase", Project.code.collate("NOCASE"))
+Index("ix_projects_client_nocase", Project.client.collate("NOCASE"))
+
+
+class Person(UserMixin, ActivityCountersMixin, TimestampMixin, db.Model):
     """Team member that can log time against projects."""
 
     __tablename__ = "people"
@@ -54,7 +84,9 @@ class Person(UserMixin, TimestampMixin, db.Model):
     reset_token: Mapped[str | None] = mapped_column(db.String(100))
     reset_token_expiry: Mapped[datetime | None] = mapped_column(db.DateTime)
 
-    time_entries: Mapped[list[TimeEntry]] = relationship(back_populates="person")
+    time_entries: Mapped[list[TimeEntry]] = relationship(
+        back_populates="person", passive_deletes=True
+    )
 
     def set_password(self, password: str) -> None:
         self.password_hash = generate_password_hash(password)
@@ -87,12 +119,18 @@ class Person(UserMixin, TimestampMixin, db.Model):
         return f"<Person id={self.id} email={self.email!r}>"
 
 
+Index("ix_people_full_name_nocase", Person.full_name.collate("NOCASE"))
+Index("ix_people_email_nocase", Person.email.collate("NOCASE"))
+
+
 class TimeEntry(TimestampMixin, db.Model):
     """Tracked block of work attributed to a project and person."""
 
     __tablename__ = "time_entries"
     __table_args__ = (
         CheckConstraint("duration_hours > 0", name="ck_time_entries_duration_positive"),
+        Index("ix_time_entries_project_date", "project_id", "date"),
+        Index("ix_time_entries_person_date", "person_id", "date"),
     )
 
     id: Mapped[int] = mapped_column(primary_key=True)
@@ -103,6 +141,9 @@ class TimeEntry(TimestampMixin, db.Model):
     end_time: Mapped[time | None] = mapped_column(db.Time)
     duration_hours: Mapped[float] = mapped_column(db.Float, nullable=False)
     notes: Mapped[str | None] = mapped_column(db.Text)
+    # Frozen when the month is closed with materialised costs; NULL means the
+    # cost is derived from the rate history (see :mod:`app.core.rates`).
+    cost: Mapped[float | None] = mapped_column(db.Float)
 
     project: Mapped[Project] = relationship(back_populates="time_entries")
     person: Mapped[Person] = relationship(back_populates="time_entries")
@@ -119,6 +160,12 @@ class TimeEntry(TimestampMixin, db.Model):
                 raise ValueError(msg)
             self.duration_hours = delta.total_seconds() / 3600
 
+    @property
+    def is_archived(self) -> bool:
+        """Whether the entry was loaded from the archive table (read-only)."""
+
+        return self.id is not None and self.id < 0
+
     def __repr__(self) -> str:  # pragma: no cover - repr helper
         return (
             f"<TimeEntry id={self.id} project_id={self.project_id} "
@@ -126,4 +173,123 @@ class TimeEntry(TimestampMixin, db.Model):
         )
 
 
-__all__ = ["Project", "Person", "TimeEntry"]
+class ArchivedTimeEntry(db.Model):
+    """Closed time entry moved out of the hot ``time_entries`` table.
+
+    Rows keep the primary key they had in ``time_entries`` so the archive can be
+    traced back to the original entry.
+    """
+
+    __tablename__ = "time_entries_archive"
+    __table_args__ = (
+        Index("ix_time_entries_archive_project_id", "project_id"),
+        Index("ix_time_entries_archive_person_id", "person_id"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    project_id: Mapped[int] = mapped_column(ForeignKey("projects.id"), nullable=False)
+    person_id: Mapped[int] = mapped_column(ForeignKey("people.id"), nullable=False)
+    date: Mapped[date] = mapped_column(db.Date, nullable=False, index=True)
+    start_time: Mapped[time | None] = mapped_column(db.Time)
+    end_time: Mapped[time | None] = mapped_column(db.Time)
+    duration_hours: Mapped[float] = mapped_column(db.Float, nullable=False)
+    notes: Mapped[str | None] = mapped_column(db.Text)
+    cost: Mapped[float | None] = mapped_column(db.Float)
+    created_at: Mapped[datetime] = mapped_column(nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(
+        default=datetime.utcnow, nullable=False
+    )
+
+    def __repr__(self) -> str:  # pragma: no cover - repr helper
+        return (
+            f"<ArchivedTimeEntry id={self.id} project_id={self.project_id} "
+            f"person_id={self.person_id}>"
+        )
+
+
+class PersonRate(db.Model):
+    """Hourly rate of a person over ``[effective_from, effective_to)``.
+
+    ``effective_to`` is NULL for the current rate. The periods of one person
+    never overlap; :func:`app.core.rates.set_hourly_rate` keeps them chained.
+    """
+
+    __tablename__ = "person_rates"
+    __table_args__ = (
+        Index(
+            "ix_person_rates_person_from", "person_id", "effective_from", unique=True
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    person_id: Mapped[int] = mapped_column(ForeignKey("people.id"), nullable=False)
+    hourly_rate: Mapped[float | None] = mapped_column(db.Numeric(10, 2))
+    effective_from: Mapped[date] = mapped_column(db.Date, nullable=False)
+    effective_to: Mapped[date | None] = mapped_column(db.Date)
+
+    def __repr__(self) -> str:  # pragma: no cover - repr helper
+        return (
+            f"<PersonRate person_id={self.person_id} rate={self.hourly_rate} "
+            f"from={self.effective_from} to={self.effective_to}>"
+        )
+
+
+class ClosedPeriod(db.Model):
+    """Payroll month whose time entries are frozen (see :mod:`app.core.periods`)."""
+
+    __tablename__ = "closed_periods"
+
+    month: Mapped[date] = mapped_column(db.Date, primary_key=True)
+    closed_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, nullable=False)
+    closed_by_id: Mapped[int | None] = mapped_column(ForeignKey("people.id"))
+
+    def __repr__(self) -> str:  # pragma: no cover - repr helper
+        return f"<ClosedPeriod {self.month:%Y-%m}>"
+
+
+class PeriodSnapshot(db.Model):
+    """Immutable hours per day, project and person of a closed month."""
+
+    __tablename__ = "period_snapshots"
+    __table_args__ = (Index("ix_period_snapshots_month_day", "month", "day"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    month: Mapped[date] = mapped_column(
+        ForeignKey("closed_periods.month"), nullable=False
+    )
+    day: Mapped[date] = mapped_column(db.Date, nullable=False)
+    project_id: Mapped[int] = mapped_column(ForeignKey("projects.id"), nullable=False)
+    person_id: Mapped[int] = mapped_column(ForeignKey("people.id"), nullable=False)
+    hours: Mapped[float] = mapped_column(db.Float, nullable=False)
+    entries: Mapped[int] = mapped_column(nullable=False)
+    cost: Mapped[float] = mapped_column(db.Float, nullable=False)
+
+    def __repr__(self) -> str:  # pragma: no cover - repr helper
+        return (
+            f"<PeriodSnapshot day={self.day} project_id={self.project_id} "
+            f"person_id={self.person_id}>"
+        )
+
+
+class DataVersion(db.Model):
+    """Monotonic change counter per table, bumped in the writing transaction."""
+
+    __tablename__ = "data_versions"
+
+    name: Mapped[str] = mapped_column(db.String(64), primary_key=True)
+    version: Mapped[int] = mapped_column(default=0, nullable=False)
+
+    def __repr__(self) -> str:  # pragma: no cover - repr helper
+        return f"<DataVersion {self.name}={self.version}>"
+
+
+__all__ = [
+    "Project",
+    "Person",
+    "TimeEntry",
+    "ArchivedTimeEntry",
+    "PersonRate",
+    "ClosedPeriod",
+    "PeriodSnapshot",
+    "DataVersion",
+]
@@ -0,0 +1,216 @@
+"""Opt-in profiling of single requests with cProfile and tracemalloc.
+
+An admin adds ``?_profile=<token>`` (or the ``X-Profile`` header) to any URL,
+where the token is signed with the application secret (see
+:func:`profile_token`). The request then runs under cProfile and tracemalloc and
+the result is written to ``instance/profiles/`` as ``<id>.pstats`` plus an
+``<id>.json`` summary. Requests without the flag only pay one argument lookup.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import io
+import json
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from flask import Flask, current_app, g, request
+from flask_login import current_user
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+QUERY_FLAG = "_profile"
+HEADER = "X-Profile"
+TOP_FUNCTIONS = 30
+TOP_ALLOCATIONS = 15
+
+# tracemalloc is process-wide: profile one request at a time.
+_busy = threading.Lock()
+
+
+@dataclass
+class ProfileSummary:
+    id: str
+    path: str
+    endpoint: str | None
+    user: str
+    started_at: str
+    duration_ms: float
+    status: int = 0
+    peak_memory_kb: float = 0.0
+    top_functions: str = ""
+    top_allocations: list[str] = field(default_factory=list)
+
+
+def _serializer(app: Flask) -> URLSafeTimedSerializer:
+    return URLSafeTimedSerializer(app.secret_key or "", salt="request-profile")
+
+
+def profile_token(app: Flask, user_id: int) -> str:
+    """Token enabling profiling for ``user_id``; valid ``PROFILE_TOKEN_MAX_AGE`` s."""
+
+    return _serializer(app).dumps({"user": user_id})
+
+
+def profiles_dir(app: Flask) -> Path:
+    return Path(app.config.get("PROFILES_DIR") or Path(app.instance_path) / "profiles")
+
+
+def _requested_token() -> str | None:
+    return request.args.get(QUERY_FLAG) or request.headers.get(HEADER)
+
+
+def _authorised(token: str) -> bool:
+    try:
+        payload = _serializer(current_app).loads(
+            token, max_age=current_app.config["PROFILE_TOKEN_MAX_AGE"]
+        )
+    except BadSignature:
+        return False
+    return (
+        current_user.is_authenticated
+        and current_user.role == "admin"
+        and payload.get("user") == current_user.id
+    )
+
+
+def _start() -> None:
+    token = _requested_token()
+    if token is None or not _authorised(token):
+        return
+    if not _busy.acquire(blocking=False):
+        g.profile_skipped = True
+        return
+    tracemalloc.start(10)
+    tracemalloc.reset_peak()
+    profiler = cProfile.Profile()
+    g.profile = (profiler, time.perf_counter(), datetime.now())
+    profiler.enable()
+
+
+def _finish(response: Any) -> Any:
+    state = g.pop("profile", None)
+    if state is None:
+        if g.pop("profile_skipped", False):
+            response.headers["X-Profile-Status"] = "busy"
+        return response
+
+    profiler, started, started_at = state
+    try:
+        profiler.disable()
+        duration = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            (tracemalloc.Filter(False, tracemalloc.__file__),)
+        )
+    finally:
+        tracemalloc.stop()
+        _busy.release()
+
+    summary = _save(
+        profiler, snapshot, response.status_code, duration, peak, started_at
+    )
+    response.headers["X-Profile-Id"] = summary.id
+    return response
+
+
+def _abort_profile(_exc: BaseException | None) -> None:
+    # after_request did not run (unhandled error): do not leave tracing on.
+    state = g.pop("profile", None)
+    if state is not None:
+        state[0].disable()
+        tracemalloc.stop()
+        _busy.release()
+
+
+def _save(
+    profiler: cProfile.Profile,
+    snapshot: tracemalloc.Snapshot,
+    status: int,
+    duration: float,
+    peak: int,
+    started_at: datetime,
+) -> ProfileSummary:
+    directory = profiles_dir(current_app)
+    directory.mkdir(parents=True, exist_ok=True)
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", request.endpoint or "unknown").strip("-")
+    profile_id = f"{started_at:%Y%m%d-%H%M%S-%f}-{slug}"
+
+    profiler.dump_stats(directory / f"{profile_id}.pstats")
+    text = io.StringIO()
+    pstats.Stats(profiler, stream=text).sort_stats("cumulative").print_stats(
+        TOP_FUNCTIONS
+    )
+
+    summary = ProfileSummary(
+        id=profile_id,
+        path=request.full_path.rstrip("?"),
+        endpoint=request.endpoint,
+        user=current_user.email,
+        started_at=started_at.isoformat(timespec="seconds"),
+        duration_ms=round(duration * 1000, 1),
+        status=status,
+        peak_memory_kb=round(peak / 1024, 1),
+        top_functions=text.getvalue(),
+        top_allocations=[
+            str(stat) for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]
+        ],
+    )
+    (directory / f"{profile_id}.json").write_text(
+        json.dumps(asdict(summary), indent=1), encoding="utf-8"
+    )
+    _prune(directory, int(current_app.config["PROFILES_KEEP"]))
+    return summary
+
+
+def _prune(directory: Path, keep: int) -> None:
+    summaries = sorted(directory.glob("*.json"), reverse=True)
+    for stale in summaries[keep:]:
+        stale.unlink(missing_ok=True)
+        stale.with_suffix(".pstats").unlink(missing_ok=True)
+
+
+def list_profiles(app: Flask, limit: int = 50) -> list[ProfileSummary]:
+    """Most recent stored profiles first."""
+
+    summaries = []
+    for path in sorted(profiles_dir(app).glob("*.json"), reverse=True)[:limit]:
+        try:
+            summaries.append(ProfileSummary(**json.loads(path.read_text("utf-8"))))
+        except (OSError, ValueError, TypeError):
+            continue
+    return summaries
+
+
+def load_profile(app: Flask, profile_id: str) -> ProfileSummary | None:
+    if not re.fullmatch(r"[A-Za-z0-9-]+", profile_id):
+        return None
+    path = profiles_dir(app) / f"{profile_id}.json"
+    if not path.is_file():
+        return None
+    return ProfileSummary(**json.loads(path.read_text("utf-8")))
+
+
+def init_profiling(app: Flask) -> None:
+    if not app.config["PROFILING_ENABLED"]:
+        return
+    app.before_request(_start)
+    app.after_request(_finish)
+    app.teardown_request(_abort_profile)
+
+
+__all__ = [
+    "ProfileSummary",
+    "init_profiling",
+    "list_profiles",
+    "load_profile",
+    "profile_token",
+    "profiles_dir",
+]
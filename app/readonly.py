@@ -0,0 +1,121 @@
+"""Read-only database sessions for requests with safe HTTP methods.
+
+``GET``/``HEAD``/``OPTIONS`` requests never write, so their session runs with
+autoflush off and any flush raises :class:`ReadOnlyRequestError`. The database is
+told as well: SQLite connections get ``PRAGMA query_only`` (reset when they go
+back to the pool) and PostgreSQL/MySQL transactions are started ``READ ONLY``, so
+Core ``INSERT``/``UPDATE`` statements that bypass the flush fail too.
+
+A view that really must write on a safe method can opt out with
+:func:`allow_writes`.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+from flask import Flask, current_app, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import Pool
+
+from .extensions import db
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+_SESSION_FLAG = "read_only"
+_CONNECTION_FLAG = "query_only"
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class ReadOnlyRequestError(RuntimeError):
+    """A write was attempted while serving a safe (read-only) request."""
+
+
+def allow_writes(view: F) -> F:  # noqa: UP047
+    """Exempt ``view`` from read-only mode on ``GET``/``HEAD`` requests."""
+
+    view.allow_writes = True  # type: ignore[attr-defined]
+    return view
+
+
+def _before_flush(session: Session, _context: Any, _instances: Any) -> None:
+    if session.info.get(_SESSION_FLAG) and (
+        session.new or session.dirty or session.deleted
+    ):
+        raise ReadOnlyRequestError(
+            f"write attempted during read-only {request.method} {request.path}"
+        )
+
+
+def _after_begin(session: Session, _transaction: Any, connection: Any) -> None:
+    if session.info.get(_SESSION_FLAG):
+        _restrict(connection)
+
+
+def _restrict(connection: Any) -> None:
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        connection.exec_driver_sql("PRAGMA query_only = ON")
+        connection.connection.info[_CONNECTION_FLAG] = True
+    elif dialect in ("postgresql", "mysql", "mariadb"):
+        connection.exec_driver_sql("SET TRANSACTION READ ONLY")
+
+
+def _reset_query_only(dbapi_connection: Any, record: Any) -> None:
+    # The pragma outlives the transaction: clear it before the next checkout.
+    if record.info.pop(_CONNECTION_FLAG, False) and dbapi_connection is not None:
+        dbapi_connection.execute("PRAGMA query_only = OFF")
+
+
+def _enter_read_only() -> None:
+    if request.method not in SAFE_METHODS:
+        return
+    view = current_app.view_functions.get(request.endpoint or "")
+    if getattr(view, "allow_writes", False):
+        return
+    session = db.session()
+    session.autoflush = False
+    session.info[_SESSION_FLAG] = True
+    if session.in_transaction():
+        _restrict(session.connection())
+
+
+def _leave_read_only(_exc: BaseException | None) -> None:
+    # The session may outlive the request (an app context pushed by a test or a
+    # CLI command), so undo the switch instead of relying on session removal.
+    session = db.session()
+    if not session.info.pop(_SESSION_FLAG, False):
+        return
+    session.autoflush = True
+    if session.in_transaction():
+        connection = session.connection()
+        if connection.connection.info.pop(_CONNECTION_FLAG, False):
+            connection.exec_driver_sql("PRAGMA query_only = OFF")
+
+
+def register_read_only_guards() -> None:
+    """Install the session and pool listeners (idempotent)."""
+
+    if not event.contains(Session, "before_flush", _before_flush):
+        event.listen(Session, "before_flush", _before_flush)
+        event.listen(Session, "after_begin", _after_begin)
+        event.listen(Pool, "checkin", _reset_query_only)
+
+
+def init_read_only(app: Flask) -> None:
+    if not app.config["READ_ONLY_REQUESTS"]:
+        return
+    register_read_only_guards()
+    app.before_request(_enter_read_only)
+    app.teardown_request(_leave_read_only)
+
+
+__all__ = [
+    "ReadOnlyRequestError",
+    "allow_writes",
+    "init_read_only",
+    "register_read_only_guards",
+]
@@ -0,0 +1,76 @@
+"""Worker start-up helpers: template bytecode cache, warm-up and timing report."""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from flask import Flask
+from jinja2 import FileSystemBytecodeCache
+
+
+@dataclass
+class StartupReport:
+    """Wall-clock duration of each start-up phase, in milliseconds."""
+
+    phases: dict[str, float] = field(default_factory=dict)
+    templates_compiled: int = 0
+    _started: float = field(default_factory=time.perf_counter, repr=False)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = (time.perf_counter() - started) * 1000
+
+    @property
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self._started) * 1000
+
+    def finish(self) -> None:
+        self.phases["total"] = self.total_ms
+
+    def format(self) -> str:
+        lines = [f"{name:<20} {ms:9.1f} ms" for name, ms in self.phases.items()]
+        lines.append(f"{'templates compiled':<20} {self.templates_compiled:9d}")
+        return "\n".join(lines)
+
+
+def configure_template_cache(app: Flask) -> Path | None:
+    """Store compiled templates on disk so new workers skip the Jinja compiler.
+
+    Must run before ``app.jinja_env`` is first accessed. Returns the cache
+    directory, or ``None`` when ``TEMPLATE_BYTECODE_CACHE`` is disabled.
+    """
+
+    if not app.config.get("TEMPLATE_BYTECODE_CACHE"):
+        return None
+
+    cache_dir = Path(
+        app.config.get("TEMPLATE_BYTECODE_CACHE_DIR")
+        or Path(app.instance_path) / "jinja_cache"
+    )
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    app.jinja_options = {
+        **app.jinja_options,
+        "bytecode_cache": FileSystemBytecodeCache(str(cache_dir)),
+    }
+    return cache_dir
+
+
+def warm_templates(app: Flask) -> int:
+    """Load every template into the environment cache; returns how many."""
+
+    env = app.jinja_env
+    names = env.list_templates(extensions=["html"])
+    for name in names:
+        env.get_template(name)
+    return len(names)
+
+
+__all__ = ["StartupReport", "configure_template_cache", "warm_templates"]
@@ -0,0 +1,54 @@
+// Typeahead for <select data-lookup-url="..."> pickers.
+// The server only renders the selected option; typing in the companion search box
+// fetches matching records from the lookup endpoint and replaces the options.
+(() => {
+  const debounce = (fn, wait) => {
+    let timer;
+    return (...args) => {
+      clearTimeout(timer);
+      timer = setTimeout(() => fn(...args), wait);
+    };
+  };
+
+  document.querySelectorAll("select[data-lookup-url]").forEach((select) => {
+    const input = document.createElement("input");
+    input.type = "search";
+    input.className = "form-control form-control-sm mb-1";
+    input.placeholder = "Cerca...";
+    input.setAttribute("aria-label", "Cerca");
+    select.before(input);
+
+    const keptOptions = Array.from(select.options).filter(
+      (option) => option.value === "0"
+    );
+
+    const refresh = debounce(async () => {
+      const query = input.value.trim();
+      if (!query) {
+        return;
+      }
+      const url = new URL(select.dataset.lookupUrl, window.location.origin);
+      url.searchParams.set("q", query);
+      const response = await fetch(url, { headers: { Accept: "application/json" } });
+      if (!response.ok) {
+        return;
+      }
+      const { results } = await response.json();
+      select.replaceChildren(
+        ...keptOptions,
+        ...results.map(({ id, label, detail }) => {
+          const option = new Option(label, id);
+          if (detail) {
+            option.title = detail;
+          }
+          return option;
+        })
+      );
+      if (results.length) {
+        select.value = String(results[0].id);
+      }
+    }, 200);
+
+    input.addEventListener("input", refresh);
+  });
+})();
@@ -2,13 +2,31 @@
 
 from __future__ import annotations
 
-from flask import Blueprint, current_app, render_template, request
+from flask import (
+    Blueprint,
+    Response,
+    abort,
+    current_app,
+    jsonify,
+    make_response,
+    render_template,
+    request,
+)
 from flask.typing import ResponseReturnValue
-from flask_login import login_required
+from flask_login import current_user, login_required
 
-from ..core.services import TimesheetFilters, default_period, get_dashboard_data
+from ..budget import query_budget
+from ..conditional import not_modified, view_etag, with_etag
+from ..core.lookup import set_filter_choices
+from ..core.services import (
+    PivotSpecError,
+    TimesheetFilters,
+    default_period,
+    get_dashboard_data,
+    pivot,
+)
+from ..core.singleflight import coalesce
 from ..forms import FilterForm
-from ..models import Person, Project
 
 bp = Blueprint("dashboard", __name__, url_prefix="/dashboard")
 
@@ -18,31 +36,74 @@ bp = Blueprint("dashboard", __name__, url_prefix="/dashboard")
 def index() -> ResponseReturnValue:
     form = FilterForm(request.args, meta={"csrf": False})
 
-    projects = Project.query.order_by(Project.name).all()
-    people = Person.query.order_by(Person.full_name).all()
-
-    form.project_id.choices = [(0, "Tutti")] + [
-        (project.id, project.name) for project in projects
-    ]
-    form.person_id.choices = [(0, "Tutti")] + [
-        (person.id, person.full_name) for person in people
-    ]
-
     if not form.start_date.data or not form.end_date.data:
         start, end = default_period(current_app.config)
         form.start_date.data = start
         form.end_date.data = end
-    if form.project_id.data is None:
-        form.project_id.data = 0
-    if form.person_id.data is None:
-        form.person_id.data = 0
 
     filters = TimesheetFilters.from_form(form)
-    data = get_dashboard_data(filters)
+    etag = view_etag(filters)
+    if (cached := not_modified(etag)) is not None:
+        return cached
 
-    return render_template(
-        "dashboard.html",
-        form=form,
-        filters=filters,
-        data=data,
+    set_filter_choices(form)
+    with query_budget("dashboard", filters):
+        data = coalesce(
+            "dashboard",
+            filters,
+            lambda: get_dashboard_data(
+                filters,
+                concurrent=current_app.config["DASHBOARD_CONCURRENT_QUERIES"],
+                workers=current_app.config["DASHBOARD_QUERY_WORKERS"],
+            ),
+        )
+
+    response = make_response(
+        render_template(
+            "dashboard.html",
+            form=form,
+            filters=filters,
+            data=data,
+        )
     )
+    return with_etag(response, etag)
+
+
+def _names(arg: str, default: str) -> tuple[str, ...]:
+    return tuple(name for name in request.args.get(arg, default).split(",") if name)
+
+
+@bp.route("/pivot.<any(json, csv):fmt>")
+@login_required
+def pivot_table(fmt: str) -> ResponseReturnValue:
+    """Pivot of the filtered entries, e.g. ``?rows=project&columns=person``.
+
+    ``rows``/``columns`` take comma separated dimensions and ``measures`` any of
+    ``hours``, ``cost``, ``entries``; ``totals=0`` drops the totals.
+    """
+
+    form = FilterForm(request.args, meta={"csrf": False})
+    if current_user.role != "admin":
+        form.person_id.data = current_user.id
+
+    filters = TimesheetFilters.from_form(form)
+    rows = _names("rows", "project")
+    columns = _names("columns", "")
+    measures = _names("measures", "hours")
+    totals = request.args.get("totals", "1") != "0"
+    etag = view_etag(filters, fmt, rows, columns, measures, totals)
+    if (cached := not_modified(etag)) is not None:
+        return cached
+
+    try:
+        with query_budget("dashboard", filters):
+            table = pivot(filters, rows, columns, measures, totals=totals)
+    except PivotSpecError as exc:
+        abort(400, description=str(exc))
+
+    if fmt == "csv":
+        response = Response(table.to_csv(), mimetype="text/csv")
+        response.headers["Content-Disposition"] = "attachment; filename=pivot.csv"
+    else:
+        response = jsonify(table.to_dict())
+    return with_etag(response, etag)
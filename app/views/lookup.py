@@ -0,0 +1,37 @@
+"""JSON typeahead endpoints used by the project/person pickers."""
+
+from __future__ import annotations
+
+from flask import Blueprint, jsonify, request
+from flask.typing import ResponseReturnValue
+from flask_login import current_user, login_required
+
+from ..core.lookup import search_people, search_projects
+
+bp = Blueprint("lookup", __name__, url_prefix="/lookup")
+
+
+def _lookup_args() -> tuple[str, int | None, bool]:
+    query = request.args.get("q", "", type=str)
+    limit = request.args.get("limit", type=int)
+    active_only = request.args.get("all") != "1"
+    return query, limit, active_only
+
+
+@bp.route("/projects")
+@login_required
+def projects() -> ResponseReturnValue:
+    query, limit, active_only = _lookup_args()
+    return jsonify(results=search_projects(query, limit=limit, active_only=active_only))
+
+
+@bp.route("/people")
+@login_required
+def people() -> ResponseReturnValue:
+    query, limit, active_only = _lookup_args()
+    person_id = None if current_user.role == "admin" else current_user.id
+    return jsonify(
+        results=search_people(
+            query, limit=limit, active_only=active_only, person_id=person_id
+        )
+    )
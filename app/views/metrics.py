@@ -0,0 +1,30 @@
+"""Prometheus scrape endpoint."""
+
+from __future__ import annotations
+
+import hmac
+
+from flask import Blueprint, abort, current_app, request
+from flask.typing import ResponseReturnValue
+from flask_login import current_user
+
+from ..extensions import csrf
+from ..metrics import metrics_response
+
+bp = Blueprint("metrics", __name__)
+
+
+@bp.route("/metrics")
+@csrf.exempt
+def metrics() -> ResponseReturnValue:
+    # Scrapers authenticate with METRICS_TOKEN; without one, admins only.
+    token = current_app.config.get("METRICS_TOKEN")
+    if token:
+        supplied = request.headers.get("Authorization", "").removeprefix("Bearer ")
+        if not hmac.compare_digest(supplied.encode(), token.encode()):
+            abort(401)
+    elif not current_user.is_authenticated:
+        abort(401)
+    elif current_user.role != "admin":
+        abort(403)
+    return metrics_response(current_app._get_current_object())
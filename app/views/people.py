@@ -2,13 +2,34 @@
 
 from __future__ import annotations
 
-from flask import Blueprint, flash, redirect, render_template, url_for
+from io import TextIOWrapper
+from pathlib import Path
+
+from flask import (
+    Blueprint,
+    current_app,
+    flash,
+    make_response,
+    redirect,
+    render_template,
+    request,
+    url_for,
+)
 from flask.typing import ResponseReturnValue
 from flask_login import login_required
 
 from ..auth import admin_required
+from ..conditional import not_modified, view_etag, with_etag
+from ..core import deletion, listing, provisioning
+from ..core.lookup import person_choices
+from ..core.rates import RateChangeError, set_hourly_rate
 from ..extensions import db
-from ..forms import PersonCreateForm, PersonEditForm
+from ..forms import (
+    DeleteRecordForm,
+    PeopleImportForm,
+    PersonCreateForm,
+    PersonEditForm,
+)
 from ..models import Person
 
 bp = Blueprint("people", __name__, url_prefix="/people")
@@ -17,8 +38,14 @@ bp = Blueprint("people", __name__, url_prefix="/people")
 @bp.route("/")
 @login_required
 def list_people() -> ResponseReturnValue:
-    people = Person.query.order_by(Person.full_name).all()
-    return render_template("people_list.html", people=people)
+    args = listing.listing_args(request.args)
+    etag = view_etag(args)
+    if (cached := not_modified(etag)) is not None:
+        return cached
+
+    result = listing.list_people(**args)
+    response = make_response(render_template("people_list.html", listing=result))
+    return with_etag(response, etag)
 
 
 @bp.route("/new", methods=["GET", "POST"])
@@ -44,6 +71,33 @@ def create_person() -> ResponseReturnValue:
     return render_template("person_form.html", form=form, title="Nuova persona")
 
 
+@bp.route("/import", methods=["GET", "POST"])
+@admin_required
+def import_people() -> ResponseReturnValue:
+    form = PeopleImportForm()
+    result = errors = None
+    if form.validate_on_submit():
+        stream = TextIOWrapper(form.csv_file.data.stream, encoding="utf-8-sig")
+        rows, errors = provisioning.parse_people_csv(stream)
+        result = provisioning.provision_people(
+            rows,
+            workers=int(current_app.config["PROVISION_WEB_WORKERS"]),
+            batch_size=int(current_app.config["PROVISION_BATCH_SIZE"]),
+            token_hours=int(current_app.config["PROVISION_RESET_TOKEN_HOURS"]),
+            dry_run=form.dry_run.data,
+        )
+        if not result.dry_run:
+            current_app.logger.info(
+                "Imported %s people (%s existing, %s invalid rows)",
+                result.created,
+                len(result.existing),
+                len(errors),
+            )
+    return render_template(
+        "people_import.html", form=form, result=result, errors=errors
+    )
+
+
 @bp.route("/<int:person_id>/edit", methods=["GET", "POST"])
 @admin_required
 def edit_person(person_id: int) -> ResponseReturnValue:
@@ -57,24 +111,85 @@ def edit_person(person_id: int) -> ResponseReturnValue:
         if existing:
             flash("Email già registrata", "danger")
         else:
-            person.full_name = form.full_name.data
-            person.email = form.email.data.lower()
-            person.hourly_rate = form.hourly_rate.data
-            person.is_active = form.is_active.data
-            person.role = form.role.data
-            if form.password.data:
-                person.set_password(form.password.data)
-            db.session.commit()
-            flash("Persona aggiornata", "success")
-            return redirect(url_for("people.list_people"))
+            try:
+                rate_changed = form.hourly_rate.data != person.hourly_rate
+                if rate_changed or form.rate_effective_from.data:
+                    set_hourly_rate(
+                        person, form.hourly_rate.data, form.rate_effective_from.data
+                    )
+            except RateChangeError as exc:
+                flash(str(exc), "danger")
+            else:
+                person.full_name = form.full_name.data
+                person.email = form.email.data.lower()
+                person.is_active = form.is_active.data
+                person.role = form.role.data
+                if form.password.data:
+                    person.set_password(form.password.data)
+                db.session.commit()
+                flash("Persona aggiornata", "success")
+                return redirect(url_for("people.list_people"))
     return render_template("person_form.html", form=form, title="Modifica persona")
 
 
-@bp.route("/<int:person_id>/delete", methods=["POST"])
+@bp.route("/<int:person_id>/delete", methods=["GET", "POST"])
 @admin_required
 def delete_person(person_id: int) -> ResponseReturnValue:
     person = Person.query.get_or_404(person_id)
-    db.session.delete(person)
-    db.session.commit()
-    flash("Persona eliminata", "info")
-    return redirect(url_for("people.list_people"))
+    form = DeleteRecordForm()
+    form.target_id.choices = [
+        choice
+        for choice in person_choices(form.target_id.data)
+        if choice[0] != person.id
+    ]
+
+    if form.validate_on_submit():
+        try:
+            result = deletion.delete_person(
+                person.id,
+                policy=form.policy.data,
+                target_id=form.target_id.data or None,
+                batch_size=int(current_app.config["DELETE_BATCH_SIZE"]),
+                archive_dir=Path(current_app.instance_path) / "deleted",
+            )
+        except deletion.DeletionBlocked as exc:
+            flash(
+                f"La persona ha {exc.entries} registrazioni: scegli se esportarle "
+                "o spostarle su un'altra persona.",
+                "danger",
+            )
+        except deletion.ClosedPeriodConflict as exc:
+            months = ", ".join(f"{month:%m/%Y}" for month in exc.months)
+            flash(
+                f"La persona ha registrazioni in mesi chiusi ({months}): "
+                "non può essere eliminata.",
+                "danger",
+            )
+        except ValueError:
+            flash("Scegli una persona di destinazione diversa.", "danger")
+        else:
+            current_app.logger.info(
+                "Deleted person %s (%s policy, %s entries)",
+                person_id,
+                result.policy,
+                result.entries,
+            )
+            flash(f"Persona eliminata ({_entries_message(result)})", "info")
+            return redirect(url_for("people.list_people"))
+
+    return render_template(
+        "confirm_delete.html",
+        form=form,
+        title=f"Elimina persona {person.full_name}",
+        entries=deletion.count_entries("person_id", person.id),
+        lookup_url=url_for("lookup.people", all=1),
+        cancel_url=url_for("people.list_people"),
+    )
+
+
+def _entries_message(result: deletion.DeletionResult) -> str:
+    if result.policy == "reassign":
+        return f"registrazioni spostate: {result.entries}"
+    if result.policy == "archive":
+        return f"registrazioni esportate ed eliminate: {result.entries}"
+    return "nessuna registrazione collegata"
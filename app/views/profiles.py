@@ -0,0 +1,52 @@
+"""Admin pages listing the stored request profiles."""
+
+from __future__ import annotations
+
+from flask import Blueprint, abort, current_app, render_template, send_from_directory
+from flask.typing import ResponseReturnValue
+from flask_login import current_user
+
+from ..auth import admin_required
+from ..profiling import (
+    HEADER,
+    QUERY_FLAG,
+    list_profiles,
+    load_profile,
+    profile_token,
+    profiles_dir,
+)
+
+bp = Blueprint("profiles", __name__, url_prefix="/profiles")
+
+
+@bp.route("/")
+@admin_required
+def list_profiles_view() -> ResponseReturnValue:
+    app = current_app._get_current_object()
+    return render_template(
+        "profiles_list.html",
+        profiles=list_profiles(app),
+        token=profile_token(app, current_user.id),
+        query_flag=QUERY_FLAG,
+        header=HEADER,
+        max_age_minutes=app.config["PROFILE_TOKEN_MAX_AGE"] // 60,
+    )
+
+
+@bp.route("/<profile_id>")
+@admin_required
+def show_profile(profile_id: str) -> ResponseReturnValue:
+    profile = load_profile(current_app, profile_id)
+    if profile is None:
+        abort(404)
+    return render_template("profile_detail.html", profile=profile)
+
+
+@bp.route("/<profile_id>.pstats")
+@admin_required
+def download_profile(profile_id: str) -> ResponseReturnValue:
+    if load_profile(current_app, profile_id) is None:
+        abort(404)
+    return send_from_directory(
+        profiles_dir(current_app), f"{profile_id}.pstats", as_attachment=True
+    )
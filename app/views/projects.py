@@ -2,13 +2,27 @@
 
 from __future__ import annotations
 
-from flask import Blueprint, flash, redirect, render_template, url_for
+from pathlib import Path
+
+from flask import (
+    Blueprint,
+    current_app,
+    flash,
+    make_response,
+    redirect,
+    render_template,
+    request,
+    url_for,
+)
 from flask.typing import ResponseReturnValue
 from flask_login import login_required
 
 from ..auth import admin_required
+from ..conditional import not_modified, view_etag, with_etag
+from ..core import deletion, listing
+from ..core.lookup import project_choices
 from ..extensions import db
-from ..forms import ProjectForm
+from ..forms import DeleteRecordForm, ProjectForm
 from ..models import Project
 
 bp = Blueprint("projects", __name__, url_prefix="/projects")
@@ -17,8 +31,14 @@ bp = Blueprint("projects", __name__, url_prefix="/projects")
 @bp.route("/")
 @login_required
 def list_projects() -> ResponseReturnValue:
-    projects = Project.query.order_by(Project.name).all()
-    return render_template("projects_list.html", projects=projects)
+    args = listing.listing_args(request.args)
+    etag = view_etag(args)
+    if (cached := not_modified(etag)) is not None:
+        return cached
+
+    result = listing.list_projects(**args)
+    response = make_response(render_template("projects_list.html", listing=result))
+    return with_etag(response, etag)
 
 
 @bp.route("/new", methods=["GET", "POST"])
@@ -55,11 +75,64 @@ def edit_project(project_id: int) -> ResponseReturnValue:
     return render_template("project_form.html", form=form, title="Modifica progetto")
 
 
-@bp.route("/<int:project_id>/delete", methods=["POST"])
+@bp.route("/<int:project_id>/delete", methods=["GET", "POST"])
 @admin_required
 def delete_project(project_id: int) -> ResponseReturnValue:
     project = Project.query.get_or_404(project_id)
-    db.session.delete(project)
-    db.session.commit()
-    flash("Progetto eliminato", "info")
-    return redirect(url_for("projects.list_projects"))
+    form = DeleteRecordForm()
+    form.target_id.choices = [
+        choice
+        for choice in project_choices(form.target_id.data)
+        if choice[0] != project.id
+    ]
+
+    if form.validate_on_submit():
+        try:
+            result = deletion.delete_project(
+                project.id,
+                policy=form.policy.data,
+                target_id=form.target_id.data or None,
+                batch_size=int(current_app.config["DELETE_BATCH_SIZE"]),
+                archive_dir=Path(current_app.instance_path) / "deleted",
+            )
+        except deletion.DeletionBlocked as exc:
+            flash(
+                f"Il progetto ha {exc.entries} registrazioni: scegli se esportarle "
+                "o spostarle su un altro progetto.",
+                "danger",
+            )
+        except deletion.ClosedPeriodConflict as exc:
+            months = ", ".join(f"{month:%m/%Y}" for month in exc.months)
+            flash(
+                f"Il progetto ha registrazioni in mesi chiusi ({months}): "
+                "non può essere eliminato.",
+                "danger",
+            )
+        except ValueError:
+            flash("Scegli un progetto di destinazione diverso.", "danger")
+        else:
+            current_app.logger.info(
+                "Deleted project %s (%s policy, %s entries)",
+                project_id,
+                result.policy,
+                result.entries,
+            )
+            flash(f"Progetto eliminato ({_entries_message(result)})", "info")
+            return redirect(url_for("projects.list_projects"))
+
+    return render_template(
+        "confirm_delete.html",
+        form=form,
+        title=f"Elimina progetto {project.name}",
+        entries=deletion.count_entries("project_id", project.id),
+        lookup_url=url_for("lookup.projects", all=1),
+        cancel_url=url_for("projects.list_projects"),
+    )
+
+
+def _entries_message(result: deletion.DeletionResult) -> str:
+    if result.policy == "reassign":
+        return f"registrazioni spostate: {result.entries}"
+    if result.policy == "archive":
+        return f"registrazioni esportate ed eliminate: {result.entries}"
+    return "nessuna registrazione collegata"
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import csv
+from datetime import date, timedelta
 from io import StringIO
 
 from flask import (
@@ -10,6 +11,7 @@ from flask import (
     Response,
     abort,
     flash,
+    make_response,
     redirect,
     render_template,
     request,
@@ -18,78 +20,94 @@ from flask import (
 from flask.typing import ResponseReturnValue
 from flask_login import current_user, login_required
 
+from ..budget import query_budget
+from ..conditional import not_modified, view_etag, with_etag
 from ..core import services
+from ..core.lookup import person_choices, project_choices, set_filter_choices
+from ..core.periods import closed_months
+from ..core.singleflight import coalesce
 from ..core.validators import (
     ValidationProblem,
     compute_duration,
     ensure_entities_active,
     ensure_no_overlap,
+    ensure_period_open,
 )
 from ..extensions import db
-from ..forms import FilterForm, TimeEntryForm
+from ..forms import BulkEntryActionForm, CopyWeekForm, FilterForm, TimeEntryForm
+from ..metrics import EXPORT_ROWS
 from ..models import Person, Project, TimeEntry
 
 bp = Blueprint("timesheet", __name__, url_prefix="/timesheet")
 
 
-def _set_filter_choices(form: FilterForm) -> None:
-    projects = Project.query.order_by(Project.name).all()
-    people = Person.query.order_by(Person.full_name).all()
-
-    form.project_id.choices = [(0, "Tutti")] + [
-        (project.id, project.name) for project in projects
-    ]
-    form.person_id.choices = [(0, "Tutti")] + [
-        (person.id, person.full_name) for person in people
-    ]
-
-    if form.project_id.data is None:
-        form.project_id.data = 0
-    if form.person_id.data is None:
-        form.person_id.data = 0
-
-
 def _set_time_entry_choices(
     form: TimeEntryForm, *, include_inactive: bool = False
 ) -> None:
-    projects_query = Project.query
-    people_query = Person.query
-    if not include_inactive:
-        projects_query = projects_query.filter_by(is_active=True)
-        people_query = people_query.filter_by(is_active=True)
-
-    projects = projects_query.order_by(Project.name).all()
-    people = people_query.order_by(Person.full_name).all()
-
-    form.project_id.choices = [(project.id, project.name) for project in projects]
+    active_only = not include_inactive
+    form.project_id.choices = project_choices(
+        form.project_id.data, active_only=active_only
+    )
 
     if current_user.role == "admin":
-        form.person_id.choices = [(person.id, person.full_name) for person in people]
+        form.person_id.choices = person_choices(
+            form.person_id.data, active_only=active_only
+        )
     else:
         form.person_id.choices = [(current_user.id, current_user.full_name)]
         form.person_id.data = current_user.id
 
 
+def _set_bulk_choices(form: BulkEntryActionForm) -> None:
+    form.target_project_id.choices = [(0, "—")] + project_choices(
+        form.target_project_id.data, active_only=True
+    )
+
+
+def _closed_redirect(entry: TimeEntry) -> ResponseReturnValue | None:
+    """Back to the list with an error if ``entry`` lies in a closed month."""
+
+    try:
+        ensure_period_open(entry.date)
+    except ValidationProblem as exc:
+        flash(str(exc), "danger")
+        return redirect(url_for("timesheet.list_entries"))
+    return None
+
+
 @bp.route("/", methods=["GET"])
 @login_required
 def list_entries() -> ResponseReturnValue:
     form = FilterForm(request.args, meta={"csrf": False})
-    _set_filter_choices(form)
 
     if current_user.role != "admin":
         form.person_id.data = current_user.id
 
     filters = services.TimesheetFilters.from_form(form)
-    entries = services.get_timesheet_entries(filters).all()
-    total_cost = services.compute_total_cost(entries)
-
-    return render_template(
-        "timesheet_list.html",
-        form=form,
-        entries=entries,
-        total_cost=total_cost,
-        filters=filters,
+    etag = view_etag(filters)
+    if (cached := not_modified(etag)) is not None:
+        return cached
+
+    set_filter_choices(form)
+    with query_budget("timesheet", filters):
+        entries = services.get_timesheet_rows(filters)
+        total_cost = services.compute_total_cost(entries)
+
+    bulk_form = BulkEntryActionForm()
+    _set_bulk_choices(bulk_form)
+
+    response = make_response(
+        render_template(
+            "timesheet_list.html",
+            form=form,
+            bulk_form=bulk_form,
+            entries=entries,
+            total_cost=total_cost,
+            filters=filters,
+            closed_months=set(closed_months(filters.start_date, filters.end_date)),
+        )
     )
+    return with_etag(response, etag)
 
 
 @bp.route("/new", methods=["GET", "POST"])
@@ -103,6 +121,7 @@ def create_entry() -> ResponseReturnValue:
         person = Person.query.get_or_404(form.person_id.data)
 
         try:
+            ensure_period_open(form.date.data)
             ensure_entities_active(project, person)
             duration = compute_duration(
                 form.date.data,
@@ -144,6 +163,8 @@ def edit_entry(entry_id: int) -> ResponseReturnValue:
     entry = TimeEntry.query.get_or_404(entry_id)
     if current_user.role != "admin" and entry.person_id != current_user.id:
         abort(403)
+    if (closed := _closed_redirect(entry)) is not None:
+        return closed
 
     form = TimeEntryForm(obj=entry)
     _set_time_entry_choices(form, include_inactive=True)
@@ -156,6 +177,7 @@ def edit_entry(entry_id: int) -> ResponseReturnValue:
         project = Project.query.get_or_404(form.project_id.data)
         person = Person.query.get_or_404(form.person_id.data)
         try:
+            ensure_period_open(form.date.data)
             ensure_entities_active(project, person)
             duration = compute_duration(
                 form.date.data,
@@ -195,6 +217,8 @@ def delete_entry(entry_id: int) -> ResponseReturnValue:
     entry = TimeEntry.query.get_or_404(entry_id)
     if current_user.role != "admin" and entry.person_id != current_user.id:
         abort(403)
+    if (closed := _closed_redirect(entry)) is not None:
+        return closed
 
     db.session.delete(entry)
     db.session.commit()
@@ -208,6 +232,8 @@ def duplicate_entry(entry_id: int) -> ResponseReturnValue:
     entry = TimeEntry.query.get_or_404(entry_id)
     if current_user.role != "admin" and entry.person_id != current_user.id:
         abort(403)
+    if (closed := _closed_redirect(entry)) is not None:
+        return closed
 
     duplicate = TimeEntry(
         project=entry.project,
@@ -224,17 +250,116 @@ def duplicate_entry(entry_id: int) -> ResponseReturnValue:
     return redirect(url_for("timesheet.list_entries"))
 
 
-@bp.route("/export", methods=["GET"])
+@bp.route("/bulk", methods=["POST"])
 @login_required
-def export_csv() -> ResponseReturnValue:
-    form = FilterForm(request.args, meta={"csrf": False})
-    _set_filter_choices(form)
+def bulk_action() -> ResponseReturnValue:
+    form = BulkEntryActionForm()
+    _set_bulk_choices(form)
+    redirect_url = url_for("timesheet.list_entries", **request.args)
+
+    entry_ids = request.form.getlist("entry_ids", type=int)
+    if not form.validate_on_submit():
+        flash("Azione non valida", "danger")
+        return redirect(redirect_url)
+    if not entry_ids:
+        flash("Nessuna registrazione selezionata", "warning")
+        return redirect(redirect_url)
+
+    owner_id = None if current_user.role == "admin" else current_user.id
+    action = form.action.data
+
+    try:
+        if action == "delete":
+            count = services.bulk_delete_entries(entry_ids, owner_id=owner_id)
+            message = f"Voci eliminate: {count}"
+        elif action == "duplicate":
+            result = services.bulk_duplicate_entries(
+                entry_ids, owner_id=owner_id, shift_days=form.shift_days.data or 0
+            )
+            count = result.copied
+            message = (
+                f"Voci duplicate: {result.copied} "
+                f"(saltate per sovrapposizione: {result.skipped})"
+            )
+        else:
+            project = db.session.get(Project, form.target_project_id.data or 0)
+            if project is None:
+                raise ValidationProblem("Selezionare il progetto di destinazione.")
+            if not project.is_active:
+                raise ValidationProblem("Il progetto selezionato non è attivo.")
+            count = services.bulk_reassign_project(
+                entry_ids, project.id, owner_id=owner_id
+            )
+            message = f"Voci spostate su {project.name}: {count}"
+    except ValidationProblem as exc:
+        db.session.rollback()
+        flash(str(exc), "danger")
+    else:
+        db.session.commit()
+        flash(message, "success" if count else "info")
 
-    if current_user.role != "admin":
+    return redirect(redirect_url)
+
+
+@bp.route("/copy-week", methods=["GET", "POST"])
+@login_required
+def copy_week() -> ResponseReturnValue:
+    form = CopyWeekForm()
+    if current_user.role == "admin":
+        form.person_id.choices = [(0, "Tutti")] + person_choices(
+            form.person_id.data, active_only=True
+        )
+    else:
+        form.person_id.choices = [(current_user.id, current_user.full_name)]
         form.person_id.data = current_user.id
 
-    filters = services.TimesheetFilters.from_form(form)
-    entries = services.get_timesheet_entries(filters).all()
+    if request.method == "GET":
+        this_week = services.week_start(date.today())
+        form.source_week.data = this_week - timedelta(days=7)
+        form.target_week.data = this_week
+
+    preview = None
+    if form.validate_on_submit():
+        source_week = services.week_start(form.source_week.data)
+        target_week = services.week_start(form.target_week.data)
+        if source_week == target_week:
+            flash("Le settimane di origine e destinazione coincidono.", "danger")
+        else:
+            try:
+                result = services.copy_week(
+                    source_week,
+                    target_week,
+                    person_id=form.person_id.data or None,
+                    dry_run=form.dry_run.data,
+                )
+            except ValidationProblem as exc:
+                flash(str(exc), "danger")
+                result = None
+            if result is not None and result.dry_run:
+                preview = result
+            elif result is not None:
+                db.session.commit()
+                flash(
+                    f"Voci copiate: {result.copied} (saltate per sovrapposizione: "
+                    f"{result.skipped})",
+                    "success" if result.copied else "info",
+                )
+                return redirect(
+                    url_for(
+                        "timesheet.list_entries",
+                        start_date=target_week.isoformat(),
+                        end_date=(target_week + timedelta(days=6)).isoformat(),
+                    )
+                )
+
+    return render_template(
+        "copy_week_form.html", form=form, preview=preview, title="Copia settimana"
+    )
+
+
+def _timesheet_csv(filters: services.TimesheetFilters) -> str:
+    entries = services.get_timesheet_rows(filters)
+    EXPORT_ROWS.observe(len(entries))
 
     buffer = StringIO()
     writer = csv.writer(buffer)
@@ -252,13 +377,12 @@ def export_csv() -> ResponseReturnValue:
     )
 
     for entry in entries:
-        rate = float(entry.person.hourly_rate or 0)
-        cost = rate * entry.duration_hours if rate else 0
+        cost = entry.cost
         writer.writerow(
             [
                 entry.date.isoformat(),
-                entry.project.name,
-                entry.person.full_name,
+                entry.project_name,
+                entry.person_name,
                 f"{entry.duration_hours:.2f}",
                 entry.start_time.strftime("%H:%M") if entry.start_time else "",
                 entry.end_time.strftime("%H:%M") if entry.end_time else "",
@@ -267,6 +391,24 @@ def export_csv() -> ResponseReturnValue:
             ]
         )
 
-    response = Response(buffer.getvalue(), mimetype="text/csv")
+    return buffer.getvalue()
+
+
+@bp.route("/export", methods=["GET"])
+@login_required
+def export_csv() -> ResponseReturnValue:
+    form = FilterForm(request.args, meta={"csrf": False})
+
+    if current_user.role != "admin":
+        form.person_id.data = current_user.id
+
+    filters = services.TimesheetFilters.from_form(form)
+    etag = view_etag(filters)
+    if (cached := not_modified(etag)) is not None:
+        return cached
+
+    with query_budget("export", filters):
+        body = coalesce("export", filters, lambda: _timesheet_csv(filters))
+    response = Response(body, mimetype="text/csv")
     response.headers["Content-Disposition"] = "attachment; filename=timesheet.csv"
-    return response
+    return with_etag(response, etag)
@@ -0,0 +1,117 @@
+"""Add trigger-maintained activity counters to projects and people
+
+Revision ID: a6c1e3f5b7d9
+Revises: f2a7d9c3b5e8
+Create Date: 2026-10-18 15:02:41.118204
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "a6c1e3f5b7d9"
+down_revision = "f2a7d9c3b5e8"
+branch_labels = None
+depends_on = None
+
+TARGETS = (("projects", "project_id"), ("people", "person_id"))
+SOURCES = ("time_entries", "time_entries_archive")
+CURRENT_MONTH = "strftime('%Y-%m-01', 'now', 'localtime')"
+
+
+def _add(target, fk):
+    entry_month = "strftime('%Y-%m-01', NEW.date)"
+    return (
+        f"UPDATE {target} SET "
+        "total_hours = total_hours + NEW.duration_hours, "
+        "month_hours = CASE "
+        f"WHEN month_start = {entry_month} THEN month_hours + NEW.duration_hours "
+        f"WHEN {entry_month} = {CURRENT_MONTH} THEN NEW.duration_hours "
+        "ELSE month_hours END, "
+        "month_start = CASE "
+        f"WHEN {entry_month} = {CURRENT_MONTH} THEN {entry_month} "
+        "ELSE month_start END, "
+        "last_entry_date = CASE "
+        "WHEN last_entry_date IS NULL OR NEW.date > last_entry_date THEN NEW.date "
+        "ELSE last_entry_date END "
+        f"WHERE id = NEW.{fk};"
+    )
+
+
+def _remove(target, fk):
+    latest = " UNION ALL ".join(
+        f"SELECT max(date) AS day FROM {source} WHERE {fk} = OLD.{fk}"
+        for source in SOURCES
+    )
+    return (
+        f"UPDATE {target} SET "
+        "total_hours = total_hours - OLD.duration_hours, "
+        "month_hours = CASE "
+        "WHEN month_start = strftime('%Y-%m-01', OLD.date) "
+        "THEN month_hours - OLD.duration_hours ELSE month_hours END, "
+        "last_entry_date = CASE WHEN last_entry_date = OLD.date "
+        f"THEN (SELECT max(day) FROM ({latest})) ELSE last_entry_date END "
+        f"WHERE id = OLD.{fk};"
+    )
+
+
+def upgrade():
+    for target, _ in TARGETS:
+        with op.batch_alter_table(target, schema=None) as batch_op:
+            batch_op.add_column(
+                sa.Column("total_hours", sa.Float(), server_default="0", nullable=False)
+            )
+            batch_op.add_column(
+                sa.Column("month_hours", sa.Float(), server_default="0", nullable=False)
+            )
+            batch_op.add_column(sa.Column("month_start", sa.Date(), nullable=True))
+            batch_op.add_column(sa.Column("last_entry_date", sa.Date(), nullable=True))
+            batch_op.create_index(
+                batch_op.f(f"ix_{target}_total_hours"), ["total_hours"], unique=False
+            )
+            batch_op.create_index(
+                batch_op.f(f"ix_{target}_last_entry_date"),
+                ["last_entry_date"],
+                unique=False,
+            )
+
+    for target, fk in TARGETS:
+        entries = " UNION ALL ".join(
+            f"SELECT {fk} AS key, duration_hours AS hours, date AS day FROM {source}"
+            for source in SOURCES
+        )
+        op.execute(
+            f"UPDATE {target} SET "
+            f"total_hours = coalesce((SELECT sum(hours) FROM ({entries}) WHERE key = {target}.id), 0), "
+            f"month_hours = coalesce((SELECT sum(hours) FROM ({entries}) WHERE key = {target}.id "
+            f"AND strftime('%Y-%m-01', day) = {CURRENT_MONTH}), 0), "
+            f"month_start = {CURRENT_MONTH}, "
+            f"last_entry_date = (SELECT max(day) FROM ({entries}) WHERE key = {target}.id)"
+        )
+
+    adds = " ".join(_add(target, fk) for target, fk in TARGETS)
+    removes = " ".join(_remove(target, fk) for target, fk in TARGETS)
+    for source in SOURCES:
+        prefix = f"CREATE TRIGGER {source}_counters"
+        op.execute(f"{prefix}_ai AFTER INSERT ON {source} BEGIN {adds} END")
+        op.execute(f"{prefix}_ad AFTER DELETE ON {source} BEGIN {removes} END")
+        op.execute(
+            f"{prefix}_au AFTER UPDATE OF project_id, person_id, date, "
+            f"duration_hours ON {source} BEGIN {removes} {adds} END"
+        )
+
+
+def downgrade():
+    for source in SOURCES:
+        for suffix in ("ai", "ad", "au"):
+            op.execute(f"DROP TRIGGER IF EXISTS {source}_counters_{suffix}")
+
+    for target, _ in TARGETS:
+        with op.batch_alter_table(target, schema=None) as batch_op:
+            batch_op.drop_index(batch_op.f(f"ix_{target}_last_entry_date"))
+            batch_op.drop_index(batch_op.f(f"ix_{target}_total_hours"))
+            batch_op.drop_column("last_entry_date")
+            batch_op.drop_column("month_start")
+            batch_op.drop_column("month_hours")
+            batch_op.drop_column("total_hours")
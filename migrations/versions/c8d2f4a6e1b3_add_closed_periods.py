@@ -0,0 +1,66 @@
+"""Add closed_periods and period_snapshots tables
+
+Revision ID: c8d2f4a6e1b3
+Revises: a6c1e3f5b7d9
+Create Date: 2026-10-18 21:40:12.532914
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c8d2f4a6e1b3"
+down_revision = "a6c1e3f5b7d9"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "closed_periods",
+        sa.Column("month", sa.Date(), nullable=False),
+        sa.Column("closed_at", sa.DateTime(), nullable=False),
+        sa.Column("closed_by_id", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["closed_by_id"],
+            ["people.id"],
+        ),
+        sa.PrimaryKeyConstraint("month"),
+    )
+    op.create_table(
+        "period_snapshots",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("month", sa.Date(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("project_id", sa.Integer(), nullable=False),
+        sa.Column("person_id", sa.Integer(), nullable=False),
+        sa.Column("hours", sa.Float(), nullable=False),
+        sa.Column("entries", sa.Integer(), nullable=False),
+        sa.Column("cost", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["month"],
+            ["closed_periods.month"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["person_id"],
+            ["people.id"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["project_id"],
+            ["projects.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    with op.batch_alter_table("period_snapshots", schema=None) as batch_op:
+        batch_op.create_index(
+            "ix_period_snapshots_month_day", ["month", "day"], unique=False
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("period_snapshots", schema=None) as batch_op:
+        batch_op.drop_index("ix_period_snapshots_month_day")
+
+    op.drop_table("period_snapshots")
+    op.drop_table("closed_periods")
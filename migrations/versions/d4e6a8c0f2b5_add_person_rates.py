@@ -0,0 +1,55 @@
+"""Add person_rates history and materialised entry costs
+
+Revision ID: d4e6a8c0f2b5
+Revises: c8d2f4a6e1b3
+Create Date: 2026-10-18 23:05:41.218604
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "d4e6a8c0f2b5"
+down_revision = "c8d2f4a6e1b3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "person_rates",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("person_id", sa.Integer(), nullable=False),
+        sa.Column("hourly_rate", sa.Numeric(precision=10, scale=2), nullable=True),
+        sa.Column("effective_from", sa.Date(), nullable=False),
+        sa.Column("effective_to", sa.Date(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["person_id"],
+            ["people.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    with op.batch_alter_table("person_rates", schema=None) as batch_op:
+        batch_op.create_index(
+            "ix_person_rates_person_from",
+            ["person_id", "effective_from"],
+            unique=True,
+        )
+
+    # Plain ADD COLUMN: the tables keep their counter and search triggers.
+    for table in ("time_entries", "time_entries_archive"):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column("cost", sa.Float(), nullable=True))
+
+
+def downgrade():
+    # Native DROP COLUMN (SQLite 3.35+): a batch copy of either entry table
+    # would trip the counter triggers that reference the other one.
+    for table in ("time_entries_archive", "time_entries"):
+        op.drop_column(table, "cost")
+
+    with op.batch_alter_table("person_rates", schema=None) as batch_op:
+        batch_op.drop_index("ix_person_rates_person_from")
+
+    op.drop_table("person_rates")
@@ -0,0 +1,57 @@
+"""Add FTS5 full-text index on time entry notes
+
+Revision ID: d93a5c7e10f4
+Revises: b41f0d6e2a87
+Create Date: 2026-10-18 12:26:09.512330
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "d93a5c7e10f4"
+down_revision = "b41f0d6e2a87"
+branch_labels = None
+depends_on = None
+
+SOURCES = ("time_entries", "time_entries_archive")
+
+
+def upgrade():
+    for source in SOURCES:
+        fts = f"{source}_fts"
+        op.execute(
+            f"""CREATE VIRTUAL TABLE {fts} USING fts5(
+                notes, content='{source}', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            )"""
+        )
+        op.execute(
+            f"""CREATE TRIGGER {source}_fts_ai AFTER INSERT ON {source}
+            BEGIN
+                INSERT INTO {fts}(rowid, notes) VALUES (new.id, new.notes);
+            END"""
+        )
+        op.execute(
+            f"""CREATE TRIGGER {source}_fts_ad AFTER DELETE ON {source}
+            BEGIN
+                INSERT INTO {fts}({fts}, rowid, notes)
+                VALUES ('delete', old.id, old.notes);
+            END"""
+        )
+        op.execute(
+            f"""CREATE TRIGGER {source}_fts_au AFTER UPDATE OF notes ON {source}
+            BEGIN
+                INSERT INTO {fts}({fts}, rowid, notes)
+                VALUES ('delete', old.id, old.notes);
+                INSERT INTO {fts}(rowid, notes) VALUES (new.id, new.notes);
+            END"""
+        )
+        op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def downgrade():
+    for source in SOURCES:
+        for suffix in ("ai", "ad", "au"):
+            op.execute(f"DROP TRIGGER IF EXISTS {source}_fts_{suffix}")
+        op.execute(f"DROP TABLE IF EXISTS {source}_fts")
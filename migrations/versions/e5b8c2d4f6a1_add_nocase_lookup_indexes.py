@@ -0,0 +1,36 @@
+"""Add case-insensitive indexes for project/person lookups
+
+Revision ID: e5b8c2d4f6a1
+Revises: d93a5c7e10f4
+Create Date: 2026-10-18 13:41:27.087512
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e5b8c2d4f6a1"
+down_revision = "d93a5c7e10f4"
+branch_labels = None
+depends_on = None
+
+INDEXES = (
+    ("ix_projects_name_nocase", "projects", "name"),
+    ("ix_projects_code_nocase", "projects", "code"),
+    ("ix_projects_client_nocase", "projects", "client"),
+    ("ix_people_full_name_nocase", "people", "full_name"),
+    ("ix_people_email_nocase", "people", "email"),
+)
+
+
+def upgrade():
+    for name, table, column in INDEXES:
+        op.create_index(
+            name, table, [sa.text(f"{column} COLLATE NOCASE")], unique=False
+        )
+
+
+def downgrade():
+    for name, table, _ in INDEXES:
+        op.drop_index(name, table_name=table)
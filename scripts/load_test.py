@@ -0,0 +1,482 @@
+#!/usr/bin/env python3
+"""Replay a weighted mix of realistic user sessions against a running server.
+
+By default the script seeds a throw-away SQLite database with ``--users`` people
+(``loadtest-NNN@example.com``) and their time entries, starts the app on a local
+port in a separate process and drives it with one thread per virtual user. Each
+virtual user logs in once and then picks scenarios by weight until ``--duration``
+expires: dashboard views with varied filters, timesheet listings, entry creation
+and edits, duplicates and CSV exports.
+
+The report lists, per scenario, throughput, p50/p95/p99 latency and error rate.
+Redirects count as successes; ``503`` from admission control count as errors.
+
+Use ``--url`` to target a server you started yourself, after seeding its
+database with ``--seed-only``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from http.cookiejar import CookieJar
+from pathlib import Path
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import HTTPCookieProcessor, HTTPRedirectHandler, build_opener
+
+# Add parent directory to sys.path to import app module
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+EMAIL_PATTERN = "loadtest-{:03d}@example.com"
+DEFAULT_PASSWORD = "loadtest-password"
+PROJECT_CODES = ("LT-ALPHA", "LT-BETA", "LT-GAMMA", "LT-DELTA", "LT-EPSILON")
+
+DEFAULT_MIX = {
+    "dashboard": 30,
+    "timesheet": 25,
+    "create": 12,
+    "edit": 10,
+    "duplicate": 8,
+    "export": 5,
+}
+
+CSRF_RE = re.compile(r'name="csrf_token"[^>]*value="([^"]+)"')
+ENTRY_ID_RE = re.compile(r"/timesheet/(\d+)/edit")
+PROJECT_LOOKUP = {"q": "", "limit": "50"}
+
+
+# --------------------------------------------------------------------------- seed
+
+
+def seed(users: int, entries_per_user: int, password: str) -> None:
+    """Create the load-test projects, people and entries (idempotent)."""
+
+    from app import create_app
+    from app.extensions import db
+    from app.models import Person, Project, TimeEntry
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        projects = []
+        for code in PROJECT_CODES:
+            project = Project.query.filter_by(code=code).first()
+            if project is None:
+                project = Project(
+                    name=f"Load test {code}", code=code, client="Load test"
+                )
+                db.session.add(project)
+            projects.append(project)
+
+        # Hashing is deliberately slow: compute it once and share it.
+        template = Person(full_name="-", email="-")
+        template.set_password(password)
+        rng = random.Random(42)
+        today = date.today()
+        created = 0
+        for index in range(users):
+            email = EMAIL_PATTERN.format(index)
+            if Person.query.filter_by(email=email).first() is not None:
+                continue
+            person = Person(
+                full_name=f"Load Test {index:03d}",
+                email=email,
+                role="user",
+                hourly_rate=40 + index % 5 * 10,
+                password_hash=template.password_hash,
+            )
+            db.session.add(person)
+            for _ in range(entries_per_user):
+                db.session.add(
+                    TimeEntry(
+                        project=rng.choice(projects),
+                        person=person,
+                        date=today - timedelta(days=rng.randrange(180)),
+                        duration_hours=rng.choice((1, 2, 3.5, 4, 6, 8)),
+                        notes=f"Attività di prova {rng.randrange(1000)}",
+                    )
+                )
+            created += 1
+        db.session.commit()
+        print(f"Seeded {created} load-test users ({users} requested).")
+
+
+def serve(host: str, port: int) -> None:
+    from werkzeug.serving import run_simple
+
+    from app import create_app
+
+    run_simple(host, port, create_app(), threaded=True, use_reloader=False)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_listening(port: int, process: subprocess.Popen, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"Server exited early with code {process.returncode}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise SystemExit(f"Server did not start listening on port {port}")
+
+
+# ---------------------------------------------------------------------- clients
+
+
+class _NoRedirect(HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+@dataclass
+class Stats:
+    latencies: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    statuses: dict[str, dict[int, int]] = field(
+        default_factory=lambda: defaultdict(lambda: defaultdict(int))
+    )
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def record(self, scenario: str, seconds: float, status: int) -> None:
+        with self.lock:
+            self.latencies[scenario].append(seconds)
+            self.statuses[scenario][status] += 1
+            if status == 0 or status >= 400:
+                self.errors[scenario] += 1
+
+
+class VirtualUser:
+    def __init__(self, base_url: str, email: str, password: str, seed: int) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.email = email
+        self.password = password
+        self.rng = random.Random(seed)
+        self.opener = build_opener(HTTPCookieProcessor(CookieJar()), _NoRedirect())
+        self.csrf = ""
+        self.project_ids: list[int] = []
+        self.entry_ids: list[int] = []
+
+    def request(
+        self, path: str, *, data: dict[str, str] | None = None, timeout: float = 60
+    ) -> tuple[int, str]:
+        body = urlencode(data).encode() if data is not None else None
+        try:
+            with self.opener.open(self.base_url + path, body, timeout) as response:
+                return response.status, response.read().decode("utf-8", "replace")
+        except HTTPError as exc:
+            return exc.code, exc.read().decode("utf-8", "replace")
+        except (URLError, OSError):
+            return 0, ""
+
+    def _refresh_csrf(self, html: str) -> None:
+        if match := CSRF_RE.search(html):
+            self.csrf = match.group(1)
+
+    def login(self) -> bool:
+        status, html = self.request("/login")
+        self._refresh_csrf(html)
+        status, _ = self.request(
+            "/login",
+            data={
+                "csrf_token": self.csrf,
+                "email": self.email,
+                "password": self.password,
+            },
+        )
+        if status != 302:
+            return False
+        _, html = self.request("/timesheet/new")
+        self._refresh_csrf(html)
+        self.project_ids = self._discover_projects()
+        self._collect_entries()
+        return bool(self.project_ids)
+
+    def _discover_projects(self) -> list[int]:
+        # The entry form picks projects through the typeahead endpoint.
+        status, body = self.request("/lookup/projects?" + urlencode(PROJECT_LOOKUP))
+        if status != 200:
+            return []
+        try:
+            return [int(item["id"]) for item in json.loads(body)["results"]]
+        except (ValueError, KeyError, TypeError):
+            return []
+
+    def _collect_entries(self) -> None:
+        _, html = self.request("/timesheet/")
+        self.entry_ids = sorted({int(value) for value in ENTRY_ID_RE.findall(html)})
+
+    def _period(self) -> dict[str, str]:
+        end = date.today() - timedelta(days=self.rng.randrange(60))
+        start = end - timedelta(days=self.rng.choice((7, 30, 90, 365)))
+        filters = {"start_date": start.isoformat(), "end_date": end.isoformat()}
+        if self.project_ids and self.rng.random() < 0.3:
+            filters["project_id"] = str(self.rng.choice(self.project_ids))
+        return filters
+
+    def _entry_form(self) -> dict[str, str]:
+        return {
+            "csrf_token": self.csrf,
+            "project_id": str(self.rng.choice(self.project_ids)),
+            "person_id": "0",
+            "date": (date.today() - timedelta(days=self.rng.randrange(30))).isoformat(),
+            "duration_hours": str(self.rng.choice((0.5, 1, 2, 4))),
+            "notes": f"Carico {self.rng.randrange(10_000)}",
+        }
+
+    # Each scenario returns the HTTP status of its measured request.
+
+    def dashboard(self) -> int:
+        return self.request("/dashboard/?" + urlencode(self._period()))[0]
+
+    def timesheet(self) -> int:
+        query = self._period()
+        if self.rng.random() < 0.2:
+            query["search"] = "prova"
+        return self.request("/timesheet/?" + urlencode(query))[0]
+
+    def create(self) -> int:
+        return self.request("/timesheet/new", data=self._entry_form())[0]
+
+    def edit(self) -> int:
+        if not self.entry_ids:
+            self._collect_entries()
+        if not self.entry_ids:
+            return self.create()
+        entry_id = self.rng.choice(self.entry_ids)
+        status, _ = self.request(f"/timesheet/{entry_id}/edit", data=self._entry_form())
+        if status == 404:
+            self.entry_ids.remove(entry_id)
+        return status
+
+    def duplicate(self) -> int:
+        if not self.entry_ids:
+            self._collect_entries()
+        if not self.entry_ids:
+            return self.create()
+        entry_id = self.rng.choice(self.entry_ids)
+        return self.request(
+            f"/timesheet/{entry_id}/duplicate", data={"csrf_token": self.csrf}
+        )[0]
+
+    def export(self) -> int:
+        return self.request("/timesheet/export?" + urlencode(self._period()))[0]
+
+
+def run_user(
+    user: VirtualUser,
+    mix: dict[str, int],
+    stats: Stats,
+    stop_at: float,
+    think_time: float,
+) -> None:
+    started = time.perf_counter()
+    ok = user.login()
+    stats.record("login", time.perf_counter() - started, 302 if ok else 0)
+    if not ok:
+        return
+
+    names = [name for name, weight in mix.items() if weight > 0]
+    weights = [mix[name] for name in names]
+    while time.monotonic() < stop_at:
+        scenario = user.rng.choices(names, weights)[0]
+        started = time.perf_counter()
+        status = getattr(user, scenario)()
+        stats.record(scenario, time.perf_counter() - started, status)
+        if think_time:
+            time.sleep(user.rng.expovariate(1 / think_time))
+
+
+# ----------------------------------------------------------------------- report
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(fraction * len(sorted_values) + 0.5))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarise(stats: Stats, elapsed: float) -> list[dict[str, object]]:
+    rows = []
+    everything: list[float] = []
+    total_errors = 0
+    for scenario in sorted(stats.latencies):
+        values = sorted(stats.latencies[scenario])
+        everything.extend(values)
+        errors = stats.errors[scenario]
+        total_errors += errors
+        rows.append(_row(scenario, values, errors, elapsed))
+        rows[-1]["statuses"] = dict(sorted(stats.statuses[scenario].items()))
+    rows.append(_row("TOTAL", sorted(everything), total_errors, elapsed))
+    return rows
+
+
+def _row(
+    name: str, values: list[float], errors: int, elapsed: float
+) -> dict[str, object]:
+    return {
+        "scenario": name,
+        "requests": len(values),
+        "rps": len(values) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(values, 0.50) * 1000,
+        "p95_ms": percentile(values, 0.95) * 1000,
+        "p99_ms": percentile(values, 0.99) * 1000,
+        "max_ms": (values[-1] if values else 0.0) * 1000,
+        "errors": errors,
+        "error_rate": errors / len(values) if values else 0.0,
+    }
+
+
+def print_report(rows: list[dict[str, object]]) -> None:
+    header = (
+        f"{'scenario':<10} {'requests':>8} {'req/s':>7} {'p50':>8} {'p95':>8} "
+        f"{'p99':>8} {'max':>8} {'errors':>7}"
+    )
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        print(
+            f"{row['scenario']:<10} {row['requests']:>8} {row['rps']:>7.1f} "
+            f"{row['p50_ms']:>6.0f}ms {row['p95_ms']:>6.0f}ms {row['p99_ms']:>6.0f}ms "
+            f"{row['max_ms']:>6.0f}ms {row['error_rate']:>6.1%}"
+        )
+
+
+# ------------------------------------------------------------------------- main
+
+
+def parse_mix(value: str) -> dict[str, int]:
+    mix = dict(DEFAULT_MIX)
+    for item in filter(None, value.split(",")):
+        name, _, weight = item.partition("=")
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"unknown scenario {name!r}")
+        mix[name] = int(weight)
+    return mix
+
+
+def check_target(args: argparse.Namespace, base_url: str) -> None:
+    """Abort unless a virtual user can log in and find projects to write to."""
+
+    probe = VirtualUser(base_url, EMAIL_PATTERN.format(0), args.password, seed=0)
+    if not probe.login():
+        raise SystemExit(
+            f"Cannot log in as {probe.email} or /lookup/projects returned no "
+            "projects: create/edit scenarios would only measure validation errors."
+        )
+
+
+def run_load(args: argparse.Namespace, base_url: str) -> list[dict[str, object]]:
+    check_target(args, base_url)
+    stats = Stats()
+    started = time.monotonic()
+    stop_at = started + args.ramp_up + args.duration
+    threads = []
+    for index in range(args.users):
+        user = VirtualUser(
+            base_url, EMAIL_PATTERN.format(index), args.password, seed=index
+        )
+        thread = threading.Thread(
+            target=run_user,
+            args=(user, args.mix, stats, stop_at, args.think_time),
+            daemon=True,
+        )
+        threads.append(thread)
+        thread.start()
+        if args.ramp_up:
+            time.sleep(args.ramp_up / args.users)
+    for thread in threads:
+        thread.join()
+    return summarise(stats, time.monotonic() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--users", type=int, default=20, help="Concurrent users")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds of load")
+    parser.add_argument(
+        "--ramp-up", type=float, default=5, help="Seconds to start all users"
+    )
+    parser.add_argument(
+        "--think-time",
+        type=float,
+        default=0.0,
+        help="Mean pause between requests of one user (seconds)",
+    )
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        default=dict(DEFAULT_MIX),
+        help="Override weights, e.g. 'dashboard=50,export=0'",
+    )
+    parser.add_argument("--entries", type=int, default=200, help="Entries per user")
+    parser.add_argument("--password", default=DEFAULT_PASSWORD)
+    parser.add_argument("--url", help="Target an already running server")
+    parser.add_argument("--seed-only", action="store_true", help="Only seed the DB")
+    parser.add_argument("--json", type=Path, help="Also write the report as JSON")
+    parser.add_argument("--serve", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve("127.0.0.1", args.serve)
+        return
+    if args.seed_only:
+        seed(args.users, args.entries, args.password)
+        return
+
+    if args.url:
+        rows = run_load(args, args.url)
+    else:
+        with tempfile.TemporaryDirectory() as workdir:
+            env = {
+                **os.environ,
+                "DATABASE_URI": f"sqlite:///{Path(workdir) / 'loadtest.db'}",
+            }
+            os.environ.update(env)
+            seed(args.users, args.entries, args.password)
+            port = _free_port()
+            server = subprocess.Popen(
+                [sys.executable, __file__, "--serve", str(port)],
+                env=env,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            try:
+                _wait_until_listening(port, server, timeout=30)
+                rows = run_load(args, f"http://127.0.0.1:{port}")
+            finally:
+                server.terminate()
+                server.wait(timeout=10)
+
+    print_report(rows)
+    if args.json:
+        args.json.write_text(json.dumps(rows, indent=2, default=str), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Measure worker cold-start latency with and without the template caches.
+
+Every sample runs in a fresh interpreter: it builds the app on an in-memory
+database, logs in and times the first ``/dashboard/`` request.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to sys.path to import app module
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def run_child() -> None:
+    started = time.perf_counter()
+    from app import create_app
+    from app.extensions import db
+    from app.models import Person
+
+    app = create_app()
+    app_ready = time.perf_counter()
+    app.config.update(WTF_CSRF_ENABLED=False)
+
+    with app.app_context():
+        db.create_all()
+        user = Person(full_name="Bench", email="bench@example.com", role="admin")
+        user.set_password("bench-password")
+        db.session.add(user)
+        db.session.commit()
+
+        client = app.test_client()
+        client.post("/login", data={"email": user.email, "password": "bench-password"})
+        request_started = time.perf_counter()
+        response = client.get("/dashboard/")
+        first_request = time.perf_counter() - request_started
+
+    print(
+        json.dumps(
+            {
+                "status": response.status_code,
+                "create_app_ms": (app_ready - started) * 1000,
+                "first_dashboard_ms": first_request * 1000,
+            }
+        )
+    )
+
+
+def sample(env: dict[str, str]) -> dict[str, float]:
+    output = subprocess.run(
+        [sys.executable, __file__, "--child"],
+        env={**os.environ, "DATABASE_URI": "sqlite://", **env},
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5, help="Samples per mode")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child()
+        return
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        modes = {
+            "no cache": {"TEMPLATE_BYTECODE_CACHE": "0", "TEMPLATE_WARMUP": "0"},
+            "bytecode cache": {
+                "TEMPLATE_BYTECODE_CACHE": "1",
+                "TEMPLATE_BYTECODE_CACHE_DIR": cache_dir,
+                "TEMPLATE_WARMUP": "0",
+            },
+            "cache + warm-up": {
+                "TEMPLATE_BYTECODE_CACHE": "1",
+                "TEMPLATE_BYTECODE_CACHE_DIR": cache_dir,
+                "TEMPLATE_WARMUP": "1",
+            },
+        }
+        # Populate the bytecode cache once so the cached modes measure a warm disk.
+        sample(modes["bytecode cache"])
+
+        print(f"{'mode':<18} {'create_app':>12} {'1st dashboard':>14}")
+        for label, env in modes.items():
+            runs = [sample(env) for _ in range(args.runs)]
+            create_ms = statistics.median(run["create_app_ms"] for run in runs)
+            first_ms = statistics.median(run["first_dashboard_ms"] for run in runs)
+            print(f"{label:<18} {create_ms:10.1f}ms {first_ms:12.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Tests for per-class admission control."""
+
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+import pytest
+
+from app.admission import AdmissionController, Gate, Overloaded
+
+
+def test_gate_queues_then_rejects() -> None:
+    gate = Gate("report", limit=1, queue=1, timeout=5, retry_after=7)
+    gate.acquire()
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        waiter = pool.submit(gate.acquire)
+        while gate.stats.waiting < 1:
+            threading.Event().wait(0.001)
+
+        with pytest.raises(Overloaded) as info:
+            gate.acquire()
+        assert info.value.retry_after == 7
+
+        gate.release()
+        assert waiter.result() >= 0
+
+    assert gate.stats.active == 1
+    assert gate.stats.admitted == 2
+    assert gate.stats.rejected == 1
+
+
+def test_gate_wait_times_out() -> None:
+    gate = Gate("export", limit=1, queue=5, timeout=0.01)
+    gate.acquire()
+
+    with pytest.raises(Overloaded):
+        gate.acquire()
+
+    assert gate.stats.timeouts == 1
+    assert gate.stats.wait_seconds_max >= 0.01
+    assert gate.stats.waiting == 0
+
+
+def test_saturated_report_class_leaves_writes_alone(
+    client, login, admin_user, sample_project
+) -> None:
+    app = client.application
+    app.extensions["admission"] = AdmissionController(
+        {
+            "light": {"limit": 4, "queue": 4, "timeout": 1},
+            "report": {"limit": 0, "queue": 0, "timeout": 1, "retry_after": 12},
+        }
+    )
+    login(admin_user.email, "password123")
+
+    response = client.get("/dashboard/")
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert response.headers["Retry-After"] == "12"
+
+    created = client.post(
+        "/timesheet/new",
+        data={
+            "project_id": sample_project.id,
+            "person_id": admin_user.id,
+            "date": "2024-05-06",
+            "duration_hours": "2",
+        },
+    )
+    assert created.status_code == HTTPStatus.FOUND
+    stats = app.extensions["admission"].stats()
+    assert stats["report"].rejected >= 1
+    assert stats["light"].active == 0
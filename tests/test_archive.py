@@ -0,0 +1,85 @@
+"""Tests for moving closed time entries into the archive table."""
+
+from __future__ import annotations
+
+from datetime import date
+
+from app.core.archive import archive_time_entries, archived_through, entry_source
+from app.core.services import (
+    TimesheetFilters,
+    get_dashboard_data,
+    get_timesheet_entries,
+    get_timesheet_rows,
+)
+from app.extensions import db
+from app.models import ArchivedTimeEntry, TimeEntry
+
+
+def _add_entries(project, person) -> None:
+    db.session.add_all(
+        [
+            TimeEntry(
+                project=project, person=person, date=date(2022, 3, 1), duration_hours=2
+            ),
+            TimeEntry(
+                project=project, person=person, date=date(2022, 3, 2), duration_hours=3
+            ),
+            TimeEntry(
+                project=project, person=person, date=date(2024, 1, 1), duration_hours=4
+            ),
+        ]
+    )
+    db.session.commit()
+
+
+def test_archive_moves_old_entries_in_batches(app, sample_project, admin_user):
+    _add_entries(sample_project, admin_user)
+
+    moved = archive_time_entries(date(2023, 1, 1), batch_size=1)
+
+    assert moved == 2
+    assert TimeEntry.query.count() == 1
+    assert ArchivedTimeEntry.query.count() == 2
+    assert archived_through() == date(2022, 3, 2)
+
+
+def test_range_after_archive_reads_hot_table_only(app, sample_project, admin_user):
+    _add_entries(sample_project, admin_user)
+    archive_time_entries(date(2023, 1, 1))
+
+    assert entry_source(date(2023, 6, 1), None) is TimeEntry
+    assert entry_source(date(2022, 1, 1), None) is not TimeEntry
+    assert entry_source(None, date(2024, 1, 31)) is not TimeEntry
+
+
+def test_queries_crossing_cutoff_include_archive(app, sample_project, admin_user):
+    _add_entries(sample_project, admin_user)
+    archive_time_entries(date(2023, 1, 1))
+
+    filters = TimesheetFilters(start_date=date(2022, 1, 1), end_date=date(2024, 12, 31))
+    data = get_dashboard_data(filters)
+    assert data["total_hours"] == 9
+    assert data["hours_by_day"][0] == ("2022-03-01", 2.0)
+
+    entries = get_timesheet_entries(filters).all()
+    assert len(entries) == 3
+    assert [entry.is_archived for entry in entries] == [False, True, True]
+    assert entries[1].project.name == sample_project.name
+
+    rows = get_timesheet_rows(filters)
+    assert [row.id for row in rows] == [entry.id for entry in entries]
+    assert [row.is_archived for row in rows] == [False, True, True]
+
+
+def test_timesheet_marks_archived_entries_read_only(
+    client, login, admin_user, sample_project
+):
+    _add_entries(sample_project, admin_user)
+    archive_time_entries(date(2023, 1, 1))
+
+    login(admin_user.email, "password123")
+    response = client.get("/timesheet/?start_date=2022-01-01&end_date=2022-12-31")
+
+    assert response.status_code == 200
+    assert response.data.count(b"Archiviata") == 2
+    assert b"Modifica" not in response.data
@@ -0,0 +1,64 @@
+"""Tests for fingerprinted and precompressed static assets."""
+
+from __future__ import annotations
+
+import os
+import re
+from http import HTTPStatus
+
+from app.assets import compress_static
+
+CHART_URL = re.compile(rb'src="(/static/js/chart\.umd\.min\.js\?v=[0-9a-f]{12})"')
+
+
+def test_chart_js_only_on_pages_that_need_it(client, login, admin_user) -> None:
+    login(admin_user.email, "password123")
+
+    assert CHART_URL.search(client.get("/dashboard/").data)
+    assert b"chart.umd.min.js" not in client.get("/timesheet/").data
+
+
+def test_fingerprinted_url_is_immutable(client, login, admin_user) -> None:
+    login(admin_user.email, "password123")
+    url = CHART_URL.search(client.get("/dashboard/").data).group(1).decode()
+
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    assert response.cache_control.immutable
+    assert response.cache_control.max_age == 365 * 24 * 3600
+
+    stale = client.get("/static/js/chart.umd.min.js?v=000000000000")
+    assert not stale.cache_control.immutable
+
+
+def test_gzip_variant_served_when_accepted(app, client, tmp_path) -> None:
+    source = tmp_path / "app.js"
+    source.write_text("console.log('hello');\n" * 200)
+    assert compress_static(str(tmp_path)) == [tmp_path / "app.js.gz"]
+    assert compress_static(str(tmp_path)) == []
+
+    app.static_folder = str(tmp_path)
+    plain = client.get("/static/app.js")
+    gzipped = client.get("/static/app.js", headers={"Accept-Encoding": "gzip"})
+
+    assert "Content-Encoding" not in plain.headers
+    assert gzipped.headers["Content-Encoding"] == "gzip"
+    assert gzipped.mimetype == "text/javascript"
+    assert len(gzipped.data) < len(plain.data)
+    assert "Accept-Encoding" in gzipped.vary
+
+
+def test_stale_gzip_variant_is_not_served(app, client, tmp_path) -> None:
+    source = tmp_path / "app.js"
+    source.write_text("console.log('old');\n" * 200)
+    compress_static(str(tmp_path))
+    gz = tmp_path / "app.js.gz"
+    # Deployed after the last compress-assets run.
+    source.write_text("console.log('new');\n" * 200)
+    os.utime(gz, ns=(source.stat().st_mtime_ns - 10**9,) * 2)
+
+    app.static_folder = str(tmp_path)
+    response = client.get("/static/app.js", headers={"Accept-Encoding": "gzip"})
+
+    assert "Content-Encoding" not in response.headers
+    assert b"new" in response.data
@@ -0,0 +1,73 @@
+"""Tests for ETag / If-None-Match handling on read views."""
+
+from __future__ import annotations
+
+from datetime import date
+from http import HTTPStatus
+
+from app.core.services import bulk_delete_entries
+from app.core.versioning import data_version
+from app.extensions import db
+from app.models import TimeEntry
+
+
+def test_dashboard_answers_304_until_data_changes(
+    client, login, admin_user, sample_project
+) -> None:
+    login(admin_user.email, "password123")
+    url = "/dashboard/?start_date=2024-01-01&end_date=2024-01-31"
+
+    first = client.get(url)
+    assert first.status_code == HTTPStatus.OK
+    etag = first.headers["ETag"]
+    assert "no-cache" in first.headers["Cache-Control"]
+
+    cached = client.get(url, headers={"If-None-Match": etag})
+    assert cached.status_code == HTTPStatus.NOT_MODIFIED
+    assert cached.data == b""
+
+    other_range = client.get(
+        "/dashboard/?start_date=2024-02-01&end_date=2024-02-28",
+        headers={"If-None-Match": etag},
+    )
+    assert other_range.status_code == HTTPStatus.OK
+
+    db.session.add(
+        TimeEntry(
+            project=sample_project,
+            person=admin_user,
+            date=date(2024, 1, 2),
+            duration_hours=1,
+        )
+    )
+    db.session.commit()
+
+    refreshed = client.get(url, headers={"If-None-Match": etag})
+    assert refreshed.status_code == HTTPStatus.OK
+    assert refreshed.headers["ETag"] != etag
+
+
+def test_export_and_lists_are_conditional(client, login, admin_user) -> None:
+    login(admin_user.email, "password123")
+
+    for url in ("/timesheet/export", "/timesheet/", "/projects/", "/people/"):
+        etag = client.get(url).headers["ETag"]
+        response = client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, url
+
+
+def test_bulk_statements_bump_data_version(app, admin_user, sample_project) -> None:
+    entry = TimeEntry(
+        project=sample_project,
+        person=admin_user,
+        date=date(2024, 1, 1),
+        duration_hours=1,
+    )
+    db.session.add(entry)
+    db.session.commit()
+    before = data_version("time_entries")
+
+    bulk_delete_entries([entry.id], owner_id=None)
+    db.session.commit()
+
+    assert data_version("time_entries") != before
@@ -0,0 +1,116 @@
+"""Tests for the trigger-maintained project and person activity counters."""
+
+from __future__ import annotations
+
+from datetime import date
+
+from sqlalchemy import update
+
+from app.core.archive import archive_time_entries
+from app.core.counters import reconcile_counters
+from app.core.services import bulk_delete_entries, bulk_duplicate_entries
+from app.extensions import db
+from app.models import Project, TimeEntry
+
+
+def _refresh(*objects) -> None:
+    for obj in objects:
+        db.session.refresh(obj)
+
+
+def test_counters_follow_entry_writes(app, admin_user, sample_project) -> None:
+    today = date.today()
+    entry = TimeEntry(
+        project=sample_project, person=admin_user, date=today, duration_hours=3
+    )
+    old = TimeEntry(
+        project=sample_project,
+        person=admin_user,
+        date=date(2020, 1, 6),
+        duration_hours=2,
+    )
+    db.session.add_all([entry, old])
+    db.session.commit()
+    _refresh(sample_project, admin_user)
+
+    assert sample_project.total_hours == 5
+    assert sample_project.hours_this_month == 3
+    assert sample_project.last_entry_date == today
+    assert admin_user.total_hours == 5
+
+    entry.duration_hours = 4.5
+    db.session.commit()
+    _refresh(sample_project)
+    assert sample_project.total_hours == 6.5
+    assert sample_project.hours_this_month == 4.5
+
+    db.session.delete(entry)
+    db.session.commit()
+    _refresh(sample_project, admin_user)
+    assert sample_project.total_hours == 2
+    assert sample_project.hours_this_month == 0
+    assert sample_project.last_entry_date == date(2020, 1, 6)
+    assert admin_user.last_entry_date == date(2020, 1, 6)
+
+
+def test_counters_follow_moves_bulk_and_archive(app, admin_user) -> None:
+    first = Project(name="First", code="F1", is_active=True)
+    second = Project(name="Second", code="S2", is_active=True)
+    entry = TimeEntry(
+        project=first, person=admin_user, date=date(2021, 4, 1), duration_hours=2
+    )
+    db.session.add_all([first, second, entry])
+    db.session.commit()
+
+    entry.project = second
+    db.session.commit()
+    _refresh(first, second)
+    assert (first.total_hours, first.last_entry_date) == (0, None)
+    assert (second.total_hours, second.last_entry_date) == (2, date(2021, 4, 1))
+
+    bulk_duplicate_entries([entry.id], owner_id=admin_user.id, shift_days=7)
+    db.session.commit()
+    _refresh(second)
+    assert second.total_hours == 4
+    assert second.last_entry_date == date(2021, 4, 8)
+
+    archive_time_entries(date(2021, 4, 5))
+    _refresh(second)
+    assert second.total_hours == 4
+    assert second.last_entry_date == date(2021, 4, 8)
+
+    bulk_delete_entries(
+        db.session.scalars(db.select(TimeEntry.id)).all(), owner_id=admin_user.id
+    )
+    db.session.commit()
+    _refresh(second)
+    assert second.total_hours == 2
+    assert second.last_entry_date == date(2021, 4, 1)
+
+
+def test_reconcile_reports_and_fixes_drift(app, admin_user, sample_project) -> None:
+    db.session.add(
+        TimeEntry(
+            project=sample_project,
+            person=admin_user,
+            date=date.today(),
+            duration_hours=3,
+        )
+    )
+    db.session.commit()
+    assert all(drift.drifted == 0 for drift in reconcile_counters(apply=False))
+
+    db.session.execute(
+        update(Project).values(total_hours=99, last_entry_date=date(2000, 1, 1))
+    )
+    db.session.commit()
+
+    projects, people = reconcile_counters(apply=False)
+    assert (projects.drifted, projects.max_hours_delta) == (1, 96)
+    assert people.drifted == 0
+
+    reconcile_counters()
+    _refresh(sample_project)
+    assert sample_project.total_hours == 3
+    assert sample_project.last_entry_date == date.today()
+    assert reconcile_counters(apply=False)[0].drifted == 0
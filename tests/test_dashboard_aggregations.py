@@ -2,6 +2,9 @@ from __future__ import annotations
 
 from datetime import date
 
+from sqlalchemy import create_engine
+
+from app.core.parallel import supports_concurrent_reads
 from app.core.services import TimesheetFilters, get_dashboard_data
 from app.extensions import db
 from app.models import TimeEntry
@@ -38,3 +41,70 @@ def test_dashboard_summary(app, sample_project, admin_user, regular_user):
     assert len(data["hours_by_day"]) == 2
     assert data["hours_by_day"][0][0] == "2024-01-01"
     assert data["peak_day"] == {"date": "2024-01-01", "hours": 4.0}
+
+
+def test_concurrent_dashboard_matches_sequential(
+    app, sample_project, admin_user, regular_user
+):
+    db.session.add_all(
+        TimeEntry(
+            project=sample_project,
+            person=person,
+            date=date(2024, 2, day),
+            duration_hours=day % 4 + 1,
+        )
+        for day in range(1, 15)
+        for person in (admin_user, regular_user)
+    )
+    db.session.commit()
+
+    filters = TimesheetFilters(start_date=date(2024, 2, 1), end_date=date(2024, 2, 29))
+    sequential = get_dashboard_data(filters)
+    concurrent = get_dashboard_data(filters, concurrent=True, workers=4)
+
+    assert concurrent == sequential
+    assert concurrent["total_hours"] == 2 * sum(day % 4 + 1 for day in range(1, 15))
+
+
+def test_in_memory_database_runs_sequentially():
+    assert not supports_concurrent_reads(create_engine("sqlite://"))
+    assert supports_concurrent_reads(create_engine("sqlite:////tmp/app.db"))
+
+
+def test_dashboard_compares_with_previous_period_and_rolls(
+    app, sample_project, admin_user
+):
+    # Previous week (Jan 1-7): 10h; current week (Jan 8-14): 3h + 4h.
+    for day, hours in [(1, 4), (5, 6), (8, 3), (10, 4)]:
+        db.session.add(
+            TimeEntry(
+                project=sample_project,
+                person=admin_user,
+                date=date(2024, 1, day),
+                duration_hours=hours,
+            )
+        )
+    db.session.commit()
+
+    filters = TimesheetFilters(start_date=date(2024, 1, 8), end_date=date(2024, 1, 14))
+    data = get_dashboard_data(filters)
+
+    assert data["comparison"] == {
+        "current_hours": 7.0,
+        "previous_hours": 10.0,
+        "previous_start": "2024-01-01",
+        "previous_end": "2024-01-07",
+        "delta_hours": -3.0,
+        "delta_percent": -30.0,
+    }
+    assert [day for day, _ in data["hours_by_day"]] == ["2024-01-08", "2024-01-10"]
+    # Jan 8 window: Jan 2-8 = 6 + 3; Jan 10 window: Jan 4-10 = 6 + 3 + 4.
+    assert data["rolling_7"] == [round(9 / 7, 2), round(13 / 7, 2)]
+    assert data["rolling_28"] == [round(13 / 28, 2), round(17 / 28, 2)]
+
+
+def test_dashboard_without_period_has_no_comparison(app):
+    data = get_dashboard_data(TimesheetFilters())
+
+    assert data["comparison"] is None
+    assert data["rolling_7"] == []
@@ -0,0 +1,112 @@
+"""Tests for deleting projects and people with their time entries."""
+
+from __future__ import annotations
+
+import csv
+from datetime import date
+
+import pytest
+
+from app.core.archive import archive_time_entries
+from app.core.deletion import DeletionBlocked, delete_person, delete_project
+from app.extensions import db
+from app.models import ArchivedTimeEntry, Person, Project, TimeEntry
+
+
+def _history(project, person, days: int = 5) -> None:
+    db.session.add_all(
+        TimeEntry(
+            project=project,
+            person=person,
+            date=date(2021, 3, day),
+            duration_hours=1,
+        )
+        for day in range(1, days + 1)
+    )
+    db.session.commit()
+
+
+def test_block_policy_refuses_records_with_entries(app, admin_user, sample_project):
+    _history(sample_project, admin_user)
+
+    with pytest.raises(DeletionBlocked) as info:
+        delete_project(sample_project.id)
+
+    assert info.value.entries == 5
+    assert db.session.get(Project, sample_project.id) is not None
+
+    empty = Project(name="Empty", code="EMP", is_active=True)
+    db.session.add(empty)
+    db.session.commit()
+    assert delete_project(empty.id).entries == 0
+    assert db.session.get(Project, empty.id) is None
+
+
+def test_reassign_moves_hot_and_archived_entries_in_batches(
+    app, admin_user, sample_project
+):
+    target = Project(name="Target", code="TGT", is_active=True)
+    db.session.add(target)
+    _history(sample_project, admin_user)
+    archive_time_entries(date(2021, 3, 3))
+
+    with pytest.raises(ValueError, match="target"):
+        delete_project(
+            sample_project.id, policy="reassign", target_id=sample_project.id
+        )
+
+    project_id = sample_project.id
+    result = delete_project(
+        project_id, policy="reassign", target_id=target.id, batch_size=2
+    )
+
+    assert result.entries == 5
+    assert db.session.get(Project, project_id) is None
+    assert TimeEntry.query.filter_by(project_id=target.id).count() == 3
+    assert ArchivedTimeEntry.query.filter_by(project_id=target.id).count() == 2
+    db.session.refresh(target)
+    assert target.total_hours == 5
+
+
+def test_archive_policy_exports_then_deletes(app, admin_user, sample_project, tmp_path):
+    _history(sample_project, admin_user)
+    archive_time_entries(date(2021, 3, 2))
+
+    person_id = admin_user.id
+    result = delete_person(
+        person_id, policy="archive", batch_size=2, archive_dir=tmp_path
+    )
+
+    assert result.entries == 5
+    assert db.session.get(Person, person_id) is None
+    assert TimeEntry.query.count() == ArchivedTimeEntry.query.count() == 0
+    with result.archive_file.open(newline="", encoding="utf-8") as handle:
+        rows = list(csv.DictReader(handle))
+    assert len(rows) == 5
+    assert {row["source"] for row in rows} == {"time_entries", "time_entries_archive"}
+
+
+def test_delete_route_reports_counts(client, login, admin_user, sample_project):
+    target = Project(name="Target", code="TGT", is_active=True)
+    db.session.add(target)
+    _history(sample_project, admin_user, days=3)
+
+    project_id = sample_project.id
+    login(admin_user.email, "password123")
+    page = client.get(f"/projects/{project_id}/delete")
+    assert b"<strong>3</strong>" in page.data
+
+    blocked = client.post(
+        f"/projects/{sample_project.id}/delete",
+        data={"policy": "block"},
+        follow_redirects=True,
+    )
+    assert b"ha 3 registrazioni" in blocked.data
+
+    response = client.post(
+        f"/projects/{sample_project.id}/delete",
+        data={"policy": "reassign", "target_id": target.id},
+        follow_redirects=True,
+    )
+    assert b"registrazioni spostate: 3" in response.data
+    assert db.session.get(Project, project_id) is None
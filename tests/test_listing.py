@@ -0,0 +1,79 @@
+"""Tests for the paginated project and people lists."""
+
+from __future__ import annotations
+
+from datetime import date
+from http import HTTPStatus
+
+from app.core.archive import archive_time_entries
+from app.core.listing import list_people, list_projects
+from app.extensions import db
+from app.models import Project, TimeEntry
+
+
+def _projects(count: int) -> list[Project]:
+    projects = [
+        Project(name=f"Project {index:02d}", code=f"P{index:02d}", is_active=True)
+        for index in range(count)
+    ]
+    db.session.add_all(projects)
+    db.session.commit()
+    return projects
+
+
+def test_projects_are_paginated_and_searchable(app) -> None:
+    _projects(30)
+
+    first = list_projects(per_page=10)
+    assert first.pagination.total == 30
+    assert first.pagination.pages == 3
+    assert [p.name for p, _ in first.rows][:2] == ["Project 00", "Project 01"]
+
+    last = list_projects(per_page=10, page=3, direction="desc")
+    assert [p.name for p, _ in last.rows][-1] == "Project 00"
+
+    found = list_projects(search="p1")
+    assert [p.code for p, _ in found.rows] == [f"P1{i}" for i in range(10)]
+
+
+def test_activity_columns_include_archive(app, admin_user) -> None:
+    busy, idle = _projects(2)
+    db.session.add_all(
+        [
+            TimeEntry(
+                project=busy, person=admin_user, date=date(2020, 1, 2), duration_hours=3
+            ),
+            TimeEntry(
+                project=busy, person=admin_user, date=date(2024, 5, 6), duration_hours=2
+            ),
+        ]
+    )
+    db.session.commit()
+    archive_time_entries(date(2023, 1, 1))
+
+    listing = list_projects(sort="hours", direction="desc")
+    (top, top_activity), (bottom, bottom_activity) = listing.rows
+
+    assert top.id == busy.id
+    assert top_activity.hours == 5
+    assert top_activity.last_activity == date(2024, 5, 6)
+    assert bottom.id == idle.id
+    assert bottom_activity.hours == 0
+    assert bottom_activity.last_activity is None
+
+    people = list_people(sort="last_activity", direction="desc")
+    assert people.rows[0][1].hours == 5
+
+
+def test_list_routes_render_pages(client, login, admin_user) -> None:
+    _projects(30)
+    login(admin_user.email, "password123")
+
+    response = client.get("/projects/?page=2&per_page=25&sort=code&dir=desc")
+    assert response.status_code == HTTPStatus.OK
+    assert b"Project 04" in response.data
+    assert b"Project 29" not in response.data
+    assert b"30 risultati" in response.data
+
+    people = client.get("/people/?q=adm")
+    assert b"admin@example.com" in people.data
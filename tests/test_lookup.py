@@ -0,0 +1,101 @@
+"""Tests for the project/person typeahead endpoints."""
+
+from __future__ import annotations
+
+from http import HTTPStatus
+
+from app.extensions import db
+from app.models import Person, Project, TimeEntry
+
+
+def test_project_lookup_matches_prefix(client, login, admin_user) -> None:
+    db.session.add_all(
+        [
+            Project(name="Alpha", code="ALP", client="Acme", is_active=True),
+            Project(name="Beta", code="B-1", client="Alpine Srl", is_active=True),
+            Project(name="Alpaca", code="X", client=None, is_active=False),
+            Project(name="Gamma_1", code="G", client=None, is_active=True),
+        ]
+    )
+    db.session.commit()
+    login(admin_user.email, "password123")
+
+    response = client.get("/lookup/projects?q=al")
+    assert response.status_code == HTTPStatus.OK
+    labels = [item["label"] for item in response.get_json()["results"]]
+    assert labels == ["Alpha", "Beta"]
+
+    everything = client.get("/lookup/projects?q=al&all=1").get_json()["results"]
+    assert [item["label"] for item in everything] == ["Alpaca", "Alpha", "Beta"]
+
+    limited = client.get("/lookup/projects?q=al&limit=1").get_json()["results"]
+    assert len(limited) == 1
+
+    # LIKE wildcards typed by the user are matched literally.
+    assert client.get("/lookup/projects?q=gamma_").get_json()["results"]
+    assert not client.get("/lookup/projects?q=%25").get_json()["results"]
+
+
+def test_people_lookup_by_name_or_email(client, login, admin_user) -> None:
+    person = Person(full_name="Giulia Rossi", email="g.rossi@example.com")
+    person.set_password("password123")
+    db.session.add(person)
+    db.session.commit()
+    login(admin_user.email, "password123")
+
+    by_name = client.get("/lookup/people?q=giu").get_json()["results"]
+    by_email = client.get("/lookup/people?q=g.ro").get_json()["results"]
+
+    assert (
+        by_name
+        == by_email
+        == [{"id": person.id, "label": "Giulia Rossi", "detail": "g.rossi@example.com"}]
+    )
+
+
+def test_people_lookup_only_returns_self_to_non_admins(
+    client, login, admin_user, regular_user
+) -> None:
+    login(regular_user.email, "password123")
+
+    everyone = client.get("/lookup/people?q=&all=1").get_json()["results"]
+    by_admin_email = client.get("/lookup/people?q=admin").get_json()["results"]
+
+    assert everyone == [{"id": regular_user.id, "label": "User", "detail": ""}]
+    assert by_admin_email == []
+
+
+def test_forms_render_only_selected_choices(
+    client, login, admin_user, sample_project
+) -> None:
+    db.session.add(Project(name="Other project", is_active=True))
+    db.session.commit()
+    login(admin_user.email, "password123")
+
+    page = client.get(f"/timesheet/?project_id={sample_project.id}").data
+
+    assert b"Project A" in page
+    assert b"Other project" not in page
+    assert b"data-lookup-url" in page
+
+
+def test_submitted_ids_are_still_validated(
+    client, login, admin_user, sample_project
+) -> None:
+    inactive = Project(name="Closed", is_active=False)
+    db.session.add(inactive)
+    db.session.commit()
+    login(admin_user.email, "password123")
+
+    response = client.post(
+        "/timesheet/new",
+        data={
+            "project_id": inactive.id,
+            "person_id": admin_user.id,
+            "date": "2024-01-01",
+            "duration_hours": "1",
+        },
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert TimeEntry.query.count() == 0
@@ -0,0 +1,152 @@
+"""Tests for the Prometheus metrics endpoint."""
+
+from __future__ import annotations
+
+import json
+import threading
+from http import HTTPStatus
+
+import pytest
+
+from app.admission import Gate, Overloaded
+from app.assets import fingerprint
+from app.core.singleflight import SingleFlight
+from app.metrics import Registry, read_process_files, registry, render
+
+
+def _count(name: str, **labels: str) -> float:
+    value = registry.snapshot().get((name, tuple(sorted(labels.items()))), 0)
+    return value[-1] if isinstance(value, list) else value
+
+
+def test_metrics_endpoint_reports_requests_and_queries(
+    client, login, admin_user
+) -> None:
+    login(admin_user.email, "password123")
+    client.get("/dashboard/")
+    etag = client.get("/projects/").headers["ETag"]
+    client.get("/projects/", headers={"If-None-Match": etag})
+
+    response = client.get("/metrics")
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.content_type.startswith("text/plain")
+    body = response.get_data(as_text=True)
+    assert "# TYPE http_request_duration_seconds histogram" in body
+    assert (
+        'http_request_duration_seconds_count{blueprint="dashboard",'
+        'endpoint="dashboard.index",method="GET",status="2xx"}'
+    ) in body
+    assert "db_query_duration_seconds_count" in body
+    assert 'cache_requests_total{cache="etag",result="hit"}' in body
+    assert 'password_hash_duration_seconds_count{operation="check"}' in body
+    assert 'db_pool_connections{state="checked_out"}' in body
+    assert 'admission_requests{class="report",state="active"} 0' in body
+
+
+def test_metrics_are_admin_only_without_token(client, login, regular_user) -> None:
+    assert client.get("/metrics").status_code == HTTPStatus.UNAUTHORIZED
+
+    login(regular_user.email, "password123")
+    assert client.get("/metrics").status_code == HTTPStatus.FORBIDDEN
+
+
+def test_metrics_token(client) -> None:
+    client.application.config["METRICS_TOKEN"] = "s3cret"
+
+    assert client.get("/metrics").status_code == HTTPStatus.UNAUTHORIZED
+    authorised = client.get("/metrics", headers={"Authorization": "Bearer s3cret"})
+    assert authorised.status_code == HTTPStatus.OK
+
+
+def test_unhandled_errors_are_observed_as_5xx(app, client) -> None:
+    def boom() -> str:
+        raise RuntimeError("boom")
+
+    app.add_url_rule("/boom", "boom", boom)
+    labels = {"blueprint": "", "endpoint": "boom", "method": "GET", "status": "5xx"}
+
+    with pytest.raises(RuntimeError):
+        client.get("/boom")
+
+    assert _count("http_request_duration_seconds", **labels) == 1
+
+
+def test_events_are_recorded_as_counters(app) -> None:
+    admitted = {"class": "metrics-test", "event": "admitted"}
+    rejected = {"class": "metrics-test", "event": "rejected"}
+    coalesce = {"namespace": "metrics-test", "event": "executions"}
+    digest_hit = {"cache": "asset_digest", "result": "hit"}
+    fingerprint(app.static_folder, "js/lookup.js")
+    before = [
+        _count("admission_events_total", **admitted),
+        _count("admission_events_total", **rejected),
+        _count("single_flight_calls_total", **coalesce),
+        _count("cache_requests_total", **digest_hit),
+    ]
+
+    gate = Gate("metrics-test", limit=1, queue=0, timeout=1)
+    gate.acquire()
+    with pytest.raises(Overloaded):
+        gate.acquire()
+    SingleFlight().do(("metrics-test", 1), lambda: 42)
+    fingerprint(app.static_folder, "js/lookup.js")
+
+    after = [
+        _count("admission_events_total", **admitted),
+        _count("admission_events_total", **rejected),
+        _count("single_flight_calls_total", **coalesce),
+        _count("cache_requests_total", **digest_hit),
+    ]
+    assert [new - old for new, old in zip(after, before, strict=True)] == [1, 1, 1, 1]
+
+
+def test_thread_shards_are_summed_and_retired() -> None:
+    registry = Registry()
+    hits = registry.counter("hits_total", "Hits.")
+    latency = registry.histogram("latency_seconds", "Latency.", (0.1, 1))
+
+    def work() -> None:
+        for _ in range(100):
+            hits.inc(kind="a")
+        latency.observe(0.5)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    latency.observe(5)
+
+    snapshot = registry.snapshot()
+    assert snapshot[("hits_total", (("kind", "a"),))] == 400
+    assert snapshot[("latency_seconds", ())] == [0, 4, 1, 7.0, 5]
+    assert len(registry._shards) == 1  # only the main thread is still alive
+
+
+def test_render_histogram_is_cumulative(app) -> None:
+    text = render(
+        {("export_rows", ()): [1, 2, 0, 0, 0, 0, 1, 2_000_150.0, 4]},
+        {},
+    )
+
+    assert 'export_rows_bucket{le="10"} 1' in text
+    assert 'export_rows_bucket{le="100"} 3' in text
+    assert 'export_rows_bucket{le="+Inf"} 4' in text
+    assert "export_rows_count 4" in text
+
+
+def test_multiprocess_files_are_merged(tmp_path) -> None:
+    sample = ["cache_requests_total", [["cache", "etag"], ["result", "hit"]], 2]
+    gauge = ["db_pool_connections", [["state", "size"]], 5]
+    for pid in (1, 999_999_999):  # init is alive, the other pid does not exist
+        (tmp_path / f"{pid}.json").write_text(
+            json.dumps({"samples": [sample], "gauges": [gauge]})
+        )
+
+    samples, gauges = read_process_files(tmp_path)
+
+    assert (
+        samples[("cache_requests_total", (("cache", "etag"), ("result", "hit")))] == 4
+    )
+    assert list(gauges) == [("db_pool_connections", (("pid", "1"), ("state", "size")))]
@@ -0,0 +1,145 @@
+"""Tests for closing payroll months and the aggregate snapshots."""
+
+from __future__ import annotations
+
+from datetime import date
+
+import pytest
+from sqlalchemy import update
+
+from app.core.deletion import ClosedPeriodConflict, delete_person, delete_project
+from app.core.periods import close_month, closed_months
+from app.core.services import (
+    TimesheetFilters,
+    bulk_delete_entries,
+    bulk_duplicate_entries,
+    get_dashboard_data,
+)
+from app.core.validators import ValidationProblem
+from app.extensions import db
+from app.models import ClosedPeriod, PeriodSnapshot, Person, Project, TimeEntry
+
+
+def _add_entries(project, person) -> list[TimeEntry]:
+    entries = [
+        TimeEntry(
+            project=project, person=person, date=date(2024, 3, 4), duration_hours=2
+        ),
+        TimeEntry(
+            project=project, person=person, date=date(2024, 3, 4), duration_hours=1.5
+        ),
+        TimeEntry(
+            project=project, person=person, date=date(2024, 4, 2), duration_hours=3
+        ),
+    ]
+    db.session.add_all(entries)
+    db.session.commit()
+    return entries
+
+
+def test_close_month_snapshots_hours(app, sample_project, admin_user):
+    _add_entries(sample_project, admin_user)
+
+    close_month(date(2024, 3, 15), closed_by=admin_user.id)
+
+    assert closed_months() == [date(2024, 3, 1)]
+    snapshots = PeriodSnapshot.query.all()
+    assert len(snapshots) == 1
+    assert snapshots[0].day == date(2024, 3, 4)
+    assert snapshots[0].hours == pytest.approx(3.5)
+    assert snapshots[0].entries == 2
+
+
+def test_close_month_rejects_open_or_closed_months(app):
+    with pytest.raises(ValueError, match="not over"):
+        close_month(date(2024, 3, 1), today=date(2024, 3, 20))
+
+    close_month(date(2024, 3, 1), today=date(2024, 4, 1))
+    with pytest.raises(ValueError, match="already closed"):
+        close_month(date(2024, 3, 1), today=date(2024, 4, 1))
+
+
+def test_dashboard_reads_closed_months_from_snapshots(app, sample_project, admin_user):
+    _add_entries(sample_project, admin_user)
+    close_month(date(2024, 3, 1))
+    # A stray write behind the application's back must not change the books.
+    db.session.execute(update(TimeEntry).values(duration_hours=10))
+    db.session.commit()
+
+    filters = TimesheetFilters(start_date=date(2024, 3, 1), end_date=date(2024, 4, 30))
+    data = get_dashboard_data(filters)
+
+    assert data["total_hours"] == pytest.approx(13.5)
+    assert dict(data["hours_by_project"]) == {"Project A": pytest.approx(13.5)}
+
+
+def test_closed_month_rejects_changes(app, client, login, sample_project, admin_user):
+    march, _, april = _add_entries(sample_project, admin_user)
+    close_month(date(2024, 3, 1))
+    login("admin@example.com", "password123")
+
+    response = client.post(
+        "/timesheet/new",
+        data={
+            "project_id": sample_project.id,
+            "person_id": admin_user.id,
+            "date": "2024-03-05",
+            "duration_hours": "1",
+        },
+        follow_redirects=True,
+    )
+    assert "Il mese 03/2024 è chiuso" in response.get_data(as_text=True)
+
+    response = client.get(f"/timesheet/{march.id}/edit", follow_redirects=True)
+    assert "Il mese 03/2024 è chiuso" in response.get_data(as_text=True)
+
+    client.post(f"/timesheet/{march.id}/delete")
+    assert db.session.get(TimeEntry, march.id) is not None
+    assert TimeEntry.query.count() == 3
+
+    with pytest.raises(ValidationProblem):
+        bulk_delete_entries([march.id], owner_id=None)
+    with pytest.raises(ValidationProblem):
+        bulk_duplicate_entries([april.id], owner_id=None, shift_days=-30)
+
+
+def test_closing_a_month_invalidates_cached_pages(
+    app, client, login, sample_project, admin_user
+):
+    _add_entries(sample_project, admin_user)
+    login("admin@example.com", "password123")
+    url = "/timesheet/?start_date=2024-03-01&end_date=2024-03-31"
+    etag = client.get(url).headers["ETag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    close_month(date(2024, 3, 1))
+
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert "Mese chiuso" in response.get_data(as_text=True)
+
+
+def test_deletion_refuses_owners_of_closed_months(
+    app, tmp_path, sample_project, admin_user, regular_user
+):
+    _add_entries(sample_project, admin_user)
+    close_month(date(2024, 3, 1), closed_by=regular_user.id)
+    target = Project(name="Target", code="TGT", is_active=True)
+    db.session.add(target)
+    db.session.commit()
+
+    with pytest.raises(ClosedPeriodConflict) as info:
+        delete_person(admin_user.id, policy="archive", archive_dir=tmp_path)
+    assert info.value.months == [date(2024, 3, 1)]
+    with pytest.raises(ClosedPeriodConflict):
+        delete_project(sample_project.id, policy="reassign", target_id=target.id)
+
+    filters = TimesheetFilters(start_date=date(2024, 3, 1), end_date=date(2024, 3, 31))
+    assert get_dashboard_data(filters)["total_hours"] == pytest.approx(3.5)
+    assert TimeEntry.query.count() == 3
+    assert PeriodSnapshot.query.count() == 1
+
+    # The closer has no entries of their own: deleting them only drops the link.
+    delete_person(regular_user.id)
+    assert db.session.get(Person, regular_user.id) is None
+    assert db.session.get(ClosedPeriod, date(2024, 3, 1)).closed_by_id is None
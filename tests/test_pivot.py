@@ -0,0 +1,98 @@
+"""Tests for the pivot engine over time entries."""
+
+from __future__ import annotations
+
+import csv
+from datetime import date
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+
+from app.core.services import PivotSpecError, TimesheetFilters, pivot
+from app.extensions import db
+from app.models import Project, TimeEntry
+
+
+@pytest.fixture
+def entries(app, admin_user, regular_user, sample_project):
+    other = Project(name="Project B", code="PB", client="Other client")
+    admin_user.hourly_rate = 50
+    regular_user.country = "Italia"
+    db.session.add(other)
+    for project, person, day, hours in [
+        (sample_project, admin_user, date(2024, 1, 1), 2),
+        (sample_project, regular_user, date(2024, 1, 2), 3),
+        (sample_project, regular_user, date(2024, 1, 8), 1),
+        (other, admin_user, date(2024, 1, 9), 4),
+    ]:
+        db.session.add(
+            TimeEntry(project=project, person=person, date=day, duration_hours=hours)
+        )
+    db.session.commit()
+
+
+def test_project_by_person_matrix_with_totals(entries) -> None:
+    table = pivot(
+        TimesheetFilters(), ["project"], ["person"], ["hours", "cost", "entries"]
+    )
+
+    assert table.row_keys == [("Project A",), ("Project B",)]
+    assert table.column_keys == [("Admin",), ("User",)]
+    assert table.cells[("Project A",), ("User",)] == {
+        "hours": 4.0,
+        "cost": 0.0,
+        "entries": 2,
+    }
+    assert (("Project B",), ("User",)) not in table.cells
+    assert table.row_total(("Project A",)) == {
+        "hours": 6.0,
+        "cost": 100.0,
+        "entries": 3,
+    }
+    assert table.column_total(("Admin",))["cost"] == 300.0
+    assert table.grand_total() == {"hours": 10.0, "cost": 300.0, "entries": 4}
+
+
+def test_week_and_country_dimensions(entries) -> None:
+    by_week = pivot(TimesheetFilters(), ["week"])
+    assert by_week.row_keys == [("2024-W01",), ("2024-W02",)]
+    assert by_week.cells[("2024-W02",), ()] == {"hours": 5.0}
+
+    by_country = pivot(TimesheetFilters(), ["country"])
+    assert by_country.row_keys == [("Italia",), (None,)]
+
+
+def test_unknown_dimension_is_rejected(app) -> None:
+    with pytest.raises(PivotSpecError):
+        pivot(TimesheetFilters(), ["planet"])
+
+
+def test_pivot_json_and_csv_endpoints(client, login, admin_user, entries) -> None:
+    login(admin_user.email, "password123")
+
+    payload = client.get("/dashboard/pivot.json?rows=client&measures=hours").json
+    assert payload["data"] == [
+        {"key": ["Client"], "values": [{"hours": 6.0}], "total": {"hours": 6.0}},
+        {"key": ["Other client"], "values": [{"hours": 4.0}], "total": {"hours": 4.0}},
+    ]
+    assert payload["grand_total"] == {"hours": 10.0}
+
+    response = client.get("/dashboard/pivot.csv?rows=project&columns=person")
+    lines = list(csv.reader(StringIO(response.get_data(as_text=True))))
+    assert lines[0] == ["Progetto", "Admin - Ore", "User - Ore", "Totale - Ore"]
+    assert lines[2] == ["Project B", "4.0", "", "4.0"]
+    assert lines[-1] == ["Totale", "6.0", "4.0", "10.0"]
+
+    bad = client.get("/dashboard/pivot.json?rows=planet")
+    assert bad.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_pivot_is_limited_to_own_entries_for_users(
+    client, login, regular_user, entries
+) -> None:
+    login(regular_user.email, "password123")
+
+    payload = client.get("/dashboard/pivot.json?rows=person").json
+
+    assert [row["key"] for row in payload["data"]] == [["User"]]
@@ -0,0 +1,72 @@
+"""Tests for opt-in request profiling."""
+
+from __future__ import annotations
+
+from http import HTTPStatus
+
+import pytest
+
+from app.profiling import list_profiles, profile_token
+
+
+@pytest.fixture
+def profiles_dir(app, tmp_path):
+    app.config["PROFILES_DIR"] = str(tmp_path)
+    return tmp_path
+
+
+def test_admin_token_profiles_request(client, login, admin_user, profiles_dir) -> None:
+    login(admin_user.email, "password123")
+    token = profile_token(client.application, admin_user.id)
+
+    response = client.get(f"/dashboard/?_profile={token}")
+
+    assert response.status_code == HTTPStatus.OK
+    profile_id = response.headers["X-Profile-Id"]
+    assert (profiles_dir / f"{profile_id}.pstats").is_file()
+    [summary] = list_profiles(client.application)
+    assert summary.id == profile_id
+    assert summary.endpoint == "dashboard.index"
+    assert summary.peak_memory_kb > 0
+    assert "cumulative" in summary.top_functions
+
+    detail = client.get(f"/profiles/{profile_id}")
+    assert detail.status_code == HTTPStatus.OK
+    download = client.get(f"/profiles/{profile_id}.pstats")
+    assert download.status_code == HTTPStatus.OK
+    assert client.get("/profiles/").status_code == HTTPStatus.OK
+
+
+def test_header_token_is_accepted(client, login, admin_user, profiles_dir) -> None:
+    login(admin_user.email, "password123")
+    token = profile_token(client.application, admin_user.id)
+
+    response = client.get("/projects/", headers={"X-Profile": token})
+
+    assert "X-Profile-Id" in response.headers
+
+
+def test_invalid_or_foreign_tokens_are_ignored(
+    client, login, admin_user, regular_user, profiles_dir
+) -> None:
+    login(regular_user.email, "password123")
+    admin_token = profile_token(client.application, admin_user.id)
+    own_token = profile_token(client.application, regular_user.id)
+
+    for token in (admin_token, own_token, "garbage"):
+        response = client.get(f"/dashboard/?_profile={token}")
+        assert "X-Profile-Id" not in response.headers
+    assert list(profiles_dir.iterdir()) == []
+    assert client.get("/profiles/").status_code == HTTPStatus.FORBIDDEN
+
+
+def test_old_profiles_are_pruned(client, login, admin_user, profiles_dir) -> None:
+    client.application.config["PROFILES_KEEP"] = 2
+    login(admin_user.email, "password123")
+    token = profile_token(client.application, admin_user.id)
+
+    for _ in range(3):
+        client.get(f"/projects/?_profile={token}")
+
+    assert len(list(profiles_dir.glob("*.json"))) == 2
+    assert len(list(profiles_dir.glob("*.pstats"))) == 2
@@ -0,0 +1,127 @@
+"""Tests for bulk provisioning of people from CSV."""
+
+from __future__ import annotations
+
+from io import BytesIO, StringIO
+
+from werkzeug.security import check_password_hash
+
+from app.core.provisioning import (
+    existing_emails,
+    hash_passwords,
+    parse_people_csv,
+    provision_people,
+)
+from app.extensions import db
+from app.models import Person
+
+CSV = """full_name,email,password,role,hourly_rate
+Anna Rossi,Anna@Example.com,segreta123,user,40
+Bruno Bianchi,bruno@example.com,,admin,
+Carla Verdi,carla@example.com,corta,user,
+Dario Neri,not-an-email,password123,user,
+Anna Bis,anna@example.com,password123,user,
+Admin Copy,admin@example.com,password123,user,
+"""
+
+
+def test_parse_reports_invalid_and_duplicate_rows(app) -> None:
+    rows, errors = parse_people_csv(StringIO(CSV))
+
+    assert [row.email for row in rows] == [
+        "anna@example.com",
+        "bruno@example.com",
+        "admin@example.com",
+    ]
+    assert len(errors) == 3
+    assert errors[0].startswith("riga 4:")
+    assert parse_people_csv(StringIO("name,mail\n"))[1] == [
+        "colonne mancanti: email, full_name"
+    ]
+
+
+def test_provision_skips_existing_and_hashes_in_processes(app, admin_user) -> None:
+    assert admin_user.email == "admin@example.com"
+    rows, _ = parse_people_csv(StringIO(CSV))
+
+    preview = provision_people(rows, dry_run=True)
+    assert (preview.created, preview.existing) == (2, ["admin@example.com"])
+    assert Person.query.count() == 1
+
+    result = provision_people(rows, workers=2, batch_size=1)
+
+    assert result.created == 2
+    anna = Person.query.filter_by(email="anna@example.com").one()
+    assert anna.check_password("segreta123")
+    assert anna.total_hours == 0
+    bruno = Person.query.filter_by(email="bruno@example.com").one()
+    assert bruno.role == "admin"
+    assert not bruno.check_password("")
+    assert bruno.verify_reset_token(result.reset_tokens["bruno@example.com"])
+
+
+def test_existing_emails_ignore_case(app, admin_user) -> None:
+    admin_user.email = "Admin@Example.com"
+    db.session.commit()
+
+    assert existing_emails(["ADMIN@example.com", "anna@example.com"]) == {
+        "admin@example.com"
+    }
+
+
+def test_hash_passwords_keeps_order() -> None:
+    hashes = hash_passwords(["first-pass", "second-pass", "third-pass"], workers=2)
+
+    assert [
+        check_password_hash(h, p)
+        for h, p in zip(
+            hashes, ["first-pass", "second-pass", "third-pass"], strict=True
+        )
+    ] == [True] * 3
+
+
+def test_import_route_and_cli(client, login, admin_user, tmp_path) -> None:
+    login(admin_user.email, "password123")
+    response = client.post(
+        "/people/import",
+        data={"csv_file": (BytesIO(CSV.encode()), "people.csv"), "dry_run": "y"},
+        content_type="multipart/form-data",
+    )
+    assert b"verrebbero create" in response.data
+    assert Person.query.count() == 1
+
+    source = tmp_path / "people.csv"
+    source.write_text(CSV, encoding="utf-8")
+    tokens = tmp_path / "tokens.csv"
+    result = client.application.test_cli_runner().invoke(
+        args=[
+            "provision-users",
+            str(source),
+            "--workers",
+            "1",
+            "--tokens-out",
+            str(tokens),
+        ]
+    )
+    assert "Created 2 people; 1 already existed; 3 invalid rows." in result.output
+    assert tokens.read_text().startswith("bruno@example.com,")
+
+
+def test_import_route_hashes_in_process(client, login, admin_user, monkeypatch) -> None:
+    calls = []
+
+    def fake_hash(passwords, *, workers=None):
+        calls.append(workers)
+        return ["hash"] * len(passwords)
+
+    monkeypatch.setattr("app.core.provisioning.hash_passwords", fake_hash)
+    login(admin_user.email, "password123")
+
+    client.post(
+        "/people/import",
+        data={"csv_file": (BytesIO(CSV.encode()), "people.csv")},
+        content_type="multipart/form-data",
+    )
+
+    assert calls == [1]
+    assert Person.query.count() == 3
@@ -0,0 +1,62 @@
+"""Tests for per-endpoint query time budgets."""
+
+from __future__ import annotations
+
+import logging
+from http import HTTPStatus
+
+import pytest
+from sqlalchemy import text
+
+from app.budget import QueryBudgetExceeded, query_budget
+from app.core.parallel import run_statements
+from app.extensions import db
+
+ENDLESS = text(
+    "WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n) "
+    "SELECT count(*) FROM n"
+)
+
+
+def test_runaway_statement_is_cancelled(app) -> None:
+    app.config["QUERY_BUDGETS"] = {"report": 0.05}
+
+    with (
+        pytest.raises(QueryBudgetExceeded) as info,
+        query_budget("report", filters={"range": "all"}),
+    ):
+        db.session.execute(ENDLESS).scalar()
+
+    assert info.value.filters == {"range": "all"}
+    assert db.session.execute(text("SELECT 1")).scalar() == 1
+
+
+def test_budget_applies_to_concurrent_reads(app) -> None:
+    app.config["QUERY_BUDGETS"] = {"report": 0.05}
+
+    with pytest.raises(QueryBudgetExceeded), query_budget("report"):
+        run_statements({"a": ENDLESS, "b": text("SELECT 1")}, concurrent=True)
+
+
+def test_unbudgeted_names_are_not_limited(app) -> None:
+    with query_budget("unknown"):
+        assert db.session.execute(text("SELECT 1")).scalar() == 1
+
+
+def test_dashboard_asks_to_narrow_filters(
+    client, login, admin_user, monkeypatch, caplog
+) -> None:
+    client.application.config["QUERY_BUDGETS"] = {"dashboard": 0.05}
+
+    def endless(*_args, **_kwargs):
+        return db.session.execute(ENDLESS).scalar()
+
+    monkeypatch.setattr("app.views.dashboard.get_dashboard_data", endless)
+    login(admin_user.email, "password123")
+
+    with caplog.at_level(logging.WARNING):
+        response = client.get("/dashboard/?include_inactive=y")
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+    assert b"Restringi i filtri" in response.data
+    assert "include_inactive=True" in caplog.text
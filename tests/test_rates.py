@@ -0,0 +1,172 @@
+"""Tests for the effective-dated hourly rate history and SQL costs."""
+
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.core.periods import close_month
+from app.core.rates import EPOCH, RateChangeError, rate_history, set_hourly_rate
+from app.core.services import (
+    TimesheetFilters,
+    compute_total_cost,
+    get_timesheet_rows,
+    pivot,
+)
+from app.extensions import db
+from app.models import PeriodSnapshot, TimeEntry
+
+
+@pytest.fixture()
+def priced_entries(app, sample_project, admin_user):
+    admin_user.hourly_rate = Decimal(40)
+    db.session.add_all(
+        [
+            TimeEntry(
+                project=sample_project,
+                person=admin_user,
+                date=date(2024, 5, 31),
+                duration_hours=2,
+            ),
+            TimeEntry(
+                project=sample_project,
+                person=admin_user,
+                date=date(2024, 6, 3),
+                duration_hours=3,
+            ),
+        ]
+    )
+    db.session.commit()
+    set_hourly_rate(admin_user, Decimal(60), date(2024, 6, 1), today=date(2024, 7, 1))
+    db.session.commit()
+    return admin_user
+
+
+def test_set_hourly_rate_chains_periods(app, priced_entries):
+    history = rate_history(priced_entries.id)
+
+    assert [(row.effective_from, row.effective_to) for row in history] == [
+        (EPOCH, date(2024, 6, 1)),
+        (date(2024, 6, 1), None),
+    ]
+    assert [row.hourly_rate for row in history] == [Decimal(40), Decimal(60)]
+    assert priced_entries.hourly_rate == Decimal(60)
+
+    # A correction in between splits the first period.
+    set_hourly_rate(priced_entries, Decimal(50), date(2024, 3, 1))
+    assert [row.effective_to for row in rate_history(priced_entries.id)] == [
+        date(2024, 3, 1),
+        date(2024, 6, 1),
+        None,
+    ]
+
+
+def test_same_rate_from_a_later_day_is_rejected(app, priced_entries):
+    with pytest.raises(RateChangeError, match="già in vigore dal 01/06/2024"):
+        set_hourly_rate(priced_entries, Decimal(60), date(2024, 9, 1))
+    with pytest.raises(RateChangeError, match="già in vigore"):
+        set_hourly_rate(priced_entries, Decimal(40), date(2024, 3, 1))
+
+    assert [row.effective_from for row in rate_history(priced_entries.id)] == [
+        EPOCH,
+        date(2024, 6, 1),
+    ]
+
+
+def test_costs_use_rate_in_force_on_entry_day(app, priced_entries):
+    filters = TimesheetFilters(start_date=date(2024, 5, 1), end_date=date(2024, 6, 30))
+
+    rows = get_timesheet_rows(filters)
+    assert [row.cost for row in rows] == [180, 80]
+    assert compute_total_cost(rows) == 260
+
+    result = pivot(filters, ["month"], measures=["cost"])
+    assert result.cells == {
+        (("2024-05",), ()): {"cost": 80},
+        (("2024-06",), ()): {"cost": 180},
+    }
+
+
+def test_close_month_materializes_historical_costs(app, priced_entries):
+    close_month(date(2024, 5, 1), materialize_costs=True)
+
+    may, june = TimeEntry.query.order_by(TimeEntry.date).all()
+    assert may.cost == 80
+    assert june.cost is None
+    assert PeriodSnapshot.query.one().cost == 80
+
+    with pytest.raises(RateChangeError, match="05/2024"):
+        set_hourly_rate(priced_entries, Decimal(70), date(2024, 5, 15))
+
+
+def test_edit_person_records_rate_change(app, client, login, admin_user):
+    admin_user.hourly_rate = Decimal(40)
+    db.session.commit()
+    login("admin@example.com", "password123")
+
+    client.post(
+        f"/people/{admin_user.id}/edit",
+        data={
+            "full_name": "Admin",
+            "email": "admin@example.com",
+            "hourly_rate": "55",
+            "rate_effective_from": "2024-01-01",
+            "is_active": "y",
+            "role": "admin",
+        },
+    )
+
+    history = rate_history(admin_user.id)
+    assert [(row.effective_from, row.hourly_rate) for row in history] == [
+        (EPOCH, Decimal(40)),
+        (date(2024, 1, 1), Decimal(55)),
+    ]
+
+    # Same rate, earlier start: the period now starts earlier.
+    client.post(
+        f"/people/{admin_user.id}/edit",
+        data={
+            "full_name": "Admin",
+            "email": "admin@example.com",
+            "hourly_rate": "55",
+            "rate_effective_from": "2023-10-01",
+            "is_active": "y",
+            "role": "admin",
+        },
+    )
+
+    history = rate_history(admin_user.id)
+    assert [(row.effective_from, row.hourly_rate) for row in history] == [
+        (EPOCH, Decimal(40)),
+        (date(2023, 10, 1), Decimal(55)),
+    ]
+
+
+def test_backdated_rate_change_invalidates_cached_pages(
+    app, client, login, sample_project, admin_user
+):
+    admin_user.hourly_rate = Decimal(20)
+    db.session.add(
+        TimeEntry(
+            project=sample_project,
+            person=admin_user,
+            date=date(2024, 3, 4),
+            duration_hours=2,
+        )
+    )
+    db.session.commit()
+    set_hourly_rate(admin_user, Decimal(99), date(2024, 5, 1))
+    db.session.commit()
+    login("admin@example.com", "password123")
+    url = "/timesheet/?start_date=2024-03-01&end_date=2024-03-31"
+    etag = client.get(url).headers["ETag"]
+
+    # Today's rate stays 99: only person_rates changes.
+    set_hourly_rate(admin_user, Decimal(50), date(2024, 3, 1))
+    db.session.commit()
+
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert "€ 100.00" in response.get_data(as_text=True)
@@ -0,0 +1,74 @@
+"""Tests for the read-only session used by GET requests."""
+
+from __future__ import annotations
+
+from http import HTTPStatus
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.exc import OperationalError
+
+from app.extensions import db
+from app.models import Project
+from app.readonly import ReadOnlyRequestError, allow_writes
+
+
+def _rename_project(project_id: int) -> str:
+    db.session.get(Project, project_id).name = "Renamed"
+    db.session.commit()
+    return "ok"
+
+
+def test_orm_write_on_get_is_rejected(app, client, sample_project) -> None:
+    project_id = sample_project.id
+    app.add_url_rule("/_rename", "rename", lambda: _rename_project(project_id))
+
+    with pytest.raises(ReadOnlyRequestError):
+        client.get("/_rename")
+
+    db.session.rollback()
+    assert db.session.get(Project, project_id).name == "Project A"
+
+
+def test_core_write_on_get_is_rejected_by_sqlite(app, client, sample_project) -> None:
+    def core_update() -> str:
+        db.session.execute(update(Project).values(name="Core"))
+        return "ok"
+
+    app.add_url_rule("/_core", "core", core_update)
+
+    with pytest.raises(OperationalError, match="readonly"):
+        client.get("/_core")
+
+
+def test_autoflush_is_off_during_get(app, client, sample_project) -> None:
+    def probe() -> str:
+        return str(db.session().autoflush)
+
+    app.add_url_rule("/_probe", "probe", probe)
+
+    assert client.get("/_probe").get_data(as_text=True) == "False"
+    assert client.post("/_probe").status_code == HTTPStatus.METHOD_NOT_ALLOWED
+    assert db.session().autoflush is True
+
+
+def test_allow_writes_and_post_can_write(app, client, sample_project) -> None:
+    project_id = sample_project.id
+    app.add_url_rule(
+        "/_rename", "rename", allow_writes(lambda: _rename_project(project_id))
+    )
+
+    assert client.get("/_rename").status_code == HTTPStatus.OK
+    assert db.session.get(Project, project_id).name == "Renamed"
+
+
+def test_connection_is_writable_after_read_only_request(
+    client, login, admin_user, sample_project
+) -> None:
+    login(admin_user.email, "password123")
+    assert client.get("/projects/").status_code == HTTPStatus.OK
+
+    sample_project.name = "After GET"
+    db.session.commit()
+
+    assert db.session.get(Project, sample_project.id).name == "After GET"
@@ -0,0 +1,79 @@
+"""Tests for the notes full-text search filter."""
+
+from __future__ import annotations
+
+from datetime import date
+
+from app.core.archive import archive_time_entries
+from app.core.search import rebuild_search_index, to_match_query
+from app.core.services import TimesheetFilters, get_timesheet_entries
+from app.extensions import db
+from app.models import TimeEntry
+
+
+def _entry(project, person, day: date, notes: str) -> TimeEntry:
+    return TimeEntry(
+        project=project, person=person, date=day, duration_hours=1, notes=notes
+    )
+
+
+def test_match_query_quotes_user_input() -> None:
+    assert to_match_query('TKT-123 "work') == '"TKT-123"* """work"*'
+    assert to_match_query("   ") is None
+
+
+def test_search_follows_writes(app, sample_project, admin_user) -> None:
+    entry = _entry(sample_project, admin_user, date(2024, 1, 1), "Workshop cliente")
+    db.session.add_all(
+        [entry, _entry(sample_project, admin_user, date(2024, 1, 2), "Bug TKT-123")]
+    )
+    db.session.commit()
+
+    def search(text: str) -> list[str]:
+        return [e.notes for e in get_timesheet_entries(TimesheetFilters(search=text))]
+
+    assert search("workshop") == ["Workshop cliente"]
+    assert search("tkt-123") == ["Bug TKT-123"]
+    assert search("work clien") == ["Workshop cliente"]
+
+    entry.notes = "Riunione interna"
+    db.session.commit()
+    assert search("workshop") == []
+    assert search("riunione") == ["Riunione interna"]
+
+    db.session.delete(entry)
+    db.session.commit()
+    assert search("riunione") == []
+
+
+def test_search_includes_archive_and_rebuild(app, sample_project, admin_user) -> None:
+    db.session.add_all(
+        [
+            _entry(sample_project, admin_user, date(2020, 5, 1), "Workshop storico"),
+            _entry(sample_project, admin_user, date(2024, 5, 1), "Workshop recente"),
+        ]
+    )
+    db.session.commit()
+    archive_time_entries(date(2023, 1, 1))
+    rebuild_search_index()
+
+    entries = get_timesheet_entries(TimesheetFilters(search="workshop")).all()
+
+    assert sorted(e.notes for e in entries) == ["Workshop recente", "Workshop storico"]
+    assert any(e.is_archived for e in entries)
+
+
+def test_timesheet_route_search(client, login, admin_user, sample_project) -> None:
+    db.session.add_all(
+        [
+            _entry(sample_project, admin_user, date(2024, 1, 1), "Workshop cliente"),
+            _entry(sample_project, admin_user, date(2024, 1, 2), "Analisi requisiti"),
+        ]
+    )
+    db.session.commit()
+
+    login(admin_user.email, "password123")
+    response = client.get("/timesheet/?search=workshop")
+
+    assert b"Workshop cliente" in response.data
+    assert b"Analisi requisiti" not in response.data
@@ -0,0 +1,77 @@
+"""Tests for coalescing concurrent identical computations."""
+
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import pytest
+
+from app.core.services import TimesheetFilters
+from app.core.singleflight import SingleFlight, filters_key
+
+
+def _blocking(release: threading.Event, started: threading.Event, calls: list[int]):
+    def compute() -> str:
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "result"
+
+    return compute
+
+
+def test_concurrent_callers_share_one_execution() -> None:
+    flights = SingleFlight()
+    release, started, calls = threading.Event(), threading.Event(), []
+    compute = _blocking(release, started, calls)
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        leader = pool.submit(flights.do, ("dashboard", 1), compute)
+        started.wait(5)
+        followers = [
+            pool.submit(flights.do, ("dashboard", 1), compute) for _ in range(4)
+        ]
+        while flights.waiting() < 4:
+            time.sleep(0.001)
+        release.set()
+        results = [leader.result(), *(f.result() for f in followers)]
+
+    assert results == ["result"] * 5
+    assert len(calls) == 1
+    assert flights.stats() == {"dashboard": {"executions": 1, "coalesced": 4}}
+    assert flights.in_flight() == 0
+
+
+def test_waiters_time_out_and_errors_propagate() -> None:
+    flights = SingleFlight()
+    release, started, calls = threading.Event(), threading.Event(), []
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(
+            flights.do, ("export", 1), _blocking(release, started, calls)
+        )
+        started.wait(5)
+        assert flights.do(("export", 1), lambda: "own", timeout=0.01) == "own"
+        release.set()
+        assert leader.result() == "result"
+
+    def fail() -> None:
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        flights.do(("export", 2), fail)
+
+    assert flights.stats()["export"] == {"executions": 2, "timeouts": 1, "errors": 1}
+
+
+def test_filters_key_normalises_search() -> None:
+    first = TimesheetFilters(start_date=date(2024, 1, 1), search="Bug  Fix")
+    second = TimesheetFilters(start_date=date(2024, 1, 1), search="bug fix")
+    other = TimesheetFilters(start_date=date(2024, 1, 2), search="bug fix")
+
+    assert filters_key("dashboard", first) == filters_key("dashboard", second)
+    assert filters_key("dashboard", first) != filters_key("dashboard", other)
+    assert filters_key("dashboard", first) != filters_key("export", first)
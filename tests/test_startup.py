@@ -0,0 +1,25 @@
+"""Tests for template caching and the start-up report."""
+
+from __future__ import annotations
+
+from app import create_app
+
+
+def test_bytecode_cache_and_warmup(monkeypatch, tmp_path) -> None:
+    monkeypatch.setenv("TEMPLATE_BYTECODE_CACHE", "1")
+    monkeypatch.setenv("TEMPLATE_BYTECODE_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("TEMPLATE_WARMUP", "1")
+
+    app = create_app()
+    report = app.extensions["startup_report"]
+
+    assert report.templates_compiled == len(app.jinja_env.list_templates(["html"]))
+    assert "templates" in report.phases
+    assert list(tmp_path.glob("*.cache"))
+
+
+def test_startup_report_command(app) -> None:
+    result = app.test_cli_runner().invoke(args=["startup-report"])
+
+    assert result.exit_code == 0
+    assert "total" in result.output
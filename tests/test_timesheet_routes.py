@@ -1,10 +1,17 @@
 from __future__ import annotations
 
-from datetime import date
+from datetime import date, time
 
 import pytest
+
+from app.core.services import (
+    TimesheetFilters,
+    compute_total_cost,
+    copy_week,
+    get_timesheet_rows,
+)
 from app.extensions import db
-from app.models import TimeEntry
+from app.models import Project, TimeEntry
 
 
 def test_create_entry_calculates_duration(
@@ -46,3 +53,250 @@ def test_user_cannot_edit_other_entry(
     login(regular_user.email, "password123")
     response = client.get(f"/timesheet/{entry.id}/edit")
     assert response.status_code == 403
+
+
+def _entries_for(project, *people):
+    entries = [
+        TimeEntry(
+            project=project,
+            person=person,
+            date=date(2024, 1, 1),
+            duration_hours=1,
+            notes=f"Entry {person.full_name}",
+        )
+        for person in people
+    ]
+    db.session.add_all(entries)
+    db.session.commit()
+    return entries
+
+
+def test_bulk_delete_only_touches_own_entries(
+    client, login, admin_user, regular_user, sample_project
+):
+    own, other = _entries_for(sample_project, regular_user, admin_user)
+
+    login(regular_user.email, "password123")
+    response = client.post(
+        "/timesheet/bulk",
+        data={"action": "delete", "entry_ids": [own.id, other.id]},
+        follow_redirects=True,
+    )
+
+    assert response.status_code == 200
+    assert b"Voci eliminate: 1" in response.data
+    assert TimeEntry.query.count() == 1
+    assert TimeEntry.query.one().person_id == admin_user.id
+
+
+def test_bulk_duplicate_shifts_dates(client, login, admin_user, sample_project):
+    (entry,) = _entries_for(sample_project, admin_user)
+
+    login(admin_user.email, "password123")
+    client.post(
+        "/timesheet/bulk",
+        data={"action": "duplicate", "shift_days": 7, "entry_ids": [entry.id]},
+    )
+
+    copies = TimeEntry.query.filter(TimeEntry.id != entry.id).all()
+    assert len(copies) == 1
+    assert copies[0].date == date(2024, 1, 8)
+    assert copies[0].notes == entry.notes
+
+
+def test_bulk_duplicate_skips_overlapping_copies(
+    client, login, admin_user, sample_project
+):
+    early, late = (
+        TimeEntry(
+            project=sample_project,
+            person=admin_user,
+            date=day,
+            start_time=time(9),
+            end_time=time(11),
+            duration_hours=2,
+        )
+        for day in (date(2024, 1, 1), date(2024, 1, 2))
+    )
+    db.session.add_all([early, late])
+    db.session.commit()
+
+    login(admin_user.email, "password123")
+    response = client.post(
+        "/timesheet/bulk",
+        data={"action": "duplicate", "shift_days": 1, "entry_ids": [early.id, late.id]},
+        follow_redirects=True,
+    )
+
+    assert b"Voci duplicate: 1 (saltate per sovrapposizione: 1)" in response.data
+    assert [entry.date for entry in TimeEntry.query.order_by(TimeEntry.date)] == [
+        date(2024, 1, 1),
+        date(2024, 1, 2),
+        date(2024, 1, 3),
+    ]
+
+    # Without a shift every copy would overlap its original.
+    for shift in ("0", ""):
+        response = client.post(
+            "/timesheet/bulk",
+            data={"action": "duplicate", "shift_days": shift, "entry_ids": [early.id]},
+            follow_redirects=True,
+        )
+        assert b"Voci duplicate: 0 (saltate per sovrapposizione: 1)" in response.data
+    assert TimeEntry.query.count() == 3
+
+
+def test_bulk_reassign_project(client, login, admin_user, regular_user, sample_project):
+    target = Project(name="Project B", is_active=True)
+    db.session.add(target)
+    db.session.commit()
+    entries = _entries_for(sample_project, admin_user, regular_user)
+
+    login(admin_user.email, "password123")
+    response = client.post(
+        "/timesheet/bulk",
+        data={
+            "action": "reassign",
+            "target_project_id": target.id,
+            "entry_ids": [entry.id for entry in entries],
+        },
+        follow_redirects=True,
+    )
+
+    assert b"Voci spostate su Project B: 2" in response.data
+    db.session.expire_all()
+    assert {entry.project_id for entry in TimeEntry.query} == {target.id}
+
+
+def test_copy_week_skips_overlaps_and_is_idempotent(
+    app, admin_user, regular_user, sample_project
+):
+    db.session.add_all(
+        [
+            TimeEntry(
+                project=sample_project,
+                person=regular_user,
+                date=date(2024, 1, 1),
+                start_time=time(9, 0),
+                end_time=time(12, 0),
+                duration_hours=3,
+            ),
+            TimeEntry(
+                project=sample_project,
+                person=regular_user,
+                date=date(2024, 1, 3),
+                duration_hours=2,
+            ),
+            TimeEntry(
+                project=sample_project,
+                person=admin_user,
+                date=date(2024, 1, 2),
+                duration_hours=1,
+            ),
+            # Already in the target week and overlapping the Monday entry.
+            TimeEntry(
+                project=sample_project,
+                person=regular_user,
+                date=date(2024, 1, 8),
+                start_time=time(11, 0),
+                end_time=time(13, 0),
+                duration_hours=2,
+            ),
+        ]
+    )
+    db.session.commit()
+
+    preview = copy_week(
+        date(2024, 1, 3), date(2024, 1, 10), person_id=regular_user.id, dry_run=True
+    )
+    assert (preview.copied, preview.skipped) == (1, 1)
+    assert TimeEntry.query.count() == 4
+
+    result = copy_week(date(2024, 1, 1), date(2024, 1, 8))
+    db.session.commit()
+    assert (result.copied, result.skipped) == (2, 1)
+    assert {entry.date for entry in TimeEntry.query} >= {
+        date(2024, 1, 9),
+        date(2024, 1, 10),
+    }
+
+    again = copy_week(date(2024, 1, 1), date(2024, 1, 8))
+    assert (again.copied, again.skipped) == (0, 3)
+
+
+def test_copy_week_route_preview(client, login, admin_user, sample_project):
+    db.session.add(
+        TimeEntry(
+            project=sample_project,
+            person=admin_user,
+            date=date(2024, 1, 1),
+            duration_hours=1,
+        )
+    )
+    db.session.commit()
+
+    login(admin_user.email, "password123")
+    response = client.post(
+        "/timesheet/copy-week",
+        data={
+            "source_week": "2024-01-01",
+            "target_week": "2024-01-08",
+            "person_id": 0,
+            "dry_run": "y",
+        },
+    )
+
+    assert response.status_code == 200
+    assert b"Anteprima 2024-01-01" in response.data
+    assert TimeEntry.query.count() == 1
+
+
+def test_timesheet_rows_skip_orm_hydration(app, admin_user, sample_project):
+    admin_user.hourly_rate = 50
+    db.session.add_all(
+        [
+            TimeEntry(
+                project=sample_project,
+                person=admin_user,
+                date=date(2024, 1, day),
+                start_time=time(9),
+                end_time=time(10, 30),
+                duration_hours=1.5,
+                notes=f"Day {day}",
+            )
+            for day in (1, 2)
+        ]
+    )
+    db.session.commit()
+    db.session.expunge_all()
+
+    rows = get_timesheet_rows(TimesheetFilters())
+
+    assert [(row.date.day, row.project_name, row.person_name) for row in rows] == [
+        (2, "Project A", "Admin"),
+        (1, "Project A", "Admin"),
+    ]
+    assert rows[0].cost == pytest.approx(75.0)
+    assert compute_total_cost(rows) == pytest.approx(150.0)
+    assert not any(
+        isinstance(obj, TimeEntry) for obj in db.session.identity_map.values()
+    )
+
+
+def test_export_csv_uses_joined_names(client, login, admin_user, sample_project):
+    admin_user.hourly_rate = 40
+    db.session.add(
+        TimeEntry(
+            project=sample_project,
+            person=admin_user,
+            date=date(2024, 2, 1),
+            duration_hours=2,
+            notes="Export",
+        )
+    )
+    db.session.commit()
+    login(admin_user.email, "password123")
+
+    lines = client.get("/timesheet/export").get_data(as_text=True).splitlines()
+
+    assert lines[1] == "2024-02-01,Project A,Admin,2.00,,,Export,80.00"